@@ -1,51 +1,27 @@
-import sqlite3
+from contact_store import ContactStore
 
-conn = sqlite3.connect("contacts.db") # Connect to SQLite database (or create it)
-cur = conn.cursor() # Create a cursor object to interact with the database
-
-cur.execute('''
-CREATE TABLE IF NOT EXISTS contacts (
-    name TEXT NOT NULL,
-    phone TEXT,
-    email TEXT
-)
-''')
+store = ContactStore("contacts.db") # indexed contacts table (upgrades an old contacts.db in place)
 
 def add_contact(name: str, phone: str, email: str) -> None:
-    cur.execute('INSERT INTO contacts (name, phone, email) VALUES (?, ?, ?)', (name, phone, email))
-    conn.commit()
+    store.add(name, phone, email)
 
 def get_all_contacts() -> list[dict]:
-    cur.execute('SELECT name, phone, email FROM contacts')
-    rows = cur.fetchall()
-    return [{"name": row[0], "phone": row[1], "email": row[2]} for row in rows]
+    return [{"name": c["name"], "phone": c["phone"], "email": c["email"]} for c in store.all()]
 
 def find_contact_by_name(name: str) -> list[dict]:
-    cur.execute('SELECT name, phone, email FROM contacts WHERE name = ?', (name,))
-    rows = cur.fetchall()
-    return [{"name": row[0], "phone": row[1], "email": row[2]} for row in rows]
+    """Case-insensitive exact name lookup through the name index."""
+    return [{"name": c["name"], "phone": c["phone"], "email": c["email"]} for c in store.find_by_name(name)]
 
 def update_contact(name: str, phone: str = None, email: str = None) -> None:
-    fields = []
-    values = []
-    if phone is not None:
-        fields.append("phone = ?")
-        values.append(phone)
-    if email is not None:
-        fields.append("email = ?")
-        values.append(email)
-    if not fields:
-        return
-    values.append(name)
-    cur.execute(f'UPDATE contacts SET {", ".join(fields)} WHERE name = ?', values)
-    conn.commit()
+    with store.transaction():
+        for c in store.find_by_name(name):
+            store.update(c["id"], phone=phone, email=email)
 
 def delete_contact(name: str) -> None:
-    cur.execute('DELETE FROM contacts WHERE name = ?', (name,))
-    conn.commit()
+    store.delete_by_name(name)
 
 def close_connection() -> None:
-    conn.close()
+    store.close()
 
 # -------- Input helpers --------
 def prompt_non_empty(prompt: str) -> str:
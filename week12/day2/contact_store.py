@@ -0,0 +1,278 @@
+# Shared SQLite contact storage used by the contact managers in weeks 7, 8 and 12.
+# Lookups go through indexes on normalized name, phone and email, so adding,
+# finding, updating and deleting a contact never rewrites or scans the data.
+import csv
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+
+FIELDS = ("name", "phone", "email")
+
+
+def name_key(name: str) -> str:
+    """Case- and whitespace-insensitive form of a name."""
+    return " ".join(str(name or "").split()).casefold()
+
+
+def phone_key(phone: str) -> str:
+    """Digits of a phone number."""
+    return "".join(filter(str.isdigit, str(phone or "")))
+
+
+def email_key(email: str) -> str:
+    return str(email or "").strip().lower()
+
+
+KEYS = {"name": name_key, "phone": phone_key, "email": email_key}
+
+
+def _clean(row: dict) -> dict:
+    return {f: str(row.get(f) or "").strip() for f in FIELDS}
+
+
+def _after(prefix: str) -> str:
+    """Smallest string greater than every string starting with prefix."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class ContactStore:
+    """Contacts in one SQLite table, keyed by a stable integer id.
+
+    Each row also stores its normalized name/phone/email keys, which are
+    indexed: exact and prefix lookups are index range scans. Every change
+    commits on its own unless it runs inside transaction(), which commits
+    once at the end (used for bulk imports). A "version" counter, bumped by
+    each commit that changed something, tells callers that cache contacts
+    when the table changed.
+
+    A contacts table created by the old week12 manager (name/phone/email
+    only) is rebuilt into this layout on first open, keeping its rows' ids.
+    """
+
+    def __init__(self, path: str = "contacts.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL") # readers don't block the writer
+        self.conn.execute("PRAGMA synchronous=NORMAL") # durable at checkpoints, fast commits
+        self._depth = 0
+        self._changed = False
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        with self.conn:
+            columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(contacts)")}
+            if columns and "name_key" not in columns: # table from the old manager: rebuild it
+                self.conn.execute("ALTER TABLE contacts RENAME TO contacts_old")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS contacts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, -- never reused, so callers can cache by id
+                    name TEXT NOT NULL,
+                    phone TEXT NOT NULL DEFAULT '',
+                    email TEXT NOT NULL DEFAULT '',
+                    name_key TEXT NOT NULL,
+                    phone_key TEXT NOT NULL,
+                    email_key TEXT NOT NULL
+                )""")
+            if columns and "name_key" not in columns:
+                self.conn.create_function("_key_name", 1, name_key, deterministic=True)
+                self.conn.create_function("_key_phone", 1, phone_key, deterministic=True)
+                self.conn.create_function("_key_email", 1, email_key, deterministic=True)
+                self.conn.execute("""
+                    INSERT INTO contacts (id, name, phone, email, name_key, phone_key, email_key)
+                    SELECT rowid, name, COALESCE(phone, ''), COALESCE(email, ''),
+                           _key_name(name), _key_phone(phone), _key_email(email)
+                    FROM contacts_old ORDER BY rowid""")
+                self.conn.execute("DROP TABLE contacts_old")
+            for f in FIELDS:
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS contacts_{f}_key ON contacts ({f}_key)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self.conn.execute("INSERT OR IGNORE INTO meta VALUES ('version', 0)")
+
+    # --- Transactions ---
+    @contextmanager
+    def transaction(self):
+        """Group changes into one commit (rolled back if the block raises)."""
+        self._depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._depth -= 1
+            if self._depth == 0:
+                self._changed = False
+                self.conn.rollback()
+            raise
+        self._depth -= 1
+        self._commit(False)
+
+    def _commit(self, changed: bool = True) -> None:
+        self._changed = self._changed or changed
+        if self._depth == 0:
+            if self._changed:
+                self.conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+                self._changed = False
+            self.conn.commit()
+
+    # --- Reading ---
+    @staticmethod
+    def _row(row) -> dict:
+        return {"id": row["id"], "name": row["name"], "phone": row["phone"], "email": row["email"]}
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM contacts").fetchone()[0]
+
+    def version(self) -> int:
+        """Number of committed changes to the contacts (by any ContactStore on this file)."""
+        return self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def get(self, contact_id: int):
+        row = self.conn.execute("SELECT id, name, phone, email FROM contacts WHERE id = ?",
+                                (contact_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def all(self, limit: int = None, offset: int = 0) -> list:
+        """Contacts in the order they were added (optionally one page of them)."""
+        sql = "SELECT id, name, phone, email FROM contacts ORDER BY id"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)} OFFSET {int(offset)}"
+        return [self._row(r) for r in self.conn.execute(sql)]
+
+    def find(self, field: str, value: str, prefix: bool = False, limit: int = None) -> list:
+        """Contacts whose normalized field equals value (or starts with it)."""
+        key = KEYS[field](value)
+        if not key:
+            return []
+        column = f"{field}_key"
+        if prefix:
+            sql = (f"SELECT id, name, phone, email FROM contacts WHERE {column} >= ? AND {column} < ? "
+                   f"ORDER BY {column}, id")
+            args = (key, _after(key))
+        else:
+            sql = f"SELECT id, name, phone, email FROM contacts WHERE {column} = ? ORDER BY id"
+            args = (key,)
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return [self._row(r) for r in self.conn.execute(sql, args)]
+
+    def find_by_name(self, name: str) -> list:
+        return self.find("name", name)
+
+    def is_duplicate(self, name: str, phone: str, email: str) -> bool:
+        """Same name and phone, or same email, as an existing contact."""
+        row = self.conn.execute(
+            "SELECT 1 FROM contacts WHERE name_key = ? AND phone_key = ? LIMIT 1",
+            (name_key(name), phone_key(phone))).fetchone()
+        if row is None and email_key(email):
+            row = self.conn.execute("SELECT 1 FROM contacts WHERE email_key = ? LIMIT 1",
+                                    (email_key(email),)).fetchone()
+        return row is not None
+
+    # --- Writing ---
+    def add(self, name: str, phone: str = "", email: str = "") -> int:
+        c = _clean({"name": name, "phone": phone, "email": email})
+        cur = self.conn.execute(
+            "INSERT INTO contacts (name, phone, email, name_key, phone_key, email_key) VALUES (?, ?, ?, ?, ?, ?)",
+            (c["name"], c["phone"], c["email"], name_key(c["name"]), phone_key(c["phone"]), email_key(c["email"])))
+        self._commit()
+        return cur.lastrowid
+
+    def add_many(self, rows, skip_duplicates: bool = False) -> int:
+        """Insert many {name, phone, email} dicts in one transaction; returns how many were added."""
+        cleaned = (c for c in map(_clean, rows) if c["name"] or c["phone"] or c["email"])
+        if skip_duplicates: # each row is checked against the ones already added
+            cleaned = (c for c in cleaned if not self.is_duplicate(c["name"], c["phone"], c["email"]))
+        with self.transaction():
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT INTO contacts (name, phone, email, name_key, phone_key, email_key) VALUES (?, ?, ?, ?, ?, ?)",
+                ((c["name"], c["phone"], c["email"], name_key(c["name"]), phone_key(c["phone"]), email_key(c["email"]))
+                 for c in cleaned))
+            added = self.conn.total_changes - before
+            self._changed = self._changed or added > 0
+        return added
+
+    def update(self, contact_id: int, **fields) -> bool:
+        """Change some of name/phone/email; None or missing fields are kept."""
+        changes = {f: str(v).strip() for f, v in fields.items() if f in FIELDS and v is not None}
+        if not changes:
+            return False
+        sets = ", ".join(f"{f} = ?, {f}_key = ?" for f in changes)
+        args = [x for f, v in changes.items() for x in (v, KEYS[f](v))]
+        cur = self.conn.execute(f"UPDATE contacts SET {sets} WHERE id = ?", (*args, contact_id))
+        self._commit()
+        return cur.rowcount > 0
+
+    def delete(self, contact_id: int) -> bool:
+        cur = self.conn.execute("DELETE FROM contacts WHERE id = ?", (contact_id,))
+        self._commit()
+        return cur.rowcount > 0
+
+    def delete_by_name(self, name: str) -> int:
+        cur = self.conn.execute("DELETE FROM contacts WHERE name_key = ?", (name_key(name),))
+        self._commit()
+        return cur.rowcount
+
+    def clear(self) -> None:
+        self.conn.execute("DELETE FROM contacts")
+        self._commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # --- Legacy formats ---
+    def import_file(self, path: str, replace: bool = False, skip_duplicates: bool = False) -> int:
+        """Load contacts from a .csv, .json or .db file written by one of the old managers."""
+        rows = read_contacts(path)
+        with self.transaction():
+            if replace:
+                self.clear()
+            return self.add_many(rows, skip_duplicates)
+
+    def export_file(self, path: str) -> int:
+        """Write all contacts as .csv, .json or .db (the old managers' formats); returns the count."""
+        contacts = [{f: c[f] for f in FIELDS} for c in self.all()]
+        write_contacts(path, contacts)
+        return len(contacts)
+
+
+def read_contacts(path: str) -> list:
+    """Contacts from a legacy file: CSV with a name,email,phone header, a JSON
+    list of objects, or a SQLite database with a contacts table."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            raise ValueError(f"{path}: expected a JSON list of contacts")
+        return [_clean(c) for c in data if isinstance(c, dict)]
+    if ext == ".db":
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute("SELECT name, phone, email FROM contacts ORDER BY rowid").fetchall()
+        finally:
+            conn.close()
+        return [_clean(dict(zip(FIELDS, r))) for r in rows]
+    with open(path, "r", newline="", encoding="utf-8") as f: # CSV (contact.txt uses this too)
+        return [_clean(row) for row in csv.DictReader(f)]
+
+
+def write_contacts(path: str, contacts) -> None:
+    """Write contacts in the legacy format chosen by the file extension (atomically for files)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".db":
+        if os.path.exists(path):
+            os.remove(path)
+        store = ContactStore(path)
+        store.add_many(contacts)
+        store.close()
+        return
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        if ext == ".json":
+            json.dump([{f: c.get(f, "") for f in FIELDS} for c in contacts], f, indent=4, ensure_ascii=False)
+        else:
+            writer = csv.DictWriter(f, fieldnames=["name", "email", "phone"], extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(contacts)
+    os.replace(tmp, path)
@@ -0,0 +1,59 @@
+# Move contacts between the old file formats and the shared SQLite store.
+#   python migrate_contacts.py import contacts.json week7/day4/contact.txt --db contacts.db
+#   python migrate_contacts.py export backup.csv --db contacts.db
+#   python migrate_contacts.py convert contact.txt contacts.json
+import argparse
+import sqlite3
+import sys
+
+from contact_store import ContactStore, read_contacts, write_contacts
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Import/export contacts (.csv/.txt, .json, .db) to and from a ContactStore.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="add contacts from legacy files to the store")
+    imp.add_argument("sources", nargs="+")
+    imp.add_argument("--db", default="contacts.db", help="store to import into")
+    imp.add_argument("--replace", action="store_true", help="delete existing contacts first")
+    imp.add_argument("--keep-duplicates", action="store_true",
+                     help="also add contacts with the same name+phone or email as an existing one")
+    exp = sub.add_parser("export", help="write the store's contacts to a legacy file")
+    exp.add_argument("dest")
+    exp.add_argument("--db", default="contacts.db", help="store to export from")
+    conv = sub.add_parser("convert", help="convert one legacy file to another format")
+    conv.add_argument("source")
+    conv.add_argument("dest")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    try:
+        if args.command == "convert":
+            contacts = read_contacts(args.source)
+            write_contacts(args.dest, contacts)
+            print(f"Converted {len(contacts)} contacts: {args.source} -> {args.dest}")
+            return 0
+        store = ContactStore(args.db)
+        try:
+            if args.command == "import":
+                with store.transaction(): # all files or nothing
+                    if args.replace:
+                        store.clear()
+                    for src in args.sources:
+                        added = store.import_file(src, skip_duplicates=not args.keep_duplicates)
+                        print(f"{src}: {added} contacts added")
+                print(f"{args.db} now holds {len(store)} contacts")
+            else:
+                print(f"Exported {store.export_file(args.dest)} contacts to {args.dest}")
+        finally:
+            store.close()
+    except (OSError, ValueError, sqlite3.Error) as e: # json.JSONDecodeError is a ValueError
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
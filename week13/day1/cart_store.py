@@ -0,0 +1,192 @@
+# Server-side carts for the shopping cart app.
+# The session cookie only carries a cart id; carts live in an in-memory LRU
+# (with a time-to-live) and, optionally, in SQLite so they survive restarts.
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class Catalog:
+    """Products indexed by id; prices are also kept in integer cents."""
+
+    def __init__(self, products):
+        self.products = list(products)
+        self.by_id = {str(p["id"]): p for p in self.products}
+        self.cents = {pid: round(p["price"] * 100) for pid, p in self.by_id.items()}
+
+    def __contains__(self, pid) -> bool:
+        return str(pid) in self.by_id
+
+    def get(self, pid):
+        return self.by_id.get(str(pid))
+
+
+class Cart:
+    """Quantities by product id with a running total.
+
+    Every change adjusts total_cents by price x quantity change, so the
+    total never needs a pass over the cart. Unknown product ids are ignored.
+    """
+
+    def __init__(self, catalog: Catalog, items=None):
+        self.catalog = catalog
+        self.items = {} # product id -> quantity, in the order first added
+        self.total_cents = 0
+        self.count = 0 # units in the cart
+        if items:
+            self.add_many(items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _change(self, pid: str, delta: int) -> int:
+        """Add delta units of pid (clamped at zero); returns the units actually changed."""
+        if pid not in self.catalog.cents:
+            return 0
+        old = self.items.get(pid, 0)
+        new = max(0, old + delta)
+        if new:
+            self.items[pid] = new
+        else:
+            self.items.pop(pid, None)
+        self.total_cents += (new - old) * self.catalog.cents[pid]
+        self.count += new - old
+        return new - old
+
+    def add(self, pid, qty: int = 1) -> bool:
+        return self._change(str(pid), qty) > 0
+
+    def remove(self, pid, qty: int = 1) -> bool:
+        return self._change(str(pid), -qty) < 0
+
+    def add_many(self, items) -> int:
+        """Add several products at once: a {pid: qty} dict or (pid, qty) pairs. Returns units added."""
+        pairs = items.items() if isinstance(items, dict) else items
+        return sum(self._change(str(pid), int(qty)) for pid, qty in pairs if int(qty) > 0)
+
+    def merge(self, other: "Cart") -> int:
+        """Add every item of another cart (e.g. a guest cart after logging in)."""
+        return self.add_many(other.items)
+
+    def clear(self):
+        self.items.clear()
+        self.total_cents = 0
+        self.count = 0
+
+    @property
+    def total(self) -> float:
+        return self.total_cents / 100
+
+    def lines(self) -> list:
+        """Rows for the cart/checkout templates."""
+        rows = []
+        for pid, qty in self.items.items():
+            prod = self.catalog.by_id[pid]
+            rows.append({"id": pid, "name": prod["name"], "price": prod["price"], "qty": qty,
+                         "line_total": self.catalog.cents[pid] * qty / 100})
+        return rows
+
+    # Compact text form for storage: "pid:qty,pid:qty"
+    def encode(self) -> str:
+        return ",".join(f"{pid}:{qty}" for pid, qty in self.items.items())
+
+    @classmethod
+    def decode(cls, catalog: Catalog, text: str) -> "Cart":
+        pairs = (part.split(":", 1) for part in text.split(",") if ":" in part)
+        return cls(catalog, [(pid, qty) for pid, qty in pairs if qty.isdigit()])
+
+
+class CartStore:
+    """Carts by session id: an LRU of at most max_carts, each expiring ttl
+    seconds after its last use. With db_path every save is also written to
+    SQLite, so evicted carts (and carts from before a restart) are reloaded
+    on demand until they expire.
+    """
+
+    def __init__(self, catalog: Catalog, max_carts: int = 10000, ttl: float = 3600,
+                 db_path: str = None):
+        self.catalog = catalog
+        self.max_carts = max_carts
+        self.ttl = ttl
+        self.db_path = db_path
+        self._carts = OrderedDict() # session id -> (cart, expires at); least recently used first
+        self._lock = threading.Lock()
+        if db_path:
+            with self._connect() as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS carts (
+                        sid TEXT PRIMARY KEY,
+                        items TEXT NOT NULL,
+                        expires REAL NOT NULL
+                    )""")
+                conn.execute("CREATE INDEX IF NOT EXISTS carts_expires ON carts (expires)")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path)
+
+    def get(self, sid: str) -> Cart:
+        """The session's cart (an empty one if it has none or it expired)."""
+        now = time.time()
+        with self._lock:
+            entry = self._carts.get(sid)
+            if entry is not None and entry[1] > now:
+                self._carts.move_to_end(sid)
+                self._carts[sid] = (entry[0], now + self.ttl)
+                return entry[0]
+        cart = None
+        if self.db_path:
+            with self._connect() as conn:
+                row = conn.execute("SELECT items FROM carts WHERE sid = ? AND expires > ?", (sid, now)).fetchone()
+            if row:
+                cart = Cart.decode(self.catalog, row[0])
+        if cart is None:
+            cart = Cart(self.catalog)
+        self._remember(sid, cart, now)
+        return cart
+
+    def _remember(self, sid: str, cart: Cart, now: float):
+        with self._lock:
+            self._carts[sid] = (cart, now + self.ttl)
+            self._carts.move_to_end(sid)
+            while len(self._carts) > self.max_carts:
+                self._carts.popitem(last=False) # still in SQLite, if enabled
+
+    def save(self, sid: str, cart: Cart):
+        """Record a changed cart (empty carts are deleted)."""
+        now = time.time()
+        if not cart.items:
+            self.delete(sid)
+            return
+        self._remember(sid, cart, now)
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO carts (sid, items, expires) VALUES (?, ?, ?)",
+                             (sid, cart.encode(), now + self.ttl))
+
+    def delete(self, sid: str):
+        with self._lock:
+            self._carts.pop(sid, None)
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM carts WHERE sid = ?", (sid,))
+
+    def merge(self, from_sid: str, into_sid: str) -> Cart:
+        """Move one session's cart into another's; returns the combined cart."""
+        target = self.get(into_sid)
+        target.merge(self.get(from_sid))
+        self.save(into_sid, target)
+        self.delete(from_sid)
+        return target
+
+    def purge_expired(self) -> int:
+        """Drop expired carts from memory and SQLite; returns how many were in memory."""
+        now = time.time()
+        with self._lock:
+            expired = [sid for sid, (_, expires) in self._carts.items() if expires <= now]
+            for sid in expired:
+                del self._carts[sid]
+        if self.db_path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM carts WHERE expires <= ?", (now,))
+        return len(expired)
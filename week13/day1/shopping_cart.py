@@ -1,4 +1,7 @@
+import os
+import secrets
 from flask import Flask, session, redirect, url_for, render_template, request, flash
+from cart_store import Catalog, Cart, CartStore
 
 app = Flask(__name__, template_folder='shopping_templates')
 app.secret_key = 'dev-secret-change'
@@ -9,18 +12,25 @@ PRODUCTS = [
     {"id": "2", "name": "Banana", "price": 0.59},
     {"id": "3", "name": "Coffee", "price": 3.49},
 ]
+CATALOG = Catalog(PRODUCTS) # id -> product index
 
-def get_cart():
-    return session.get('cart', {})
+# Carts live on the server; the cookie only holds the cart id
+CARTS_DB = os.path.join(os.path.dirname(__file__), 'carts.db')
+CARTS = CartStore(CATALOG, max_carts=10000, ttl=7 * 24 * 3600, db_path=CARTS_DB)
+
+def cart_id():
+    if 'cart_id' not in session:
+        session['cart_id'] = secrets.token_urlsafe(16)
+    return session['cart_id']
+
+def get_cart() -> Cart:
+    return CARTS.get(cart_id())
 
 def save_cart(cart):
-    session['cart'] = cart
+    CARTS.save(cart_id(), cart)
 
 def find_product(pid):
-    for p in PRODUCTS:
-        if p['id'] == pid:
-            return p
-    return None
+    return CATALOG.get(pid)
 
 @app.route('/')
 def catalog():
@@ -32,58 +42,50 @@ def add_to_cart(item_id):
         flash('Item not found.')
         return redirect(url_for('catalog'))
     cart = get_cart()
-    cart[item_id] = cart.get(item_id, 0) + 1
+    cart.add(item_id)
     save_cart(cart)
     if request.method == 'POST':
         flash('Added to cart.')
         return redirect(url_for('catalog'))
     return redirect(url_for('view_cart'))
 
+@app.route('/add_many', methods=['POST'])
+def add_many():
+    """Add several products in one request: item_id fields, each with an optional qty_<id>."""
+    cart = get_cart()
+    wanted = {}
+    for pid in request.form.getlist('item_id'):
+        qty = request.form.get(f'qty_{pid}', '1')
+        wanted[pid] = wanted.get(pid, 0) + (int(qty) if qty.isdigit() else 0)
+    added = cart.add_many(wanted)
+    save_cart(cart)
+    flash(f'Added {added} item(s) to cart.' if added else 'Nothing added.')
+    return redirect(url_for('view_cart'))
+
 @app.route('/view_cart')
 def view_cart():
     cart = get_cart()
-    items = []
-    total = 0.0
-    for pid, qty in cart.items():
-        prod = find_product(pid)
-        if not prod:
-            continue
-        line = prod['price'] * qty
-        total += line
-        items.append({"id": pid, "name": prod['name'], "price": prod['price'], "qty": qty, "line_total": line})
-    return render_template('cart.html', items=items, total=total)
+    return render_template('cart.html', items=cart.lines(), total=cart.total)
 
 @app.route('/remove_from_cart/<item_id>', methods=['POST', 'GET'])
 def remove_from_cart(item_id):
     cart = get_cart()
-    if item_id in cart:
-        if cart[item_id] > 1:
-            cart[item_id] -= 1
-        else:
-            del cart[item_id]
+    if cart.remove(item_id):
         save_cart(cart)
         flash('Item removed.')
     return redirect(url_for('view_cart'))
 
 @app.route('/clear_cart', methods=['POST'])
 def clear_cart():
-    session.pop('cart', None)
+    CARTS.delete(cart_id())
     flash('Cart cleared.')
     return redirect(url_for('catalog'))
 
 @app.route('/checkout')
 def checkout():
     cart = get_cart()
-    items = []
-    total = 0.0
-    for pid, qty in cart.items():
-        prod = find_product(pid)
-        if not prod:
-            continue
-        line = prod['price'] * qty
-        total += line
-        items.append({"id": pid, "name": prod['name'], "price": prod['price'], "qty": qty, "line_total": line})
-    session.pop('cart', None)
+    items, total = cart.lines(), cart.total # total was kept up to date as items changed
+    CARTS.delete(cart_id())
     return render_template('checkout.html', items=items, total=total)
 
 if __name__ == '__main__':
@@ -0,0 +1,199 @@
+# Blog posts for the week13 blog apps (day2 and day4).
+# Each request reuses one SQLite connection (kept on flask.g, closed at
+# teardown). List pages read titles and excerpts from a covering index with
+# keyset pagination, never the post bodies. Rendered post bodies are cached
+# per post until update_post/delete_post.
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import g, has_app_context
+from markupsafe import Markup, escape
+
+EXCERPT_CHARS = 200
+PAGE_SIZE = 20
+
+LIST_COLUMNS = "id, title, author, created_at, excerpt"
+
+
+def make_excerpt(content: str, limit: int = EXCERPT_CHARS) -> str:
+    """The start of a post on one line, cut at a word boundary."""
+    text = " ".join(str(content or "").split())
+    if len(text) <= limit:
+        return text
+    return (text[:limit].rsplit(" ", 1)[0] or text[:limit]) + "…"
+
+
+def render_content(content: str) -> Markup:
+    """HTML for a post body (escaped text; the templates keep its line breaks)."""
+    return escape(content)
+
+
+def encode_cursor(post) -> str:
+    return f"{post['created_at']}_{post['id']}"
+
+
+def decode_cursor(cursor: str):
+    """(created_at, id) from encode_cursor(), or None if it is malformed."""
+    created_at, _, post_id = (cursor or "").rpartition("_")
+    return (created_at, int(post_id)) if created_at and post_id.isdigit() else None
+
+
+class BlogStore:
+    """Posts in SQLite, newest first.
+
+    Posts are ordered by (created_at, id). created_at is an ISO timestamp,
+    so text order is time order and the index can serve the sort.
+    list_posts() pages with "before" cursors rather than OFFSET, so every
+    page costs the same. get_post() serves repeat views from an LRU of
+    cache_size posts with their rendered HTML. The cache belongs to this
+    process, and only its own update_post/delete_post invalidate it; a read
+    that overlaps one of those is returned but not cached.
+    """
+
+    def __init__(self, db_path: str, page_size: int = PAGE_SIZE, cache_size: int = 256):
+        self.db_path = db_path
+        self.page_size = page_size
+        self.cache_size = cache_size
+        self._cache = OrderedDict() # post id -> post dict with "html"; least recently used first
+        self._generation = {} # post id -> times invalidated, so a read that raced a write isn't cached
+        self._lock = threading.Lock()
+        self._local = threading.local() # connection for code running outside a request
+        self.ensure_schema()
+
+    # --- Connections ---
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init_app(self, app):
+        """Close each request's connection when the request ends."""
+        app.teardown_appcontext(self.close_request)
+
+    def connection(self):
+        """This request's connection (opened on first use), or a per-thread one outside requests."""
+        if has_app_context():
+            conn = g.get("_blog_conn")
+            if conn is None:
+                conn = g._blog_conn = self._connect()
+            return conn
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def close_request(self, exc=None):
+        conn = g.pop("_blog_conn", None)
+        if conn is not None:
+            conn.close()
+
+    def ensure_schema(self):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("PRAGMA journal_mode=WAL") # readers don't block the writer
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS posts (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        title TEXT NOT NULL,
+                        content TEXT NOT NULL,
+                        author TEXT NOT NULL,
+                        created_at TEXT NOT NULL,
+                        updated_at TEXT,
+                        excerpt TEXT NOT NULL DEFAULT ''
+                    );
+                    """
+                )
+                columns = {row["name"] for row in conn.execute("PRAGMA table_info(posts)")}
+                if "excerpt" not in columns: # table from before excerpts: add and fill them
+                    conn.execute("ALTER TABLE posts ADD COLUMN excerpt TEXT NOT NULL DEFAULT ''")
+                    conn.create_function("_excerpt", 1, make_excerpt, deterministic=True)
+                    conn.execute("UPDATE posts SET excerpt = _excerpt(content)")
+                # Covering index: list pages are answered from the index alone
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS posts_listing "
+                    "ON posts (created_at DESC, id DESC, title, author, excerpt)"
+                )
+        finally:
+            conn.close()
+
+    # --- Reading ---
+    def list_posts(self, before: str = None, limit: int = None):
+        """One page of posts (id, title, author, created_at, excerpt), newest first.
+
+        Returns (posts, next_cursor); pass next_cursor as `before` for the
+        following page. It is None on the last page.
+        """
+        limit = limit or self.page_size
+        key = decode_cursor(before) if before else None
+        if key:
+            rows = self.connection().execute(
+                f"SELECT {LIST_COLUMNS} FROM posts WHERE (created_at, id) < (?, ?) "
+                "ORDER BY created_at DESC, id DESC LIMIT ?",
+                (*key, limit + 1),
+            ).fetchall()
+        else:
+            rows = self.connection().execute(
+                f"SELECT {LIST_COLUMNS} FROM posts ORDER BY created_at DESC, id DESC LIMIT ?",
+                (limit + 1,),
+            ).fetchall()
+        posts = [dict(r) for r in rows[:limit]]
+        return posts, (encode_cursor(posts[-1]) if len(rows) > limit else None)
+
+    def get_post(self, post_id: int):
+        """The full post with its rendered body under "html", or None.
+
+        Callers get their own copy, so changing it never touches the cache.
+        """
+        with self._lock:
+            post = self._cache.get(post_id)
+            if post is not None:
+                self._cache.move_to_end(post_id)
+                return dict(post)
+            generation = self._generation.get(post_id, 0)
+        row = self.connection().execute("SELECT * FROM posts WHERE id = ?", (post_id,)).fetchone()
+        if row is None:
+            return None
+        post = dict(row)
+        post["html"] = render_content(post["content"])
+        with self._lock:
+            if self._generation.get(post_id, 0) == generation: # not updated or deleted since the read
+                self._cache[post_id] = post
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return dict(post)
+
+    # --- Writing ---
+    def create_post(self, title: str, content: str, author: str) -> int:
+        now = datetime.utcnow().isoformat(timespec="seconds")
+        conn = self.connection()
+        with conn:
+            cur = conn.execute(
+                "INSERT INTO posts(title, content, author, created_at, excerpt) VALUES(?,?,?,?,?)",
+                (title, content, author, now, make_excerpt(content)),
+            )
+        return cur.lastrowid
+
+    def update_post(self, post_id: int, title: str, content: str, author: str) -> None:
+        now = datetime.utcnow().isoformat(timespec="seconds")
+        conn = self.connection()
+        with conn:
+            conn.execute(
+                "UPDATE posts SET title=?, content=?, author=?, updated_at=?, excerpt=? WHERE id=?",
+                (title, content, author, now, make_excerpt(content), post_id),
+            )
+        self.invalidate(post_id)
+
+    def delete_post(self, post_id: int) -> None:
+        conn = self.connection()
+        with conn:
+            conn.execute("DELETE FROM posts WHERE id = ?", (post_id,))
+        self.invalidate(post_id)
+
+    def invalidate(self, post_id: int) -> None:
+        with self._lock:
+            self._cache.pop(post_id, None)
+            self._generation[post_id] = self._generation.get(post_id, 0) + 1
@@ -1,9 +1,13 @@
 import os
 import sqlite3
 import secrets
+import sys
 from datetime import datetime
 from flask import Flask, render_template, request, flash, redirect, url_for, session
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "week15", "day3"))
+from password_service import PoolBusy, hash_password, verify_password
+
 app = Flask(__name__, template_folder="password_templates")
 app.secret_key = "anotherdevsecretchangeme"  # Change this in production
 DB_PATH = os.path.join(os.path.dirname(__file__), "users_reset.db")
@@ -13,16 +17,6 @@ def get_conn():
     return sqlite3.connect(DB_PATH)
 
 
-def simple_hash(pw: str) -> str:
-    # Very simple educational hash (not secure)
-    salt = "slt"
-    h = 0x811C9DC5
-    for ch in (salt + pw):
-        h ^= ord(ch)
-        h = (h * 0x01000193) & 0xFFFFFFFF
-    return f"{h:08x}"
-
-
 def ensure_schema():
     conn = get_conn()
     cur = conn.cursor()
@@ -73,18 +67,22 @@ def create_user(username: str, email: str, password: str):
     cur = conn.cursor()
     cur.execute(
         "INSERT INTO accounts (username, email, password_hash, created_at) VALUES (?,?,?,?)",
-        (username, email, simple_hash(password), datetime.utcnow().isoformat()),
+        (username, email, hash_password(password), datetime.utcnow().isoformat()),
     )
     conn.commit()
     conn.close()
 
 
 def update_password(user_id: int, new_password: str):
+    set_password_hash(user_id, hash_password(new_password))
+
+
+def set_password_hash(user_id: int, pw_hash: str):
     conn = get_conn()
     cur = conn.cursor()
     cur.execute(
         "UPDATE accounts SET password_hash=? WHERE id=?",
-        (simple_hash(new_password), user_id),
+        (pw_hash, user_id),
     )
     conn.commit()
     conn.close()
@@ -159,9 +157,16 @@ def login():
             flash("Invalid credentials.", "error")
         else:
             user_id, uname, email, pw_hash = row
-            if simple_hash(pw) != pw_hash:
+            try:
+                ok, new_hash = verify_password(pw_hash, pw)
+            except PoolBusy:
+                flash("Too many logins right now, please try again.", "error")
+                return render_template("login.html"), 503
+            if not ok:
                 flash("Invalid credentials.", "error")
             else:
+                if new_hash:  # old hash or old parameters: store the upgraded one
+                    set_password_hash(user_id, new_hash)
                 session["user_id"] = user_id
                 session["username"] = uname
                 flash("Logged in.", "success")
@@ -1,8 +1,12 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, session
 import os
 import sqlite3
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "week15", "day3"))
+from password_service import PoolBusy, hash_password, verify_password
+
 app = Flask(__name__, template_folder="user_specific_templates")
 app.secret_key = "userdevsecretchangeme"  # Change this in production
 DB_PATH = os.path.join(os.path.dirname(__file__), "users_specific.db")
@@ -42,15 +46,6 @@ def ensure_schema():
     conn.close()
 
 
-def simple_hash(pw: str) -> str:
-    salt = "slt"
-    h = 0x811C9DC5
-    for ch in (salt + pw):
-        h ^= ord(ch)
-        h = (h * 0x01000193) & 0xFFFFFFFF
-    return f"{h:08x}"
-
-
 def find_user_by_username(username: str):
     conn = get_conn()
     cur = conn.cursor()
@@ -64,15 +59,17 @@ def create_user(username: str, email: str, password: str):
     conn = get_conn()
     cur = conn.cursor()
     cur.execute("INSERT INTO accounts (username, email, password_hash, created_at) VALUES (?,?,?,?)",
-                (username, email, simple_hash(password), datetime.utcnow().isoformat()))
+                (username, email, hash_password(password), datetime.utcnow().isoformat()))
     conn.commit()
     conn.close()
 
 
-def update_last_login(user_id: int):
+def update_last_login(user_id: int, new_hash: str = None):
     conn = get_conn()
     cur = conn.cursor()
     cur.execute("UPDATE accounts SET last_login=? WHERE id=?", (datetime.utcnow().isoformat(), user_id))
+    if new_hash:  # password was hashed with old settings: store the upgraded hash
+        cur.execute("UPDATE accounts SET password_hash=? WHERE id=?", (new_hash, user_id))
     conn.commit()
     conn.close()
 
@@ -138,12 +135,17 @@ def login():
             flash("Invalid credentials.", "error")
         else:
             user_id, uname, email, pw_hash = row
-            if simple_hash(pw) != pw_hash:
+            try:
+                ok, new_hash = verify_password(pw_hash, pw)
+            except PoolBusy:
+                flash("Too many logins right now, please try again.", "error")
+                return render_template("login.html"), 503
+            if not ok:
                 flash("Invalid credentials.", "error")
             else:
                 session["user_id"] = user_id
                 session["username"] = uname
-                update_last_login(user_id)
+                update_last_login(user_id, new_hash)
                 flash("Logged in.", "success")
                 return redirect(url_for("my_items"))
     return render_template("login.html")
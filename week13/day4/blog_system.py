@@ -1,5 +1,6 @@
 import os
 import sqlite3
+import sys
 from datetime import datetime
 
 from flask import (
@@ -13,29 +14,20 @@ from flask import (
 )
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, "blog.db")
-
+sys.path.insert(0, os.path.join(BASE_DIR, "..", "..", "week15", "day3"))
+sys.path.insert(0, os.path.join(BASE_DIR, "..", "day2"))
+from blog_store import BlogStore  # noqa: E402
+from password_service import PoolBusy, hash_password, verify_password  # noqa: E402
 
-def get_conn():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+DB_PATH = os.path.join(BASE_DIR, "blog.db")
+store = BlogStore(DB_PATH)
+get_conn = store.connection  # one connection per request, shared with the auth helpers
 
 
 def ensure_schema():
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS posts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                content TEXT NOT NULL,
-                author TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                updated_at TEXT
-            );
-            """
-        )
+    # posts are created by BlogStore; this adds the accounts table
+    conn = get_conn()
+    with conn:
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS accounts (
@@ -50,64 +42,22 @@ def ensure_schema():
         )
 
 
-def list_posts():
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
-        rows = conn.execute(
-            "SELECT * FROM posts ORDER BY datetime(created_at) DESC"
-        ).fetchall()
-        return rows
-
-
-def get_post(post_id: int):
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
-        row = conn.execute("SELECT * FROM posts WHERE id = ?", (post_id,)).fetchone()
-        return row
-
-
-def create_post(title: str, content: str, author: str) -> int:
-    now = datetime.utcnow().isoformat(timespec="seconds")
-    with sqlite3.connect(DB_PATH) as conn:
-        cur = conn.execute(
-            "INSERT INTO posts(title, content, author, created_at) VALUES(?,?,?,?)",
-            (title, content, author, now),
-        )
-        conn.commit()
-        return cur.lastrowid
-
-
-def update_post(post_id: int, title: str, content: str, author: str) -> None:
-    now = datetime.utcnow().isoformat(timespec="seconds")
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute(
-            "UPDATE posts SET title=?, content=?, author=?, updated_at=? WHERE id=?",
-            (title, content, author, now, post_id),
-        )
-        conn.commit()
-
-
-def delete_post(post_id: int) -> None:
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute("DELETE FROM posts WHERE id = ?", (post_id,))
-        conn.commit()
-
-
 app = Flask(__name__, template_folder="blog_templates")
 app.secret_key = "supersecretkey"
+store.init_app(app)
+with app.app_context():
+    ensure_schema()
 
 
 @app.route("/")
 def index():
-    ensure_schema()
-    posts = list_posts()
-    return render_template("index.html", posts=posts)
+    posts, next_cursor = store.list_posts(before=request.args.get("before"))
+    return render_template("index.html", posts=posts, next_cursor=next_cursor)
 
 
 @app.route("/post/<int:post_id>")
 def view_post(post_id: int):
-    ensure_schema()
-    post = get_post(post_id)
+    post = store.get_post(post_id)
     if not post:
         flash("Post not found.", "error")
         return redirect(url_for("index"))
@@ -116,7 +66,6 @@ def view_post(post_id: int):
 
 @app.route("/create", methods=["GET", "POST"])
 def create():
-    ensure_schema()
     if "user_id" not in session:
         flash("Please login to create a post.", "error")
         return redirect(url_for("login"))
@@ -134,7 +83,7 @@ def create():
             flash("Title and content are required.", "error")
             return render_template("form.html", mode="create", post=None)
 
-        post_id = create_post(title, content, author)
+        post_id = store.create_post(title, content, author)
         flash("Post created.", "success")
         return redirect(url_for("view_post", post_id=post_id))
 
@@ -143,8 +92,7 @@ def create():
 
 @app.route("/edit/<int:post_id>", methods=["GET", "POST"])
 def edit(post_id: int):
-    ensure_schema()
-    post = get_post(post_id)
+    post = store.get_post(post_id)
     if not post:
         flash("Post not found.", "error")
         return redirect(url_for("index"))
@@ -164,7 +112,7 @@ def edit(post_id: int):
             flash("Title and content are required.", "error")
             return render_template("form.html", mode="edit", post=post)
 
-        update_post(post["id"], title, content, author)
+        store.update_post(post["id"], title, content, author)
         flash("Post updated.", "success")
         return redirect(url_for("view_post", post_id=post["id"]))
 
@@ -173,8 +121,7 @@ def edit(post_id: int):
 
 @app.route("/delete/<int:post_id>", methods=["POST"])
 def remove(post_id: int):
-    ensure_schema()
-    post = get_post(post_id)
+    post = store.get_post(post_id)
     if not post:
         flash("Post not found.", "error")
         return redirect(url_for("index"))
@@ -182,7 +129,7 @@ def remove(post_id: int):
     if "user_id" not in session or session.get("username") != post["author"]:
         flash("You can only delete your own posts.", "error")
         return redirect(url_for("index"))
-    delete_post(post["id"])
+    store.delete_post(post["id"])
     flash("Post deleted.", "success")
     return redirect(url_for("index"))
 
@@ -190,42 +137,33 @@ def remove(post_id: int):
 
 # --- Auth helpers and routes ---
 
-def simple_hash(pw: str) -> str:
-    salt = "slt"
-    h = 0x811C9DC5
-    for ch in (salt + pw):
-        h ^= ord(ch)
-        h = (h * 0x01000193) & 0xFFFFFFFF
-    return f"{h:08x}"
-
-
 def find_user_by_username(username: str):
-    with sqlite3.connect(DB_PATH) as conn:
-        cur = conn.execute(
-            "SELECT id, username, email, password_hash FROM accounts WHERE lower(username)=lower(?)",
-            (username,),
-        )
-        return cur.fetchone()
+    cur = get_conn().execute(
+        "SELECT id, username, email, password_hash FROM accounts WHERE lower(username)=lower(?)",
+        (username,),
+    )
+    return cur.fetchone()
 
 
 def create_user(username: str, email: str, password: str):
-    with sqlite3.connect(DB_PATH) as conn:
+    conn = get_conn()
+    with conn:
         conn.execute(
             "INSERT INTO accounts (username, email, password_hash, created_at) VALUES (?,?,?,?)",
-            (username.strip(), email.strip(), simple_hash(password), datetime.utcnow().isoformat()),
+            (username.strip(), email.strip(), hash_password(password), datetime.utcnow().isoformat()),
         )
-        conn.commit()
 
 
-def update_last_login(user_id: int):
-    with sqlite3.connect(DB_PATH) as conn:
+def update_last_login(user_id: int, new_hash: str = None):
+    conn = get_conn()
+    with conn:
         conn.execute("UPDATE accounts SET last_login=? WHERE id=?", (datetime.utcnow().isoformat(), user_id))
-        conn.commit()
+        if new_hash:  # password was hashed with old settings: store the upgraded hash
+            conn.execute("UPDATE accounts SET password_hash=? WHERE id=?", (new_hash, user_id))
 
 
 @app.route("/register", methods=["GET", "POST"])
 def register():
-    ensure_schema()
     if request.method == "POST":
         username = (request.form.get("username") or "").strip()
         email = (request.form.get("email") or "").strip()
@@ -249,7 +187,6 @@ def register():
 
 @app.route("/login", methods=["GET", "POST"])
 def login():
-    ensure_schema()
     if request.method == "POST":
         username = (request.form.get("username") or "").strip()
         pw = request.form.get("password") or ""
@@ -258,12 +195,17 @@ def login():
             flash("Invalid credentials.", "error")
         else:
             user_id, uname, email, pw_hash = row
-            if simple_hash(pw) != pw_hash:
+            try:
+                ok, new_hash = verify_password(pw_hash, pw)
+            except PoolBusy:
+                flash("Too many logins right now, please try again.", "error")
+                return render_template("login.html"), 503
+            if not ok:
                 flash("Invalid credentials.", "error")
             else:
                 session["user_id"] = user_id
                 session["username"] = uname
-                update_last_login(user_id)
+                update_last_login(user_id, new_hash)
                 flash("Logged in.", "success")
                 return redirect(url_for("index"))
     return render_template("login.html")
@@ -276,7 +218,6 @@ def logout():
     return redirect(url_for("index"))
 
 if __name__ == "__main__":
-    ensure_schema()
     app.run(debug=True)
 
 
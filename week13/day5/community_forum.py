@@ -1,4 +1,5 @@
 import os
+import sys
 import time
 from datetime import datetime
 from zoneinfo import ZoneInfo
@@ -9,14 +10,8 @@ from flask_sqlalchemy import SQLAlchemy
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, 'forum.db')
 
-
-def simple_hash(pw: str) -> str:
-    salt = 'slt'
-    h = 0x811C9DC5
-    for ch in (salt + pw):
-        h ^= ord(ch)
-        h = (h * 0x01000193) & 0xFFFFFFFF
-    return f"{h:08x}"
+sys.path.insert(0, os.path.join(BASE_DIR, '..', '..', 'week15', 'day3'))
+from password_service import PoolBusy, hash_password, verify_password  # noqa: E402
 
 
 def login_required(fn):
@@ -60,7 +55,7 @@ class Account(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128), nullable=False)
+    password_hash = db.Column(db.String(256), nullable=False)  # scrypt hashes are ~160 chars
     is_moderator = db.Column(db.Boolean, default=False, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     last_login = db.Column(db.DateTime)
@@ -201,7 +196,7 @@ def register():
                 acc = Account(
                     username=username,
                     email=email,
-                    password_hash=simple_hash(pw),
+                    password_hash=hash_password(pw),
                     is_moderator=is_first_user,
                 )
                 db.session.add(acc)
@@ -219,9 +214,16 @@ def login():
         username = (request.form.get('username') or '').strip()
         pw = request.form.get('password') or ''
         acc = Account.query.filter(db.func.lower(Account.username) == username.lower()).first()
-        if not acc or simple_hash(pw) != acc.password_hash:
+        try:
+            ok, new_hash = verify_password(acc.password_hash, pw) if acc else (False, None)
+        except PoolBusy:
+            flash('Too many logins right now, please try again.', 'error')
+            return render_template('login.html'), 503
+        if not ok:
             flash('Invalid credentials.', 'error')
         else:
+            if new_hash:  # legacy simple_hash or old parameters: upgrade on this login
+                acc.password_hash = new_hash
             session['user_id'] = acc.id
             session['username'] = acc.username
             session['is_moderator'] = 1 if acc.is_moderator else 0
@@ -1,6 +1,8 @@
 from flask import Flask, render_template, request, redirect, url_for, jsonify
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import and_, or_, func
 from datetime import datetime
+import hashlib
 import urllib.request, urllib.error, xml.etree.ElementTree as ET, json
 from email.utils import parsedate_to_datetime
 
@@ -42,6 +44,11 @@ class ContentItem(db.Model):
 	published_at = db.Column(db.DateTime, default=datetime.utcnow)
 	raw = db.Column(db.Text)  # JSON blob of original
 	source = db.relationship('Source', backref=db.backref('items', lazy='dynamic'))
+	# Every listing sorts newest first, optionally within one source
+	__table_args__ = (
+		db.Index('ix_content_item_source_published', 'source_id', 'published_at', 'id'),
+		db.Index('ix_content_item_published', 'published_at', 'id'),
+	)
 
 class Tag(db.Model):
 	id = db.Column(db.Integer, primary_key=True)
@@ -50,10 +57,120 @@ class Tag(db.Model):
 class ItemTag(db.Model):
 	item_id = db.Column(db.Integer, db.ForeignKey('content_item.id'), primary_key=True)
 	tag_id = db.Column(db.Integer, db.ForeignKey('tag.id'), primary_key=True)
+	# Primary key is (item_id, tag_id); tag filtering needs the reverse direction
+	__table_args__ = (db.Index('ix_item_tag_tag_item', 'tag_id', 'item_id'),)
+
+_schema_ready = False
 
 def ensure_schema():
+	"""Create tables and indexes once per process (routes call this on every request)."""
+	global _schema_ready
+	if _schema_ready:
+		return
 	with app.app_context():
 		db.create_all()
+		# create_all skips indexes on tables that already exist (older cms.db files)
+		for table in (ContentItem.__table__, ItemTag.__table__):
+			for index in table.indexes:
+				index.create(bind=db.engine, checkfirst=True)
+	_schema_ready = True
+
+PAGE_SIZE = 25
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(item: ContentItem) -> str:
+	"""Cursor pointing just past `item` in newest-first order."""
+	return f"{item.published_at.isoformat()}_{item.id}"
+
+def decode_cursor(raw: str):
+	"""Parse a cursor from encode_cursor, returning (published_at, id) or None."""
+	if not raw:
+		return None
+	try:
+		stamp, item_id = raw.rsplit('_', 1)
+		return datetime.fromisoformat(stamp), int(item_id)
+	except ValueError:
+		return None
+
+def page_items(query, cursor=None, limit=PAGE_SIZE, tag=None):
+	"""Keyset-paginate a ContentItem query newest first.
+
+	Returns (items, next_cursor); next_cursor is None on the last page.
+	"""
+	if tag:
+		query = (query.join(ItemTag, ItemTag.item_id == ContentItem.id)
+			.join(Tag, Tag.id == ItemTag.tag_id)
+			.filter(Tag.name == tag))
+	position = decode_cursor(cursor)
+	if position:
+		stamp, item_id = position
+		query = query.filter(or_(
+			ContentItem.published_at < stamp,
+			and_(ContentItem.published_at == stamp, ContentItem.id < item_id),
+		))
+	rows = (query.order_by(ContentItem.published_at.desc(), ContentItem.id.desc())
+		.limit(limit + 1).all())
+	next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+	return rows[:limit], next_cursor
+
+def _page_args(default_limit=PAGE_SIZE):
+	"""Read cursor/limit/tag from the query string."""
+	try:
+		limit = int(request.args.get('limit', default_limit))
+	except ValueError:
+		limit = default_limit
+	limit = max(1, min(limit, MAX_PAGE_SIZE))
+	tag = (request.args.get('tag') or '').strip() or None
+	return request.args.get('cursor'), limit, tag
+
+def content_validators():
+	"""ETag and Last-Modified for the current request, based on the latest item.
+
+	Both aggregates are answered from indexes, so a poll that ends in 304
+	never touches the item rows themselves.
+	"""
+	latest_id, latest_published = db.session.query(
+		func.max(ContentItem.id), func.max(ContentItem.published_at)).one()
+	key = f"{latest_id}|{latest_published}|{request.path}|{request.query_string.decode('utf-8', 'ignore')}"
+	etag = hashlib.sha1(key.encode('utf-8')).hexdigest()
+	return etag, latest_published
+
+def cached_response(build):
+	"""Return 304 when the client's validators match, otherwise build() the body."""
+	etag, last_modified = content_validators()
+	if request.if_none_match and request.if_none_match.contains(etag):
+		resp = app.response_class(status=304)
+	elif (not request.if_none_match and last_modified and request.if_modified_since
+			and last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)):
+		resp = app.response_class(status=304)
+	else:
+		resp = build()
+	resp.set_etag(etag)
+	if last_modified:
+		resp.last_modified = last_modified
+	resp.headers['Cache-Control'] = 'no-cache'
+	return resp
+
+def item_json(i: ContentItem) -> dict:
+	return {
+		'id': i.id,
+		'title': i.title,
+		'summary': i.summary,
+		'link': i.link,
+		'source': i.source_id,
+		'published_at': i.published_at.isoformat()
+	}
+
+def paged_json(items, next_cursor, endpoint, **values):
+	"""JSON list of items; the next page is advertised in a Link header so the body stays a plain list."""
+	resp = jsonify([item_json(i) for i in items])
+	if next_cursor:
+		args = {k: v for k, v in request.args.items() if k != 'cursor'}
+		# route values win over query args of the same name (e.g. ?source_id=)
+		next_url = url_for(endpoint, **{**args, **values, 'cursor': next_cursor})
+		resp.headers['Link'] = f'<{next_url}>; rel="next"'
+		resp.headers['X-Next-Cursor'] = next_cursor
+	return resp
 
 def seed_default_sources():
 	"""Insert a few starter sources if database is empty."""
@@ -222,8 +339,10 @@ def ingest_all():
 def items_by_source(source_id):
 	ensure_schema()
 	s = Source.query.get_or_404(source_id)
-	items = s.items.order_by(ContentItem.published_at.desc()).all()
-	return render_template('items.html', items=items, sources=Source.query.all(), active_source=s.id, title=f'Source: {s.name}')
+	cursor, limit, tag = _page_args()
+	items, next_cursor = page_items(s.items, cursor, limit, tag)
+	return render_template('items.html', items=items, sources=Source.query.all(), active_source=s.id,
+		next_cursor=next_cursor, tag=tag, title=f'Source: {s.name}')
 
 @app.route('/item/<int:item_id>')
 def item_view(item_id):
@@ -246,17 +365,21 @@ def api_sources():
 @app.route('/api/content')
 def api_content():
 	ensure_schema()
-	items = ContentItem.query.order_by(ContentItem.published_at.desc()).limit(200).all()
-	return jsonify([
-		{
-			'id': i.id,
-			'title': i.title,
-			'summary': i.summary,
-			'link': i.link,
-			'source': i.source_id,
-			'published_at': i.published_at.isoformat()
-		} for i in items
-	])
+	def build():
+		cursor, limit, tag = _page_args(MAX_PAGE_SIZE)
+		items, next_cursor = page_items(ContentItem.query, cursor, limit, tag)
+		return paged_json(items, next_cursor, 'api_content')
+	return cached_response(build)
+
+@app.route('/api/source/<int:source_id>/content')
+def api_source_content(source_id):
+	ensure_schema()
+	s = Source.query.get_or_404(source_id)
+	def build():
+		cursor, limit, tag = _page_args(MAX_PAGE_SIZE)
+		items, next_cursor = page_items(s.items, cursor, limit, tag)
+		return paged_json(items, next_cursor, 'api_source_content', source_id=s.id)
+	return cached_response(build)
 
 @app.route('/api/content/<int:item_id>')
 def api_content_detail(item_id):
@@ -267,15 +390,9 @@ def api_content_detail(item_id):
 		raw = json.loads(i.raw or '{}')
 	except Exception:
 		pass
-	return jsonify({
-		'id': i.id,
-		'title': i.title,
-		'summary': i.summary,
-		'link': i.link,
-		'source': i.source_id,
-		'published_at': i.published_at.isoformat(),
-		'raw': raw
-	})
+	data = item_json(i)
+	data['raw'] = raw
+	return jsonify(data)
 
 if __name__ == '__main__':
 	ensure_schema()
@@ -1,7 +1,14 @@
 import sys
 import json
+import math
+import time
+import argparse
+import threading
+import http.client
+import urllib.parse
 import urllib.request
 import urllib.error
+from concurrent.futures import ThreadPoolExecutor
 
 
 def request(method, url, headers=None, data=None, timeout=10):
@@ -25,6 +32,88 @@ def request(method, url, headers=None, data=None, timeout=10):
 		return None, {}, str(e).encode("utf-8")
 
 
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "OPTIONS", "TRACE"}
+REDIRECT_CODES = {301, 302, 303, 307, 308}
+MAX_REDIRECTS = 10 # urllib's limit
+
+
+class KeepAliveClient:
+	"""Drop-in replacement for request() that reuses one HTTP connection per host.
+
+	Each thread gets its own connections (http.client is not thread-safe), so a
+	worker that fires thousands of requests only pays the TCP handshake once.
+	"""
+
+	def __init__(self):
+		self._local = threading.local()
+
+	def _connection(self, scheme, netloc, timeout):
+		conns = getattr(self._local, "conns", None)
+		if conns is None:
+			conns = self._local.conns = {}
+		key = (scheme, netloc)
+		conn = conns.get(key)
+		if conn is None:
+			cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+			conn = conns[key] = cls(netloc, timeout=timeout)
+		return conn
+
+	def _drop(self, scheme, netloc):
+		conn = self._local.conns.pop((scheme, netloc), None)
+		if conn is not None:
+			conn.close()
+
+	def __call__(self, method, url, headers=None, data=None, timeout=10):
+		headers = dict(headers or {})
+		body = None
+		if data is not None:
+			if isinstance(data, (dict, list)):
+				body = json.dumps(data).encode("utf-8")
+				headers.setdefault("Content-Type", "application/json")
+			elif isinstance(data, str):
+				body = data.encode("utf-8")
+			else:
+				body = data
+		method = method.upper()
+		# Follow redirects the way urllib (and so request()) does
+		for _ in range(MAX_REDIRECTS + 1):
+			status, resp_headers, payload = self._send(method, url, headers, body, timeout)
+			location = resp_headers.get("Location") or resp_headers.get("location")
+			if status not in REDIRECT_CODES or not location:
+				break
+			if method == "POST" and status in (301, 302, 303):
+				method = "GET"
+			elif method not in ("GET", "HEAD"):
+				break # urllib reports these (e.g. a 307 after POST) instead of following them
+			# Like urllib, the follow-up request carries no body
+			body = None
+			headers = {k: v for k, v in headers.items() if k.lower() not in ("content-type", "content-length")}
+			url = urllib.parse.urljoin(url, location)
+		return status, resp_headers, payload
+
+	def _send(self, method, url, headers, body, timeout):
+		parts = urllib.parse.urlsplit(url)
+		path = parts.path or "/"
+		if parts.query:
+			path += "?" + parts.query
+		# Retry once: the server may have closed an idle keep-alive connection.
+		# Only for idempotent methods; a POST may already have been processed.
+		attempts = 2 if method in IDEMPOTENT_METHODS else 1
+		for attempt in range(attempts):
+			conn = self._connection(parts.scheme, parts.netloc, timeout)
+			try:
+				conn.request(method, path, body=body, headers=headers)
+				resp = conn.getresponse()
+				payload = resp.read()
+				if resp.will_close:
+					self._drop(parts.scheme, parts.netloc)
+				return resp.status, dict(resp.getheaders()), payload
+			except (http.client.HTTPException, OSError) as e:
+				self._drop(parts.scheme, parts.netloc)
+				if attempt == attempts - 1:
+					return None, {}, str(e).encode("utf-8")
+
+
 def assert_contains(haystack: bytes, needle: str) -> bool:
 	try:
 		return needle.encode("utf-8") in haystack
@@ -32,7 +121,7 @@ def assert_contains(haystack: bytes, needle: str) -> bool:
 		return False
 
 
-def run_test(test):
+def run_test(test, send=request):
 	name = test.get("name", "unnamed")
 	method = test.get("method", "GET")
 	url = test["url"]
@@ -42,7 +131,9 @@ def run_test(test):
 	headers = test.get("headers") or {}
 	data = test.get("data")
 
-	status, resp_headers, body = request(method, url, headers, data, timeout=test.get("timeout", 10))
+	started = time.perf_counter()
+	status, resp_headers, body = send(method, url, headers, data, timeout=test.get("timeout", 10))
+	elapsed_ms = (time.perf_counter() - started) * 1000
 	ok = True
 	failures = []
 
@@ -134,6 +225,7 @@ def run_test(test):
 		"url": url,
 		"status": status,
 		"failures": failures,
+		"elapsed_ms": elapsed_ms,
 	}
 
 
@@ -177,24 +269,153 @@ def default_tests(base="http://localhost:5009"):
 	]
 
 
+def percentile(sorted_values, pct):
+	"""Nearest-rank percentile of an already sorted list."""
+	if not sorted_values:
+		return None
+	rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+	return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run_load(tests, workers=4, repeat=1, duration=None):
+	"""Run tests concurrently and return (samples, wall_seconds).
+
+	With duration set, workers keep cycling through the tests until time runs
+	out; otherwise every test runs `repeat` times. Samples are (ok, info) pairs.
+	"""
+	client = KeepAliveClient()
+	lock = threading.Lock()
+	samples = []
+	counter = [0]
+	total = None if duration else len(tests) * repeat
+	started = time.perf_counter()
+	deadline = started + duration if duration else None
+
+	def next_test():
+		with lock:
+			n = counter[0]
+			if total is not None and n >= total:
+				return None
+			if deadline is not None and time.perf_counter() >= deadline:
+				return None
+			counter[0] = n + 1
+		return tests[n % len(tests)]
+
+	def worker():
+		local = []
+		try:
+			while True:
+				t = next_test()
+				if t is None:
+					break
+				local.append(run_test(t, send=client))
+		finally: # keep the samples taken before an error
+			with lock:
+				samples.extend(local)
+
+	with ThreadPoolExecutor(max_workers=workers) as pool:
+		futures = [pool.submit(worker) for _ in range(workers)]
+	for f in futures:
+		f.result() # re-raise a worker's error instead of under-reporting
+	return samples, time.perf_counter() - started
+
+
+def build_report(samples, wall_seconds, workers):
+	"""Per-test latency percentiles, throughput and error rates."""
+	by_name = {}
+	for ok, info in samples:
+		entry = by_name.setdefault(info["name"], {"latencies": [], "errors": 0, "failures": {}})
+		entry["latencies"].append(info["elapsed_ms"])
+		if not ok:
+			entry["errors"] += 1
+			for f in info["failures"]:
+				entry["failures"][f] = entry["failures"].get(f, 0) + 1
+	tests = {}
+	for name, entry in by_name.items():
+		lat = sorted(entry["latencies"])
+		count = len(lat)
+		tests[name] = {
+			"requests": count,
+			"errors": entry["errors"],
+			"error_rate": entry["errors"] / count,
+			"throughput_rps": count / wall_seconds if wall_seconds else None,
+			"mean_ms": sum(lat) / count,
+			"p50_ms": percentile(lat, 50),
+			"p95_ms": percentile(lat, 95),
+			"p99_ms": percentile(lat, 99),
+			"max_ms": lat[-1],
+			"failures": entry["failures"],
+		}
+	total = len(samples)
+	errors = sum(1 for ok, _ in samples if not ok)
+	all_lat = sorted(info["elapsed_ms"] for _, info in samples)
+	return {
+		"workers": workers,
+		"wall_seconds": wall_seconds,
+		"requests": total,
+		"errors": errors,
+		"error_rate": errors / total if total else 0.0,
+		"throughput_rps": total / wall_seconds if wall_seconds else None,
+		"p50_ms": percentile(all_lat, 50),
+		"p95_ms": percentile(all_lat, 95),
+		"p99_ms": percentile(all_lat, 99),
+		"tests": tests,
+	}
+
+
+def print_report(report):
+	print(f"{'Test':40} {'reqs':>7} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8}")
+	for name, r in report["tests"].items():
+		print(f"{name[:40]:40} {r['requests']:>7} {r['error_rate'] * 100:>5.1f}% "
+			f"{r['p50_ms']:>7.1f}ms {r['p95_ms']:>6.1f}ms {r['p99_ms']:>6.1f}ms")
+	print("\nSummary:")
+	print(f"  Requests:   {report['requests']} in {report['wall_seconds']:.2f}s with {report['workers']} workers")
+	print(f"  Throughput: {report['throughput_rps']:.1f} req/s")
+	print(f"  Errors:     {report['errors']} ({report['error_rate'] * 100:.2f}%)")
+
+
+def parse_args(argv):
+	parser = argparse.ArgumentParser(description="Smoke and load tests for the web apps.")
+	parser.add_argument("base", nargs="?", default="http://localhost:5009")
+	parser.add_argument("tests", nargs="?", help="JSON file with test definitions")
+	parser.add_argument("--workers", type=int, default=1, help="concurrent workers (load mode when > 1)")
+	parser.add_argument("--repeat", type=int, default=1, help="run every test this many times")
+	parser.add_argument("--duration", type=float, help="keep running for this many seconds")
+	parser.add_argument("--report", help="write the JSON latency report to this file ('-' for stdout)")
+	return parser.parse_args(argv[1:])
+
+
 def main(argv):
 	# Usage:
-	# python auto_test.py [base_url] [tests.json]
-	base = "http://localhost:5009"
+	# python auto_test.py [base_url] [tests.json] [--workers N] [--repeat N] [--duration S] [--report out.json]
+	args = parse_args(argv)
+	base = args.base.rstrip("/") if args.base else "http://localhost:5009"
 	tests = None
-	if len(argv) >= 2 and argv[1]:
-		base = argv[1].rstrip("/")
-	if len(argv) >= 3 and argv[2]:
-		tests = load_tests_from_file(argv[2])
+	if args.tests:
+		tests = load_tests_from_file(args.tests)
 	if not tests:
 		tests = default_tests(base)
+	for t in tests:
+		if "url" in t and t["url"].startswith("/"):
+			t["url"] = base + t["url"]
+
+	if args.workers > 1 or args.repeat > 1 or args.duration or args.report:
+		workers = max(1, args.workers)
+		samples, wall = run_load(tests, workers=workers, repeat=max(1, args.repeat), duration=args.duration)
+		report = build_report(samples, wall, workers)
+		print_report(report)
+		if args.report == "-":
+			print(json.dumps(report, indent=2))
+		elif args.report:
+			with open(args.report, "w", encoding="utf-8") as f:
+				json.dump(report, f, indent=2)
+			print(f"  Report:     {args.report}")
+		return 0 if report["errors"] == 0 else 1
 
 	passed = 0
 	failed = 0
 	results = []
 	for t in tests:
-		if "url" in t and t["url"].startswith("/"):
-			t["url"] = base + t["url"]
 		ok, info = run_test(t)
 		results.append((ok, info))
 		if ok:
@@ -214,4 +435,3 @@ def main(argv):
 
 if __name__ == "__main__":
 	sys.exit(main(sys.argv))
-
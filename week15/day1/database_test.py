@@ -1,8 +1,12 @@
 import argparse
 import json
+import math
 import os
+import random
 import sqlite3
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 
@@ -12,6 +16,17 @@ def connect(db_path: str) -> sqlite3.Connection:
 	return conn
 
 
+def connect_readonly(db_path: str) -> sqlite3.Connection:
+	"""Read-only connection tuned for large sequential scans; safe to open one per thread."""
+	uri = "file:" + os.path.abspath(db_path).replace("?", "%3f") + "?mode=ro"
+	conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+	conn.row_factory = sqlite3.Row
+	conn.execute("PRAGMA query_only = ON")
+	conn.execute("PRAGMA cache_size = -65536")  # 64 MiB page cache
+	conn.execute("PRAGMA mmap_size = 268435456")  # map up to 256 MiB of the file
+	return conn
+
+
 def table_exists(conn: sqlite3.Connection, table: str) -> bool:
 	cur = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,))
 	return cur.fetchone() is not None
@@ -178,6 +193,247 @@ CHECK_RUNNERS = {
 }
 
 
+def _count_where(cond: str) -> str:
+	"""Aggregate counting the rows where cond is true (whatever values cond produces)."""
+	return f"IFNULL(SUM(CASE WHEN ({cond}) THEN 1 ELSE 0 END), 0)"
+
+
+def _fragment(t: Dict[str, Any]) -> Optional[Tuple[List[str], Any]]:
+	"""Compile a check into aggregate expressions over its table.
+
+	Returns (expressions, judge) where judge(values) -> (ok, msg) receives the
+	computed values in the same order, or None when the check cannot be fused
+	into a single table scan (it then runs on its own).
+	"""
+	check = t.get("check")
+	if check == "not_null":
+		column, where = t["column"], t.get("where")
+		cond = f"{column} IS NULL" + (f" AND ({where})" if where else "")
+		return [_count_where(cond)], lambda v: (
+			v[0] == 0, f"NULL count in {t['table']}.{column} = {v[0]}")
+	if check == "value_range":
+		column = t["column"]
+		inclusive = bool(t.get("inclusive", True))
+		clauses = [f"{column} IS NOT NULL"]
+		if t.get("min") is not None:
+			clauses.append(f"{column} {'>=' if inclusive else '>'} {t['min']}")
+		if t.get("max") is not None:
+			clauses.append(f"{column} {'<=' if inclusive else '<'} {t['max']}")
+		where_ok = " AND ".join(clauses)
+		exprs = [_count_where(f"NOT ({where_ok})"), f"MIN({column})", f"MAX({column})"]
+		return exprs, lambda v: (v[0] == 0, f"out_of_range={v[0]} (min={v[1]}, max={v[2]})")
+	if check == "in_set":
+		column = t["column"]
+		allowed_list = ",".join([repr(v) for v in t["allowed"]])
+		conds = [f"{column} NOT IN ({allowed_list})"]
+		if bool(t.get("ignore_nulls", True)):
+			conds.append(f"{column} IS NOT NULL")
+		return [_count_where(" AND ".join(conds))], lambda v: (
+			v[0] == 0, f"invalid_values={v[0]}")
+	if check == "unique" and len(t["columns"]) == 1:
+		# GROUP BY treats all NULLs as one group, so two NULLs count as a duplicate
+		column = t["columns"][0]
+		exprs = [f"COUNT({column})", f"COUNT(DISTINCT {column})", f"COUNT(*) - COUNT({column})"]
+		return exprs, lambda v: (
+			v[0] == v[1] and v[2] <= 1,
+			"no duplicates" if v[0] == v[1] and v[2] <= 1
+			else f"duplicates: {v[0] - v[1]} repeated values, {v[2]} NULLs")
+	if check == "row_count" and t.get("value") is not None and t.get("op", "=") in COMPARE_OPS:
+		where, op, value = t.get("where"), t.get("op", "="), t["value"]
+		expr = _count_where(where) if where else "COUNT(*)"
+		return [expr], lambda v: (COMPARE_OPS[op](v[0], value), f"count {v[0]} {op} {value}")
+	return None
+
+
+COMPARE_OPS = {
+	"=": lambda a, b: a == b,
+	"==": lambda a, b: a == b,
+	"!=": lambda a, b: a != b,
+	">": lambda a, b: a > b,
+	">=": lambda a, b: a >= b,
+	"<": lambda a, b: a < b,
+	"<=": lambda a, b: a <= b,
+}
+
+
+# Checks whose verdict is a count of bad rows, so they stay meaningful on a
+# subset of rows (a sample, or only the rows appended since the last run)
+ROW_LEVEL_CHECKS = {"not_null", "value_range", "in_set"}
+
+
+def plan_checks(tests: List[Dict[str, Any]], scoped: bool = False) -> List[Dict[str, Any]]:
+	"""Group tests into units of work.
+
+	Fusable checks on the same table become one "scan" unit answered by a
+	single aggregate query; everything else becomes its own "single" unit.
+	Each test is referenced by its index so results can be reported in order.
+	With scoped=True only ROW_LEVEL_CHECKS are fused, because scan units will
+	then only see part of the table; unique and row_count run exhaustively.
+	"""
+	scans: Dict[str, Dict[str, Any]] = {}
+	units: List[Dict[str, Any]] = []
+	for idx, t in enumerate(tests):
+		check = t.get("check")
+		if not check or check not in CHECK_RUNNERS:
+			continue
+		frag = _fragment(t) if t.get("table") else None
+		if scoped and check not in ROW_LEVEL_CHECKS:
+			frag = None
+		if frag is None:
+			units.append({"kind": "single", "label": t.get("name", check), "items": [(idx, t, None)]})
+			continue
+		unit = scans.get(t["table"])
+		if unit is None:
+			unit = scans[t["table"]] = {"kind": "scan", "label": t["table"], "table": t["table"], "items": []}
+			units.append(unit)
+		unit["items"].append((idx, t, frag))
+	return units
+
+
+def wilson_upper(bad: int, n: int, z: float = 1.96) -> float:
+	"""Upper bound of the Wilson score interval for a bad-row rate (95% by default)."""
+	if n == 0:
+		return 1.0
+	p = bad / n
+	denom = 1 + z * z / n
+	centre = p + z * z / (2 * n)
+	margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n))
+	return min(1.0, (centre + margin) / denom)
+
+
+def rowid_bounds(conn: sqlite3.Connection, table: str) -> Optional[Tuple[int, int]]:
+	"""(min rowid, max rowid) via the rowid b-tree, or None for WITHOUT ROWID/empty tables."""
+	try:
+		row = conn.execute(f"SELECT MIN(rowid), MAX(rowid) FROM {table}").fetchone()
+	except sqlite3.Error:
+		return None
+	if row is None or row[0] is None:
+		return None
+	return row[0], row[1]
+
+
+def scoped_source(conn: sqlite3.Connection, table: str, scope: Optional[Dict[str, Any]]) -> Tuple[str, tuple, Dict[str, Any]]:
+	"""FROM clause restricted by the scope, its parameters and facts for reporting.
+
+	scope["mode"] is "sample" (random rowids), "range" (one random contiguous
+	rowid window) or "incremental" (rowids above the stored watermark).
+	"""
+	if not scope:
+		return table, (), {}
+	bounds = rowid_bounds(conn, table)
+	if bounds is None:
+		return table, (), {"note": "no rowid, checked exhaustively"}
+	lo, hi = bounds
+	mode = scope["mode"]
+	if mode == "incremental":
+		last = scope["state"].get(table, 0)
+		info = {"from_rowid": last, "to_rowid": hi}
+		# Upper bound pins the batch so rows appended mid-run are checked next time
+		return f"(SELECT * FROM {table} WHERE rowid > ? AND rowid <= ?)", (last, hi), info
+	span = hi - lo + 1
+	size = min(scope["size"], span)
+	info = {"span": span, "probed": size} # rowids probed; gaps make the rows found fewer
+	if mode == "range":
+		start = random.randint(lo, hi - size + 1)
+		return f"(SELECT * FROM {table} WHERE rowid BETWEEN ? AND ?)", (start, start + size - 1), info
+	rowids = random.sample(range(lo, hi + 1), size)
+	return f"(SELECT * FROM {table} WHERE rowid IN (SELECT value FROM json_each(?)))", (json.dumps(rowids),), info
+
+
+def _run_single(conn: sqlite3.Connection, t: Dict[str, Any]) -> Tuple[bool, str]:
+	try:
+		return CHECK_RUNNERS[t["check"]](conn, t)
+	except Exception as e:
+		return False, f"error: {e}"
+
+
+def execute_unit(db_path: str, unit: Dict[str, Any], scope: Optional[Dict[str, Any]] = None) -> Tuple[List[Tuple[int, bool, str]], float, Dict[str, Any]]:
+	"""Run one planned unit on its own read-only connection.
+
+	Returns ([(test index, ok, msg)], elapsed seconds, scope info). For scan
+	units in a sample/incremental scope, info carries the rows examined and
+	(incremental) the new rowid watermark.
+	"""
+	started = time.perf_counter()
+	conn = connect_readonly(db_path)
+	results: List[Tuple[int, bool, str]] = []
+	info: Dict[str, Any] = {}
+	try:
+		if unit["kind"] == "scan":
+			source, params, info = scoped_source(conn, unit["table"], scope)
+			exprs: List[str] = ["COUNT(*)"]
+			spans = []
+			for idx, t, (frag_exprs, judge) in unit["items"]:
+				spans.append((idx, t, judge, len(exprs), len(frag_exprs)))
+				exprs.extend(frag_exprs)
+			try:
+				row = list(conn.execute(f"SELECT {', '.join(exprs)} FROM {source}", params).fetchone())
+			except sqlite3.Error:
+				row = None  # e.g. one bad column name; rerun each check alone so only that one fails
+			for idx, t, judge, start, n in spans:
+				if row is not None:
+					count, values = row[0], row[start:start + n]
+				else:
+					try:
+						own = conn.execute(f"SELECT COUNT(*), {', '.join(exprs[start:start + n])} FROM {source}", params).fetchone()
+					except sqlite3.Error as e:
+						results.append((idx, False, f"error: {e}"))
+						continue
+					count, values = own[0], list(own)[1:]
+				info["rows"] = count
+				ok, msg = judge(values)
+				if not ok and t["check"] == "unique":
+					ok, msg = _run_single(conn, t)  # rescan only to show an example duplicate
+				elif scope and scope["mode"] in ("sample", "range") and "span" in info:
+					upper = wilson_upper(values[0], count)
+					# Table size estimated from the share of probed rowids that exist
+					est_rows = info["span"] * count / info["probed"] if info["probed"] else 0
+					msg += (f" in sample of {count}; est. bad rate <= {upper:.3%} (95%),"
+						f" ~{int(upper * est_rows)} rows table-wide")
+				results.append((idx, ok, msg))
+		else:
+			for idx, t, _ in unit["items"]:
+				ok, msg = _run_single(conn, t)
+				results.append((idx, ok, msg))
+	finally:
+		conn.close()
+	return results, time.perf_counter() - started, info
+
+
+def _read_state_file(path: str) -> Dict[str, Any]:
+	try:
+		with open(path, "r", encoding="utf-8") as f:
+			data = json.load(f)
+	except (OSError, ValueError):
+		return {}
+	return data if isinstance(data, dict) else {}
+
+
+def load_state(path: str, db_path: str) -> Dict[str, int]:
+	"""Per-table rowid watermarks saved by the last incremental run on db_path.
+
+	The file maps each database's absolute path to its tables' watermarks,
+	so one --state file can be shared by several databases. A file in the
+	old flat {table: rowid} layout is read as this database's state.
+	"""
+	data = _read_state_file(path)
+	if data and all(isinstance(v, int) for v in data.values()):
+		return dict(data)
+	entry = data.get(os.path.abspath(db_path))
+	return dict(entry) if isinstance(entry, dict) else {}
+
+
+def save_state(path: str, db_path: str, state: Dict[str, int]) -> None:
+	data = _read_state_file(path)
+	if data and all(isinstance(v, int) for v in data.values()):
+		data = {} # old flat layout: it was this database's state, replaced below
+	data[os.path.abspath(db_path)] = state
+	tmp = path + ".tmp"
+	with open(tmp, "w", encoding="utf-8") as f:
+		json.dump(data, f, indent=2, sort_keys=True)
+	os.replace(tmp, path)
+
+
 def list_schema(conn: sqlite3.Connection) -> Dict[str, List[str]]:
 	schema: Dict[str, List[str]] = {}
 	for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name"):
@@ -196,23 +452,71 @@ def load_tests(path: str) -> List[Dict[str, Any]]:
 	raise ValueError("Invalid tests file format")
 
 
-def run_tests(db_path: str, tests: List[Dict[str, Any]], verbose: bool = False) -> int:
+def run_tests(db_path: str, tests: List[Dict[str, Any]], verbose: bool = False, jobs: Optional[int] = None,
+		sample: Optional[int] = None, sample_mode: str = "sample", incremental: bool = False,
+		state_path: Optional[str] = None) -> int:
+	"""Run tests against one database.
+
+	sample: check only this many rows per table (random rowids, or one
+	contiguous rowid window with sample_mode="range") and report a 95%
+	upper bound on the bad-row rate.
+	incremental: check only rows above each table's stored max(rowid); the
+	watermark advances for tables whose checks all pass.
+	"""
 	if not os.path.exists(db_path):
 		print(f"DB missing: {db_path}")
 		return 1
-	conn = connect(db_path)
-	passed = 0
-	failed = 0
 	for t in tests:
-		name = t.get("name", f"{t.get('check')} on {t.get('table','')}" )
 		check = t.get("check")
 		if not check or check not in CHECK_RUNNERS:
+			name = t.get("name", f"{t.get('check')} on {t.get('table','')}" )
 			print(f"SKIP - {name} (unknown check: {check})")
+
+	scope: Optional[Dict[str, Any]] = None
+	state: Dict[str, int] = {}
+	if incremental:
+		state_path = state_path or db_path + ".dqstate.json"
+		state = load_state(state_path, db_path)
+		scope = {"mode": "incremental", "state": state}
+	elif sample:
+		scope = {"mode": sample_mode, "size": sample}
+	units = plan_checks(tests, scoped=scope is not None)
+	jobs = max(1, jobs or min(len(units), os.cpu_count() or 1) or 1)
+	scans = sum(1 for u in units if u["kind"] == "scan")
+	print(f"Planned {len(units)} units ({scans} table scans) across {jobs} workers")
+
+	started = time.perf_counter()
+	outcome: Dict[int, Tuple[bool, str]] = {}
+	with ThreadPoolExecutor(max_workers=jobs) as pool:
+		futures = {pool.submit(execute_unit, db_path, u, scope): u for u in units}
+		for done, fut in enumerate(as_completed(futures), 1):
+			unit = futures[fut]
+			try:
+				results, elapsed, info = fut.result()
+			except Exception as e:  # e.g. the database cannot be opened
+				results, elapsed, info = [(idx, False, f"error: {e}") for idx, _, _ in unit["items"]], 0.0, {}
+			for idx, ok, msg in results:
+				outcome[idx] = (ok, msg)
+			detail = ""
+			if "rows" in info:
+				detail = f", {info['rows']} rows"
+			if "from_rowid" in info:
+				detail += f" (rowid {info['from_rowid']}..{info['to_rowid']})"
+			if "note" in info:
+				detail += f" ({info['note']})"
+			print(f"  [{done}/{len(units)}] {unit['label']}: {len(results)} checks in {elapsed:.2f}s{detail}")
+			if incremental and "to_rowid" in info and "rows" in info and all(ok for _, ok, _ in results):
+				state[unit["table"]] = info["to_rowid"]
+	if incremental:
+		save_state(state_path, db_path, state)
+
+	passed = 0
+	failed = 0
+	for idx, t in enumerate(tests):
+		if idx not in outcome:
 			continue
-		try:
-			ok, msg = CHECK_RUNNERS[check](conn, t)
-		except Exception as e:
-			ok, msg = False, f"error: {e}"
+		name = t.get("name", f"{t.get('check')} on {t.get('table','')}" )
+		ok, msg = outcome[idx]
 		if ok:
 			passed += 1
 			print(f"PASS - {name} :: {msg}")
@@ -221,16 +525,30 @@ def run_tests(db_path: str, tests: List[Dict[str, Any]], verbose: bool = False)
 			print(f"FAIL - {name} :: {msg}")
 			if verbose:
 				print("  Test:", json.dumps(t, ensure_ascii=False))
-	print(f"\nSummary: Passed={passed} Failed={failed}")
+	print(f"\nSummary: Passed={passed} Failed={failed} in {time.perf_counter() - started:.2f}s")
 	return 0 if failed == 0 else 2
 
 
+def positive_int(text: str) -> int:
+	value = int(text)
+	if value <= 0:
+		raise argparse.ArgumentTypeError(f"must be a positive integer, got {text}")
+	return value
+
+
 def main(argv: Optional[Sequence[str]] = None) -> int:
 	parser = argparse.ArgumentParser(description="SQLite database validation runner")
 	parser.add_argument("database", nargs="?", help="Path to SQLite .db file")
 	parser.add_argument("tests", nargs="?", help="Path to JSON tests file")
 	parser.add_argument("--scan", action="store_true", help="List tables and columns then exit")
 	parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output on failures")
+	parser.add_argument("-j", "--jobs", type=int, help="Tables to check in parallel (default: CPU count)")
+	mode = parser.add_mutually_exclusive_group()
+	mode.add_argument("--sample", type=positive_int, metavar="N", help="Check a sample of N rows per table instead of every row")
+	mode.add_argument("--incremental", action="store_true", help="Check only rows added since the last incremental run")
+	parser.add_argument("--sample-mode", choices=["sample", "range"], default="sample",
+		help="Random rowids (sample) or one contiguous rowid window (range)")
+	parser.add_argument("--state", help="Watermark file for --incremental (default: <database>.dqstate.json)")
 	args = parser.parse_args(argv)
 
 	if not args.database:
@@ -263,7 +581,9 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
 	exit_code = 0
 	for db, tests_for_db in grouped.items():
 		print(f"\n=== Running {len(tests_for_db)} tests on {db} ===")
-		code = run_tests(db, tests_for_db, verbose=args.verbose)
+		code = run_tests(db, tests_for_db, verbose=args.verbose, jobs=args.jobs,
+			sample=args.sample, sample_mode=args.sample_mode, incremental=args.incremental,
+			state_path=args.state)
 		if code != 0:
 			exit_code = code
 	return exit_code
@@ -0,0 +1,95 @@
+"""Requests/sec per route for the week15 security demos, using Flask's test client.
+
+	python bench_routes.py                                  # every demo, default routes
+	python bench_routes.py sql_injection -n 5000
+	python bench_routes.py xss_protection --route "GET /" --route "POST /post author=a&content=hi"
+
+Each demo runs against a throwaway database in a temporary directory.
+The test client skips the network and WSGI server, so the numbers measure
+the app itself: routing, queries, template rendering and headers.
+"""
+import argparse
+import importlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+from urllib.parse import parse_qsl
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+DEFAULT_ROUTES = {
+		"xss_protection": ["GET /", "POST /post author=bench&content=hello+world"],
+		"sql_injection": ["GET /", "GET /?q=a&sort=email&dir=desc", "GET /api/users"],
+		"secure_password": ["GET /login", "GET /register", "GET /api/me"],
+}
+
+
+def parse_route(spec: str):
+		"""'POST /path a=1&b=2' -> ('POST', '/path', {'a': '1', 'b': '2'})."""
+		parts = spec.split(None, 2)
+		if len(parts) == 1:
+				parts.insert(0, "GET")
+		method, path = parts[0].upper(), parts[1]
+		data = dict(parse_qsl(parts[2])) if len(parts) > 2 else None
+		return method, path, data
+
+
+def bench_route(client, method: str, path: str, data=None, requests: int = 2000, warmup: int = 50) -> dict:
+		for _ in range(warmup):
+				client.open(path, method=method, data=data)
+		times = []
+		status = None
+		for _ in range(requests):
+				start = time.perf_counter()
+				resp = client.open(path, method=method, data=data)
+				times.append(time.perf_counter() - start)
+				status = resp.status_code
+		total = sum(times)
+		return {
+				"route": f"{method} {path}",
+				"status": status,
+				"rps": requests / total if total else float("inf"),
+				"mean_ms": total / requests * 1000,
+				"p95_ms": statistics.quantiles(times, n=20)[-1] * 1000 if requests >= 20 else max(times) * 1000,
+		}
+
+
+def bench_demo(name: str, routes, requests: int, warmup: int) -> list:
+		module = importlib.import_module(name)
+		with tempfile.TemporaryDirectory() as tmp:
+				module.DB_PATH = os.path.join(tmp, f"{name}.db")
+				module.app.config["TESTING"] = True
+				client = module.app.test_client()
+				return [bench_route(client, *parse_route(r), requests=requests, warmup=warmup) for r in routes]
+
+
+def parse_args(argv=None):
+		parser = argparse.ArgumentParser(description="Micro-benchmark the week15 demo routes.")
+		parser.add_argument("demos", nargs="*", metavar="demo",
+				help=f"demo modules to run: {', '.join(DEFAULT_ROUTES)} (default: all)")
+		parser.add_argument("--route", action="append", dest="routes",
+				help='"METHOD /path [form=data]"; repeatable (default: the demo\'s usual routes)')
+		parser.add_argument("-n", "--requests", type=int, default=2000, help="timed requests per route")
+		parser.add_argument("--warmup", type=int, default=50)
+		args = parser.parse_args(argv)
+		unknown = [d for d in args.demos if d not in DEFAULT_ROUTES]
+		if unknown:
+				parser.error(f"unknown demo: {', '.join(unknown)}")
+		return args
+
+
+def main(argv=None) -> int:
+		args = parse_args(argv)
+		print(f"{'route':<42} {'status':>6} {'req/s':>9} {'mean ms':>8} {'p95 ms':>8}")
+		for name in args.demos or list(DEFAULT_ROUTES):
+				print(f"[{name}]")
+				for r in bench_demo(name, args.routes or DEFAULT_ROUTES[name], args.requests, args.warmup):
+						print(f"{r['route']:<42} {r['status']:>6} {r['rps']:>9.0f} {r['mean_ms']:>8.3f} {r['p95_ms']:>8.3f}")
+		return 0
+
+
+if __name__ == "__main__":
+		sys.exit(main())
@@ -0,0 +1,226 @@
+"""Password hashing shared by the Flask apps in weeks 13, 15 and 16.
+
+Hashes use Werkzeug's "method$salt$hash" format, so hashes made by
+werkzeug.security.generate_password_hash verify here and the other way round.
+
+		python password_service.py calibrate --target-ms 150 --write
+
+times scrypt (or PBKDF2) on this machine and saves the parameters to
+password_params.json. verify_password() reports a replacement hash whenever
+the stored one was made with other parameters, another algorithm or the old
+simple_hash, so users move to the current settings as they log in.
+With PASSWORD_VERIFY_WORKERS set, verifications run on a small bounded pool.
+A burst of logins then queues there (or is turned away) instead of using
+every request thread's CPU.
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import statistics
+import string
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+PARAMS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "password_params.json")
+DEFAULT_PARAMS = {"algorithm": "scrypt", "n": 2 ** 15, "r": 8, "p": 1, "digest": "sha256", "iterations": 600000}
+SALT_CHARS = string.ascii_letters + string.digits
+SALT_LENGTH = 16
+MAX_SCRYPT_N = 2 ** 18 # 256 MiB at r=8; calibration never goes above this
+
+
+class PoolBusy(RuntimeError):
+		"""Too many verifications already running or waiting."""
+
+
+def legacy_simple_hash(pw: str) -> str:
+		"""The old week13 FNV-1a hash (no real salt); only used to recognise old hashes."""
+		h = 0x811C9DC5
+		for ch in ("slt" + pw):
+				h ^= ord(ch)
+				h = (h * 0x01000193) & 0xFFFFFFFF
+		return f"{h:08x}"
+
+
+def method_for(params: dict) -> str:
+		if params["algorithm"] == "scrypt":
+				return f"scrypt:{params['n']}:{params['r']}:{params['p']}"
+		if params["algorithm"] == "pbkdf2":
+				return f"pbkdf2:{params['digest']}:{params['iterations']}"
+		raise ValueError(f"unknown algorithm {params['algorithm']!r}")
+
+
+def _derive(method: str, salt: str, pw: str) -> str:
+		"""Hex digest for a Werkzeug method string such as 'scrypt:32768:8:1'."""
+		name, *args = method.split(":")
+		if name == "scrypt":
+				n, r, p = (int(a) for a in args) if args else (2 ** 15, 8, 1)
+				return hashlib.scrypt(pw.encode(), salt=salt.encode(), n=n, r=r, p=p, maxmem=132 * n * r * p).hex()
+		if name == "pbkdf2":
+				digest = args[0] if args else "sha256"
+				iterations = int(args[1]) if len(args) > 1 else 600000
+				return hashlib.pbkdf2_hmac(digest, pw.encode(), salt.encode(), iterations).hex()
+		raise ValueError(f"unsupported hash method {method!r}")
+
+
+class PasswordHasher:
+		"""Hashes with one set of parameters and verifies any supported hash."""
+
+		def __init__(self, params: dict = None):
+				self.params = {**DEFAULT_PARAMS, **(params or {})}
+				self.method = method_for(self.params)
+
+		@classmethod
+		def from_file(cls, path: str = PARAMS_FILE) -> "PasswordHasher":
+				try:
+						with open(path, "r", encoding="utf-8") as f:
+								return cls(json.load(f))
+				except FileNotFoundError:
+						return cls()
+
+		def hash(self, pw: str) -> str:
+				salt = "".join(secrets.choice(SALT_CHARS) for _ in range(SALT_LENGTH))
+				return f"{self.method}${salt}${_derive(self.method, salt, pw)}"
+
+		def needs_rehash(self, stored: str) -> bool:
+				return stored.split("$", 1)[0] != self.method
+
+		def verify(self, stored: str, pw: str):
+				"""(ok, new_hash): new_hash is set when ok and the stored hash is outdated."""
+				if not stored:
+						return False, None
+				if "$" not in stored: # legacy simple_hash
+						ok = hmac.compare_digest(stored, legacy_simple_hash(pw))
+				else:
+						try:
+								method, salt, expected = stored.split("$", 2)
+								ok = hmac.compare_digest(_derive(method, salt, pw), expected)
+						except (ValueError, TypeError): # malformed hash, unknown method or bad parameters
+								ok = False
+				return ok, (self.hash(pw) if ok and self.needs_rehash(stored) else None)
+
+
+class VerifyPool:
+		"""Runs verifications on at most `workers` threads with at most
+		`max_pending` more waiting; past that, submit() raises PoolBusy at once.
+		hashlib releases the GIL while hashing, so the threads run in parallel
+		with request handling.
+		"""
+
+		def __init__(self, hasher: PasswordHasher, workers: int = 2, max_pending: int = 32):
+				self.hasher = hasher
+				self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwverify")
+				self._slots = threading.BoundedSemaphore(workers + max_pending)
+
+		def submit(self, stored: str, pw: str):
+				if not self._slots.acquire(blocking=False):
+						raise PoolBusy("password verification queue is full")
+				try:
+						future = self._executor.submit(self.hasher.verify, stored, pw)
+				except BaseException:
+						self._slots.release()
+						raise
+				future.add_done_callback(lambda _: self._slots.release())
+				return future
+
+		def verify(self, stored: str, pw: str, timeout: float = None):
+				return self.submit(stored, pw).result(timeout)
+
+		def shutdown(self):
+				self._executor.shutdown(wait=True)
+
+
+# --- Module-level service used by the apps ---
+hasher = PasswordHasher.from_file()
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+		global _pool
+		workers = int(os.environ.get("PASSWORD_VERIFY_WORKERS", "0") or 0)
+		if workers <= 0:
+				return None
+		with _pool_lock:
+				if _pool is None:
+						_pool = VerifyPool(hasher, workers, int(os.environ.get("PASSWORD_VERIFY_QUEUE", "32")))
+		return _pool
+
+
+def hash_password(pw: str) -> str:
+		return hasher.hash(pw)
+
+
+def verify_password(stored: str, pw: str):
+		"""(ok, new_hash). Store new_hash when it is not None. Raises PoolBusy when the pool is full."""
+		pool = _get_pool()
+		if pool is None:
+				return hasher.verify(stored, pw)
+		return pool.verify(stored, pw)
+
+
+# --- Calibration ---
+def _time_ms(method: str, samples: int) -> float:
+		times = []
+		for _ in range(samples):
+				start = time.perf_counter()
+				_derive(method, "calibration-salt", "calibration password")
+				times.append((time.perf_counter() - start) * 1000)
+		return statistics.median(times)
+
+
+def calibrate(algorithm: str = "scrypt", target_ms: float = 150, samples: int = 3) -> dict:
+		"""Strongest parameters whose verification takes about target_ms here.
+
+		scrypt: the largest power-of-two n (r=8, p=1) within the target.
+		PBKDF2: iterations scaled linearly from a timed run.
+		"""
+		params = dict(DEFAULT_PARAMS, algorithm=algorithm)
+		if algorithm == "scrypt":
+				n = 2 ** 12
+				while n < MAX_SCRYPT_N:
+						if _time_ms(f"scrypt:{n * 2}:8:1", samples) > target_ms:
+								break
+						n *= 2
+				params.update(n=n, r=8, p=1)
+		elif algorithm == "pbkdf2":
+				probe = 50000
+				per_iteration = _time_ms(f"pbkdf2:sha256:{probe}", samples) / probe
+				params["iterations"] = max(10000, int(target_ms / per_iteration) // 1000 * 1000)
+		else:
+				raise ValueError(f"unknown algorithm {algorithm!r}")
+		params["measured_ms"] = round(_time_ms(method_for(params), samples), 1)
+		return params
+
+
+def parse_args(argv=None):
+		parser = argparse.ArgumentParser(description="Password hashing service tools.")
+		sub = parser.add_subparsers(dest="command", required=True)
+		cal = sub.add_parser("calibrate", help="pick hashing parameters for a target verification time")
+		cal.add_argument("--algorithm", choices=["scrypt", "pbkdf2"], default="scrypt")
+		cal.add_argument("--target-ms", type=float, default=150)
+		cal.add_argument("--samples", type=int, default=3)
+		cal.add_argument("--write", action="store_true", help=f"save to {os.path.basename(PARAMS_FILE)}")
+		return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+		args = parse_args(argv)
+		params = calibrate(args.algorithm, args.target_ms, args.samples)
+		print(json.dumps(params, indent=2))
+		if args.algorithm == "pbkdf2" and params["iterations"] < DEFAULT_PARAMS["iterations"]:
+				print(f"warning: fewer than {DEFAULT_PARAMS['iterations']} PBKDF2 iterations", file=sys.stderr)
+		if args.write:
+				with open(PARAMS_FILE, "w", encoding="utf-8") as f:
+						json.dump(params, f, indent=2)
+				print(f"Saved to {PARAMS_FILE}; existing hashes are upgraded as users log in.")
+		return 0
+
+
+if __name__ == "__main__":
+		sys.exit(main())
@@ -1,11 +1,15 @@
-from flask import Flask, request, session, redirect, url_for, render_template_string, jsonify
+from flask import Flask, request, session, redirect, url_for, jsonify
 import os
+import re
 import sqlite3
-from werkzeug.security import generate_password_hash, check_password_hash
+
+from fast_response import compile_templates, headers_allowing_styles, install_security_headers, render
+from password_service import PoolBusy, hash_password, verify_password
 
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "auth_users.db")
 SECRET = os.environ.get("APP_SECRET_KEY", "dev-secret-change-me")
+_schema_ready = False
 
 
 def get_conn():
@@ -15,6 +19,10 @@ def get_conn():
 
 
 def ensure_schema():
+		# Runs the DDL once per process (again only if the file was removed)
+		global _schema_ready
+		if _schema_ready and os.path.exists(DB_PATH):
+				return
 		conn = get_conn()
 		cur = conn.cursor()
 		cur.execute(
@@ -28,12 +36,15 @@ def ensure_schema():
 		)
 		conn.commit()
 		conn.close()
+		_schema_ready = True
 
 
 app = Flask(__name__)
 app.secret_key = SECRET
 
 
+# The one stylesheet; the CSP allows exactly this text (style="" attributes are blocked)
+STYLE = "p.error { color: red; }"
 BASE = """
 <!doctype html>
 <html lang="en">
@@ -41,6 +52,7 @@ BASE = """
 		<meta charset="utf-8">
 		<meta name="viewport" content="width=device-width, initial-scale=1">
 		<title>{{ title or 'Auth Demo' }}</title>
+		<style>""" + STYLE + """</style>
 	</head>
 	<body>
 		<nav>
@@ -64,7 +76,7 @@ REGISTER = """
 {% extends base %}
 {% block content %}
 	<h1>Create an account</h1>
-	{% if error %}<p style="color:red;">{{ error }}</p>{% endif %}
+	{% if error %}<p class="error">{{ error }}</p>{% endif %}
 	<form method="post">
 		<label>Username <input name="username" value="{{ request.form.get('username','') }}"></label><br>
 		<label>Password <input name="password" type="password"></label><br>
@@ -78,7 +90,7 @@ LOGIN = """
 {% extends base %}
 {% block content %}
 	<h1>Login</h1>
-	{% if error %}<p style="color:red;">{{ error }}</p>{% endif %}
+	{% if error %}<p class="error">{{ error }}</p>{% endif %}
 	<form method="post">
 		<label>Username <input name="username" value="{{ request.form.get('username','') }}"></label><br>
 		<label>Password <input name="password" type="password"></label><br>
@@ -97,13 +109,18 @@ PROFILE = """
 """
 
 
+# Compiled once; REGISTER etc. extend the compiled base (a Template object,
+# which {% extends %} uses directly instead of looking it up by name).
+TEMPLATES = compile_templates(app, base=BASE, register=REGISTER, login=LOGIN, profile=PROFILE)
+install_security_headers(app, headers_allowing_styles(STYLE))
+
+HAS_DIGIT = re.compile(r"\d")
+HAS_ALPHA = re.compile(r"[^\W\d_]")  # any letter, like str.isalpha
+
+
 def strong_enough(pw: str) -> bool:
 		# Simple policy: at least 8 chars, includes digit and letter
-		if len(pw) < 8:
-				return False
-		has_digit = any(c.isdigit() for c in pw)
-		has_alpha = any(c.isalpha() for c in pw)
-		return has_digit and has_alpha
+		return len(pw) >= 8 and HAS_DIGIT.search(pw) is not None and HAS_ALPHA.search(pw) is not None
 
 
 @app.route("/")
@@ -125,7 +142,7 @@ def register():
 				elif not strong_enough(password):
 						error = "Password must be 8+ chars with letters and numbers"
 				else:
-						phash = generate_password_hash(password, method="pbkdf2:sha256", salt_length=16)
+						phash = hash_password(password)
 						conn = get_conn()
 						try:
 								conn.execute(
@@ -139,7 +156,7 @@ def register():
 								error = "Username already exists"
 						finally:
 								conn.close()
-		return render_template_string(REGISTER, base=BASE, error=error)
+		return render(TEMPLATES["register"], base=TEMPLATES["base"], error=error)
 
 
 @app.route("/login", methods=["GET", "POST"])
@@ -152,12 +169,28 @@ def login():
 				conn = get_conn()
 				row = conn.execute("SELECT id, username, password_hash FROM users WHERE username=?", (username,)).fetchone()
 				conn.close()
-				if not row or not check_password_hash(row["password_hash"], password):
+				try:
+						ok, new_hash = verify_password(row["password_hash"], password) if row else (False, None)
+				except PoolBusy:
+						return render(TEMPLATES["login"], base=TEMPLATES["base"], error="Too many logins, try again shortly"), 503
+				if not ok:
 						error = "Invalid username or password"
 				else:
+						if new_hash:  # hashed with older parameters: upgrade it now
+								conn = get_conn()
+								conn.execute("UPDATE users SET password_hash=? WHERE id=?", (new_hash, row["id"]))
+								conn.commit()
+								conn.close()
 						session["user"] = row["username"]
 						return redirect(url_for("profile"))
-		return render_template_string(LOGIN, base=BASE, error=error)
+		return render(TEMPLATES["login"], base=TEMPLATES["base"], error=error)
+
+
+@app.get("/profile")
+def profile():
+		if not session.get("user"):
+				return redirect(url_for("login"))
+		return render(TEMPLATES["profile"], base=TEMPLATES["base"])
 
 
 @app.route("/logout")
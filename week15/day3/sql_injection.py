@@ -1,9 +1,12 @@
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, request, jsonify
 import sqlite3
 import os
 
+from fast_response import compile_templates, install_security_headers, render
+
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "safe_users.db")
+_schema_ready = False
 
 
 def get_conn():
@@ -13,6 +16,10 @@ def get_conn():
 
 
 def ensure_schema():
+		# Runs the DDL and seeding once per process (again only if the file was removed)
+		global _schema_ready
+		if _schema_ready and os.path.exists(DB_PATH):
+				return
 		conn = get_conn()
 		cur = conn.cursor()
 		cur.execute(
@@ -40,6 +47,7 @@ def ensure_schema():
 				)
 				conn.commit()
 		conn.close()
+		_schema_ready = True
 
 
 app = Flask(__name__)
@@ -92,8 +100,22 @@ HTML = """
 """
 
 
+TEMPLATES = compile_templates(app, home=HTML)
+install_security_headers(app)
+
+
 ALLOWED_SORTS = {"username": "username", "email": "email", "role": "role"}
 ALLOWED_DIRS = {"asc": "ASC", "desc": "DESC"}
+# The home query for every allowed (sort, dir, filtered) combination, built once;
+# request values only pick a key, so they never reach the SQL text.
+HOME_QUERIES = {
+		(sort, direction, filtered): "SELECT id, username, email, role FROM users"
+		+ (" WHERE username LIKE ?" if filtered else "")
+		+ f" ORDER BY {col} {order} LIMIT 100"
+		for sort, col in ALLOWED_SORTS.items()
+		for direction, order in ALLOWED_DIRS.items()
+		for filtered in (False, True)
+}
 
 
 @app.route("/")
@@ -102,21 +124,15 @@ def home():
 		q = (request.args.get("q") or "").strip()
 		sort = request.args.get("sort") or "username"
 		direction = request.args.get("dir") or "asc"
-		sort_col = ALLOWED_SORTS.get(sort, "username")
-		sort_dir = ALLOWED_DIRS.get(direction.lower(), "ASC")
-
-		sql = f"SELECT id, username, email, role FROM users"
-		params = []
-		if q:
-				sql += " WHERE username LIKE ?"
-				params.append(f"%{q}%")
-		sql += f" ORDER BY {sort_col} {sort_dir}"
-		sql += " LIMIT 100"
+		sort_key = sort if sort in ALLOWED_SORTS else "username"
+		dir_key = direction.lower() if direction.lower() in ALLOWED_DIRS else "asc"
+		sql = HOME_QUERIES[sort_key, dir_key, bool(q)]
+		params = [f"%{q}%"] if q else []
 
 		conn = get_conn()
 		rows = conn.execute(sql, params).fetchall()
 		conn.close()
-		return render_template_string(HTML, rows=rows, q=q, sort=sort, dir=direction)
+		return render(TEMPLATES["home"], rows=rows, q=q, sort=sort, dir=direction)
 
 
 @app.get("/api/users")
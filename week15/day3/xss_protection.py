@@ -1,10 +1,13 @@
-from flask import Flask, request, render_template_string, redirect, url_for, make_response
+from flask import Flask, request, redirect, url_for, make_response
 import os
 import sqlite3
 from datetime import datetime
 
+from fast_response import compile_templates, install_security_headers, render
+
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "xss_messages.db")
+_schema_ready = False
 
 
 def get_conn():
@@ -14,6 +17,10 @@ def get_conn():
 
 
 def ensure_schema():
+		# Runs the DDL once per process (again only if the file was removed)
+		global _schema_ready
+		if _schema_ready and os.path.exists(DB_PATH):
+				return
 		conn = get_conn()
 		cur = conn.cursor()
 		cur.execute(
@@ -28,6 +35,7 @@ def ensure_schema():
 		)
 		conn.commit()
 		conn.close()
+		_schema_ready = True
 
 
 app = Flask(__name__)
@@ -76,18 +84,9 @@ HTML = """
 """
 
 
-def apply_security_headers(resp):
-		# Content Security Policy: no inline scripts, no external scripts/styles
-		csp = "default-src 'self'; script-src 'none'; object-src 'none'; base-uri 'self'; frame-ancestors 'none'"
-		resp.headers['Content-Security-Policy'] = csp
-		resp.headers['X-Content-Type-Options'] = 'nosniff'
-		resp.headers['X-Frame-Options'] = 'DENY'
-		return resp
-
-
-@app.after_request
-def _after(resp):
-		return apply_security_headers(resp)
+TEMPLATES = compile_templates(app, home=HTML)
+# Content Security Policy (no inline or external scripts), nosniff and DENY framing
+apply_security_headers = install_security_headers(app)
 
 
 @app.get("/")
@@ -96,7 +95,7 @@ def home():
 		conn = get_conn()
 		rows = conn.execute("SELECT id, author, content, created_at FROM messages ORDER BY id DESC LIMIT 100").fetchall()
 		conn.close()
-		return render_template_string(HTML, rows=rows)
+		return render(TEMPLATES["home"], rows=rows)
 
 
 @app.post("/post")
@@ -109,7 +108,7 @@ def post_msg():
 				conn = get_conn()
 				rows = conn.execute("SELECT id, author, content, created_at FROM messages ORDER BY id DESC LIMIT 100").fetchall()
 				conn.close()
-				resp = make_response(render_template_string(HTML, rows=rows))
+				resp = make_response(render(TEMPLATES["home"], rows=rows))
 				return resp
 		conn = get_conn()
 		conn.execute(
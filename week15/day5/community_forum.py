@@ -1,4 +1,5 @@
 import os
+import sys
 import time
 import secrets
 import logging
@@ -8,20 +9,12 @@ from zoneinfo import ZoneInfo
 
 from flask import Flask, render_template, request, redirect, url_for, session, flash, make_response
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, 'forum.db')
 
-
-def simple_hash(pw: str) -> str:
-    """Deprecated: kept for backward compatibility if existing data uses it."""
-    salt = 'slt'
-    h = 0x811C9DC5
-    for ch in (salt + pw):
-        h ^= ord(ch)
-        h = (h * 0x01000193) & 0xFFFFFFFF
-    return f"{h:08x}"
+sys.path.insert(0, os.path.join(BASE_DIR, '..', 'day3'))
+from password_service import PoolBusy, hash_password, verify_password  # noqa: E402
 
 
 def login_required(fn):
@@ -76,7 +69,7 @@ class Account(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128), nullable=False)
+    password_hash = db.Column(db.String(256), nullable=False)  # scrypt hashes are ~160 chars
     is_moderator = db.Column(db.Boolean, default=False, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     last_login = db.Column(db.DateTime)
@@ -278,7 +271,7 @@ def make_test_user():
         acc = Account(
             username=username,
             email=email,
-            password_hash=generate_password_hash(pw, method='pbkdf2:sha256', salt_length=16),
+            password_hash=hash_password(pw),
             is_moderator=is_first_user,
         )
         db.session.add(acc)
@@ -335,7 +328,7 @@ def register():
                 acc = Account(
                     username=username,
                     email=email,
-                    password_hash=generate_password_hash(pw, method='pbkdf2:sha256', salt_length=16),
+                    password_hash=hash_password(pw),
                     is_moderator=is_first_user,
                 )
                 db.session.add(acc)
@@ -355,17 +348,18 @@ def login():
         username = (request.form.get('username') or '').strip()
         pw = request.form.get('password') or ''
         acc = Account.query.filter(db.func.lower(Account.username) == username.lower()).first()
-        # Support legacy simple_hash for existing users, but prefer PBKDF2
-        valid = False
-        if acc:
-            try:
-                valid = check_password_hash(acc.password_hash, pw)
-            except Exception:
-                # if stored hash is legacy simple_hash
-                valid = (simple_hash(pw) == acc.password_hash)
-        if not acc or not valid:
+        # Legacy simple_hash and PBKDF2 hashes still verify; they are replaced
+        # with a hash at the current parameters on a successful login.
+        try:
+            valid, new_hash = verify_password(acc.password_hash, pw) if acc else (False, None)
+        except PoolBusy:
+            flash('Too many logins right now, please try again.', 'error')
+            return render_template('login.html', csrf_token=get_csrf_token()), 503
+        if not valid:
             flash('Invalid credentials.', 'error')
         else:
+            if new_hash:
+                acc.password_hash = new_hash
             session['user_id'] = acc.id
             session['username'] = acc.username
             session['is_moderator'] = 1 if acc.is_moderator else 0
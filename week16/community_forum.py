@@ -4,13 +4,15 @@ from datetime import datetime
 from flask import Flask, request, render_template, redirect, url_for, session, flash
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import joinedload
-from werkzeug.security import generate_password_hash, check_password_hash
 import json
 import time
 # from urllib.request import urlopen  # removed with Explore feature
 from urllib.error import URLError
 import logging
 from functools import wraps
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'week15', 'day3'))
+from password_service import PoolBusy, hash_password, verify_password  # noqa: E402
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger('audit')
 
@@ -40,7 +42,7 @@ class User(db.Model):
 	id = db.Column(db.Integer, primary_key=True)
 	username = db.Column(db.String(80), unique=True, nullable=False, index=True)
 	email = db.Column(db.String(120), unique=True, nullable=False, index=True)
-	password_hash = db.Column(db.String(128), nullable=False)
+	password_hash = db.Column(db.String(256), nullable=False)  # scrypt hashes are ~160 chars
 	is_admin = db.Column(db.Boolean, default=False, nullable=False)
 	bio = db.Column(db.Text)
 	created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -284,7 +286,7 @@ def register():
 		elif User.query.filter(db.func.lower(User.email) == email.lower()).first():
 			flash('Email already in use.', 'error')
 		else:
-			u = User(username=username, email=email, password_hash=generate_password_hash(pw))
+			u = User(username=username, email=email, password_hash=hash_password(pw))
 			db.session.add(u)
 			db.session.commit()
 			log.info('register success user=%s ip=%s', username, ip)
@@ -310,11 +312,19 @@ def login():
 			flash('Too many requests. Please try again later.', 'error')
 			return redirect(url_for('login'))
 		u = User.query.filter(db.func.lower(User.username) == username.lower()).first()
-		if not u or not check_password_hash(u.password_hash, pw):
+		try:
+			ok, new_hash = verify_password(u.password_hash, pw) if u else (False, None)
+		except PoolBusy:
+			flash('Too many logins right now. Please try again shortly.', 'error')
+			return redirect(url_for('login'))
+		if not ok:
 			flash('Invalid credentials.', 'error')
 			_record_login_failure(username, ip)
 			log.warning('login failed user=%s ip=%s', username, ip)
 		else:
+			if new_hash:  # hashed with older parameters: upgrade on this login
+				u.password_hash = new_hash
+				db.session.commit()
 			session['uid'] = u.id
 			session['uname'] = u.username
 			# mark session as permanent and set last activity
@@ -164,5 +164,22 @@ class ForumTestCase(unittest.TestCase):
         self.assertIn(rv.json.get('status'), ('ok', 'db-error'))
 
 
+    def test_login_upgrades_legacy_hash(self):
+        service = sys.modules['password_service']  # imported by the app
+        u = User(username='old', email='old@example.com', password_hash=service.legacy_simple_hash('Password1'))
+        db.session.add(u)
+        db.session.commit()
+        rv = self.client.post('/login', data={
+            'username': 'old',
+            'password': 'Password1',
+            'csrf_token': 'x',
+        }, follow_redirects=True)
+        self.assertEqual(rv.status_code, 200)
+        self.assertIn(b'Logged in', rv.data)
+        upgraded = db.session.get(User, u.id).password_hash
+        self.assertTrue(upgraded.startswith(service.hasher.method + '$'))
+        self.assertEqual(service.verify_password(upgraded, 'Password1'), (True, None))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,50 @@
+# Benchmark: scalar math_util calls in a loop vs. one math_batch call per operation.
+import math
+import random
+import sys
+import time
+
+import math_batch
+import math_util
+
+N = 200_000
+FACTORIAL_N = 5_000 # factorials are big ints, so fewer of them
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    rng = random.Random(0)
+    xs = [rng.uniform(0, 1000) for _ in range(N)]
+    ys = [rng.uniform(-5, 5) for _ in range(N)]
+    bad_xs = [-x if i % 100 == 0 else x for i, x in enumerate(xs)] # 1% out of domain
+    bad_ys = [0.0 if i % 100 == 0 else y for i, y in enumerate(ys)]
+    angles = [rng.uniform(-math.pi, math.pi) for _ in range(N)]
+    ns = [rng.randint(0, 3000) for _ in range(FACTORIAL_N)]
+
+    cases = [ # name, scalar loop, batch call, element count
+        ("add", lambda: [math_util.add(x, y) for x, y in zip(xs, ys)], lambda: math_batch.add(xs, ys), N),
+        ("divide", lambda: [math_util.divide(x, y) for x, y in zip(xs, ys)], lambda: math_batch.divide(xs, ys), N),
+        ("power", lambda: [math_util.power(x, 2) for x in xs], lambda: math_batch.power(xs, 2), N),
+        ("square_root", lambda: [math_util.square_root(x) for x in xs], lambda: math_batch.square_root(xs), N),
+        ("divide (1% /0)", lambda: [math_util.divide(x, y) for x, y in zip(xs, bad_ys)], lambda: math_batch.divide(xs, bad_ys), N),
+        ("sqrt (1% <0)", lambda: [math_util.square_root(x) for x in bad_xs], lambda: math_batch.square_root(bad_xs), N),
+        ("logarithm", lambda: [math_util.logarithm(x, 10) for x in xs], lambda: math_batch.logarithm(xs, 10), N),
+        ("sine", lambda: [math_util.sine(a) for a in angles], lambda: math_batch.sine(angles), N),
+        ("tangent", lambda: [math_util.tangent(a) for a in angles], lambda: math_batch.tangent(angles), N),
+        ("factorial", lambda: [math_util.factorial(n) for n in ns], lambda: math_batch.factorial(ns), FACTORIAL_N),
+    ]
+    print(f"NumPy: {'yes' if math_batch.np is not None else 'no (array.array path)'}")
+    print(f"{'operation':<16}{'scalar/sec':>14}{'batch/sec':>14}{'speedup':>9}")
+    for name, scalar, batch, count in cases:
+        t_scalar, t_batch = timed(scalar), timed(batch)
+        print(f"{name:<16}{count / t_scalar:>14,.0f}{count / t_batch:>14,.0f}{t_scalar / t_batch:>8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+# batch versions of the math_util functions
+# Each function takes sequences (lists, tuples, array.array or NumPy arrays) and
+# returns a BatchResult: the values plus an error mask, instead of error strings.
+import math
+import operator
+from array import array
+from functools import lru_cache
+from itertools import repeat
+from typing import Any, NamedTuple
+
+try: # NumPy is optional; without it everything runs on array.array
+    import numpy as np
+except ImportError:
+    np = None
+
+NAN = float("nan")
+FACTORIAL_TABLE_SIZE = 1024 # n! for n below this is served from a precomputed table
+
+
+class BatchResult(NamedTuple):
+    '''values[i] is the result for element i; errors[i] is 1/True where the
+    scalar function would have returned an error string (values[i] is then NaN,
+    or None for factorial).
+
+    values: array('d'), list (factorial) or numpy.ndarray
+    errors: bytearray or numpy bool array
+    '''
+    values: Any
+    errors: Any
+
+    def ok(self) -> bool:
+        '''True if no element failed.'''
+        return not any(self.errors)
+
+
+def _uses_numpy(*args) -> bool:
+    return np is not None and any(isinstance(a, np.ndarray) for a in args)
+
+
+def _columns(*args):
+    '''(length, columns): sequences as-is, scalars repeated to the common length.'''
+    lengths = {len(a) for a in args if not isinstance(a, (int, float))}
+    if len(lengths) > 1:
+        raise ValueError(f"length mismatch: {sorted(lengths)}")
+    n = lengths.pop() if lengths else 1
+    return n, [repeat(float(a), n) if isinstance(a, (int, float)) else a for a in args]
+
+
+def _safe(fn):
+    '''Wrap a scalar math function so domain/overflow/type errors (and
+    non-numeric results, e.g. "ab" * 2) give NaN.'''
+    def wrapped(*args):
+        try:
+            value = fn(*args)
+            return float(value) if isinstance(value, (int, float)) else NAN
+        except (ValueError, OverflowError, ZeroDivisionError, TypeError):
+            return NAN
+    return wrapped
+
+
+def _apply(fn, *args, bad=None) -> BatchResult:
+    '''map() fn over the columns in C. Only if some element raises is a second
+    pass made with a NaN-on-error wrapper; the mask is then the NaN results.
+
+    bad(*xs) marks inputs that are errors even though fn accepts them
+    (e.g. log base <= 1).
+    '''
+    n, cols = _columns(*args)
+    if bad is None:
+        try:
+            return BatchResult(array("d", map(fn, *cols)), bytearray(n))
+        except (ValueError, OverflowError, ZeroDivisionError, TypeError): # TypeError: e.g. "4" or None
+            pass
+        return _masked(fn, *args)
+    cols = [list(c) for c in cols]
+    return _masked(fn, *cols, flagged=bytearray(map(bad, *cols)))
+
+
+def _masked(fn, *args, flagged=None) -> BatchResult:
+    '''The slow pass of _apply: NaN-on-error values and their error mask.'''
+    n, cols = _columns(*args)
+    values = array("d", map(_safe(fn), *cols))
+    if flagged is None:
+        flagged = bytearray(n)
+    errors = bytearray(map(math.isnan, values))
+    for i in [i for i, err in enumerate(errors) if err]: # NaN in, NaN out is not an error
+        if not flagged[i] and any(c[i] != c[i] for c in cols if not isinstance(c, repeat)):
+            errors[i] = 0
+    for i in [i for i, err in enumerate(flagged) if err]:
+        values[i], errors[i] = NAN, 1
+    return BatchResult(values, errors)
+
+
+def add(*seqs) -> BatchResult:
+    '''Element-wise sum of the sequences.
+
+    example: add([1, 2], [3, 4], [5, 6]).values = array('d', [9.0, 12.0])
+    '''
+    if _uses_numpy(*seqs):
+        total = np.sum(np.broadcast_arrays(*[np.asarray(s, dtype=float) for s in seqs]), axis=0)
+        return BatchResult(total, np.zeros(total.shape, dtype=bool))
+    n, cols = _columns(*seqs)
+    if not cols:
+        return BatchResult(array("d", [0.0]), bytearray(1))
+    try:
+        total = array("d", map(math.fsum, zip(*cols)))
+    except (ValueError, OverflowError, TypeError): # e.g. "a", None, or inf + -inf
+        return _masked(_fsum_of, *seqs)
+    return BatchResult(total, bytearray(len(total)))
+
+
+def _fsum_of(*xs) -> float:
+    return math.fsum(xs)
+
+
+def subtract(a, b=0) -> BatchResult:
+    '''Element-wise a - b (b may be a scalar).'''
+    if _uses_numpy(a, b):
+        values = np.asarray(a, dtype=float) - np.asarray(b, dtype=float)
+        return BatchResult(values, np.zeros(values.shape, dtype=bool))
+    return _apply(operator.sub, a, b)
+
+
+def multiply(a, b=1) -> BatchResult:
+    '''Element-wise a * b (b may be a scalar).'''
+    if _uses_numpy(a, b):
+        values = np.asarray(a, dtype=float) * np.asarray(b, dtype=float)
+        return BatchResult(values, np.zeros(values.shape, dtype=bool))
+    return _apply(operator.mul, a, b)
+
+
+def divide(a, b=1) -> BatchResult:
+    '''Element-wise a / b; errors where b is 0.
+
+    example: divide([10, 1], [2, 0]) -> values [5.0, nan], errors [0, 1]
+    '''
+    if _uses_numpy(a, b):
+        a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+        errors = b == 0
+        return _np_result(a / np.where(errors, 1.0, b), errors)
+    return _apply(operator.truediv, a, b)
+
+
+def power(a, b=2) -> BatchResult:
+    '''Element-wise a ** b; errors on overflow or a complex result (negative base, fractional exponent).'''
+    if _uses_numpy(a, b):
+        a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+        with np.errstate(all="ignore"):
+            values = np.power(a, b)
+        errors = ~np.isfinite(values) & np.isfinite(a) & np.isfinite(b)
+        return _np_result(values, errors)
+    return _apply(math.pow, a, b)
+
+
+def square_root(a) -> BatchResult:
+    '''Element-wise square root; errors where a < 0.'''
+    if _uses_numpy(a):
+        a = np.asarray(a, dtype=float)
+        errors = a < 0
+        return _np_result(np.sqrt(np.where(errors, 0.0, a)), errors)
+    return _apply(math.sqrt, a)
+
+
+def logarithm(a, base=10) -> BatchResult:
+    '''Element-wise log(a, base); errors where a <= 0 or base <= 1.'''
+    if _uses_numpy(a, base):
+        a, base = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(base, dtype=float))
+        errors = (a <= 0) | (base <= 1)
+        safe_a, safe_b = np.where(errors, 1.0, a), np.where(errors, 2.0, base)
+        return _np_result(np.log(safe_a) / np.log(safe_b), errors)
+    if isinstance(base, (int, float)) and base > 1: # common case: one valid base
+        return _apply(math.log, a, base)
+    return _apply(math.log, a, base, bad=lambda x, b: not (isinstance(b, (int, float)) and b > 1))
+
+
+def _trig(fn, np_fn, angles) -> BatchResult:
+    if _uses_numpy(angles):
+        angles = np.asarray(angles, dtype=float)
+        with np.errstate(invalid="ignore"):
+            values = np_fn(angles)
+        return _np_result(values, np.isinf(angles))
+    return _apply(fn, angles)
+
+
+def sine(angles) -> BatchResult:
+    '''Element-wise sin (radians); errors for infinite angles.'''
+    return _trig(math.sin, np and np.sin, angles)
+
+
+def cosine(angles) -> BatchResult:
+    '''Element-wise cos (radians); errors for infinite angles.'''
+    return _trig(math.cos, np and np.cos, angles)
+
+
+def tangent(angles) -> BatchResult:
+    '''Element-wise tan (radians); errors for infinite angles.'''
+    return _trig(math.tan, np and np.tan, angles)
+
+
+def absolute(values) -> BatchResult:
+    '''Element-wise |x|.'''
+    if _uses_numpy(values):
+        values = np.abs(np.asarray(values, dtype=float))
+        return BatchResult(values, np.zeros(values.shape, dtype=bool))
+    return _apply(abs, values)
+
+
+# --- factorial ---
+def _factorial_table(size: int) -> list:
+    table = [1] * size
+    for i in range(1, size):
+        table[i] = table[i - 1] * i
+    return table
+
+
+_FACTORIALS = _factorial_table(FACTORIAL_TABLE_SIZE)
+
+
+@lru_cache(maxsize=256)
+def _large_factorial(n: int) -> int:
+    return math.factorial(n) # C divide-and-conquer; faster than any pure-Python prime swing
+
+
+def factorial_of(n: int) -> int:
+    '''Memoized n! for a single non-negative int.'''
+    return _FACTORIALS[n] if n < FACTORIAL_TABLE_SIZE else _large_factorial(n)
+
+
+def _factorial_arg(n) -> bool:
+    '''True if n! is defined for n; anything else (e.g. '3' or None) is an error for that element.'''
+    return isinstance(n, (int, float)) and float(n).is_integer() and n >= 0
+
+
+def factorial(ns) -> BatchResult:
+    '''Element-wise n! as exact ints (values is a list); errors for negative, non-integer or non-numeric n.
+
+    Small n come from a table. Large n are computed in ascending order, each
+    one multiplying onto the previous result when that is cheaper.
+    '''
+    if _uses_numpy(ns):
+        ns = ns.tolist()
+    ns = list(ns)
+    errors = bytearray(not _factorial_arg(n) for n in ns)
+    values: list = [None] * len(ns)
+    large = []
+    for i, (n, bad) in enumerate(zip(ns, errors)):
+        if bad:
+            continue
+        n = int(n)
+        if n < FACTORIAL_TABLE_SIZE:
+            values[i] = _FACTORIALS[n]
+        else:
+            large.append((n, i))
+    prev_n, prev = FACTORIAL_TABLE_SIZE - 1, _FACTORIALS[-1]
+    for n, i in sorted(large):
+        if n != prev_n:
+            if n - prev_n < prev_n // 8: # short gap: extend the previous product
+                prev = prev * math.prod(range(prev_n + 1, n + 1))
+            else:
+                prev = _large_factorial(n)
+            prev_n = n
+        values[i] = prev
+    return BatchResult(values, errors)
+
+
+if __name__ == "__main__":
+    # simple tests
+    print("Divide:", divide([10, 1, 9], [2, 0, 3]))
+    print("Square Root:", square_root([16, -1, 2]))
+    print("Logarithm:", logarithm([100, 0, 8], [10, 10, 2]))
+    print("Factorial:", factorial([5, -1, 20]).values)
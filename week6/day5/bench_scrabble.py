@@ -0,0 +1,71 @@
+# Benchmark for the Scrabble scoring engine.
+# Scores a 300k-word list (the file given on the command line, or a generated one)
+# with the old letters.index() scorer and the translate-table scorer, then times
+# the streaming batch API and rack lookups in the anagram index.
+import os
+import random
+import sys
+import tempfile
+import time
+
+from cs50_scrabble import get_score, letters, score_file, values
+from scrabble_words import AnagramIndex
+
+WORDS = 300_000
+RACKS = 1000
+
+
+def old_get_score(word): # the original per-letter list search, kept for comparison
+    return sum([values[letters.index(char)] for char in word.upper() if char in letters])
+
+
+def make_words(count, seed=0):
+    rng = random.Random(seed)
+    alphabet = "EEEEEEEEEEEEAAAAAAAAAIIIIIIIIIOOOOOOOONNNNNNRRRRRRTTTTTTLLLLSSSSUUUUDDDDGGGBBCCMMPPFFHHVVWWYYKJXQZ"
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(2, 9))) for _ in range(count)]
+
+
+def rate(count, seconds):
+    return f"{count / seconds:>14,.0f} words/sec"
+
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(folder, "words.txt")
+        if len(sys.argv) <= 1:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(make_words(WORDS)) + "\n")
+        with open(path, "r", encoding="utf-8") as f:
+            words = [line.strip() for line in f if line.strip()]
+        print(f"{len(words)} words from {path}")
+
+        start = time.perf_counter()
+        old_total = sum(old_get_score(w) for w in words)
+        print(f"{'letters.index()':<22}{rate(len(words), time.perf_counter() - start)}")
+
+        start = time.perf_counter()
+        new_total = sum(get_score(w) for w in words)
+        print(f"{'translate table':<22}{rate(len(words), time.perf_counter() - start)}")
+        assert old_total == new_total, "scorers disagree"
+
+        start = time.perf_counter()
+        streamed = sum(score for _, score in score_file(path))
+        print(f"{'score_file (stream)':<22}{rate(len(words), time.perf_counter() - start)}")
+        assert streamed == new_total
+
+        start = time.perf_counter()
+        index = AnagramIndex.from_file(path)
+        print(f"{'index build':<22}{rate(len(words), time.perf_counter() - start)}")
+
+        rng = random.Random(1)
+        racks = ["".join(rng.choice("AEIOURSTLNDGBCMP") for _ in range(7)) for _ in range(RACKS)]
+        start = time.perf_counter()
+        for rack in racks:
+            index.best(rack)
+        elapsed = time.perf_counter() - start
+        print(f"{'rack lookups':<22}{RACKS / elapsed:>14,.0f} racks/sec")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
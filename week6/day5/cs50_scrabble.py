@@ -1,14 +1,32 @@
 # CS50 Scrabble Game
 # This program allows two players to enter words and calculates their Scrabble scores.
+# It can also score a whole word list (one word per line): python cs50_scrabble.py words.txt
+import sys
 
 letters = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'X', 'Y', 'Z']
 values = [1, 3, 3, 2, 1, 4, 2, 4, 1, 8, 5, 1, 3, 1, 1, 3, 10, 1, 1, 1, 1, 4, 4, 8, 4, 10]
 
+# byte -> score table: bytes.translate turns every letter into its value and everything else into 0
+_table = bytearray(256)
+for _letter, _value in zip(letters, values):
+    _table[ord(_letter)] = _table[ord(_letter.lower())] = _value
+SCORE_TABLE = bytes(_table)
+
 def get_word(player_num): # get word from player
     return input(f"Player {player_num}, enter a word: ")
 
 def get_score(word): # calculate score of the word
-    return sum([values[letters.index(char)] for char in word.upper() if char in letters])
+    return sum(word.encode("ascii", "ignore").translate(SCORE_TABLE))
+
+def score_words(lines): # score an iterable of words (e.g. an open file), one (word, score) at a time
+    for line in lines:
+        word = line.strip()
+        if word:
+            yield word, get_score(word)
+
+def score_file(path): # stream (word, score) pairs from a word list without loading it
+    with open(path, "r", encoding="utf-8") as f:
+        yield from score_words(f)
 
 def print_scores(score1, score2): # print both players' scores
     print("Player 1 score:", score1)
@@ -30,4 +48,9 @@ def main(): # main function to run the game
     print_scores(score1, score2)
     print_winner(score1, score2)
 
-main()
+if __name__ == "__main__":
+    if len(sys.argv) > 1: # score a word list instead of playing
+        for word, score in score_file(sys.argv[1]):
+            print(f"{word}\t{score}")
+    else:
+        main()
@@ -1,9 +1,23 @@
 # Inventory Manager
 # This program manages an inventory of products using parallel lists.
+# The lists are columns of one table (struct-of-arrays): row i of every list
+# is one product, and a dict maps each name to its row.
+import bisect # range lookups in sorted views
+import heapq # merge changed rows back into a sorted view
+import sys # string interning for categories
+from array import array # compact integer column
 
 product_names = [] # List to store product names
-categories = [] # List to store product categories
-quantities = [] # List to store product quantities
+categories = [] # List to store product categories (interned: repeated names share one string)
+quantities = array("q") # Array to store product quantities (8 bytes each, no int objects)
+name_index = {} # Product name -> row number in the lists above
+
+# Cached sorted views: sort key -> sorted list of (key value, row). Rows never
+# move, so a view stays valid; changed or new rows are only noted in
+# _stale_rows (O(1)) and merged back in the next time the view is read.
+_sorted_views = {}
+_stale_rows = {} # sort key -> set of rows whose entry in that view is missing or outdated
+_display_order = None # sort key chosen by the last sort_inventory(), used by view_inventory()
 
 def sort_by_name(item): # Function to sort by product name
     return str(item[0]).lower()
@@ -14,67 +28,160 @@ def sort_by_category(item): # Function to sort by product category
 def sort_by_quantity(item): # Function to sort by product quantity
     return int(item[2])
 
+SORT_KEYS = {"name": sort_by_name, "category": sort_by_category, "quantity": sort_by_quantity}
+
+def _row(i): # One product as a (name, category, quantity) tuple
+    return product_names[i], categories[i], quantities[i]
+
+def _print_row(i):
+    print(f"Product: {product_names[i]}, Category: {categories[i]}, Quantity: {quantities[i]}")
+
+def _sorted_view(by): # Cached (key, row) list for a sort key, refreshed if rows changed
+    key = SORT_KEYS[by]
+    view = _sorted_views.get(by)
+    if view is None: # build once; later changes are merged in
+        view = _sorted_views[by] = sorted((key(_row(i)), i) for i in range(len(product_names)))
+        _stale_rows.pop(by, None)
+    stale = _stale_rows.pop(by, None)
+    if stale: # O(n + k log k) for k changed rows instead of a full re-sort
+        kept = [entry for entry in view if entry[1] not in stale]
+        fresh = sorted((key(_row(i)), i) for i in stale)
+        view = _sorted_views[by] = list(heapq.merge(kept, fresh))
+    return view
+
+def sorted_rows(by="name"): # Row numbers in sorted order
+    return [i for _, i in _sorted_view(by)]
+
+def _mark_changed(i, keys=None): # Note that row i changed for the given (default: all) cached views
+    for by in (keys or list(_sorted_views)):
+        if by in _sorted_views:
+            _stale_rows.setdefault(by, set()).add(i)
+
 def sort_inventory(by="name"): # Function to sort inventory
-    global product_names, categories, quantities
-    combined = list(zip(product_names, categories, quantities)) # Combine parallel lists
-    if by == "name":
-        combined.sort(key=sort_by_name)
-    elif by == "category":
-        combined.sort(key=sort_by_category)
-    elif by == "quantity":
-        combined.sort(key=sort_by_quantity)
-    if combined: # Update global lists if combined is not empty
-        product_names, categories, quantities = map(list, zip(*combined))
+    global _display_order
+    if by not in SORT_KEYS:
+        print(f"Cannot sort by {by}.")
+        return
+    rows = sorted_rows(by)
+    _display_order = by
     print(f"Inventory sorted by {by}.")
     print("Sorted Inventory:")
-    for i in range(len(product_names)):
-        print(f"Product: {product_names[i]}, Category: {categories[i]}, Quantity: {quantities[i]}")
+    for i in rows:
+        _print_row(i)
+
+def _quantity(value): # Quantity as an int for the array, or ValueError saying why not
+    try:
+        quantity = int(value) # accepts "12" from files as well as 12
+    except (TypeError, ValueError):
+        raise ValueError(f"Quantity must be a whole number, got {value!r}.") from None
+    if isinstance(value, float) and value != quantity: # int() would silently drop the fraction
+        raise ValueError(f"Quantity must be a whole number, got {value!r}.")
+    if not 0 <= quantity < 2 ** 63: # what array("q") can hold
+        raise ValueError(f"Quantity must be between 0 and {2 ** 63 - 1}, got {value!r}.")
+    return quantity
+
+def _append_row(name, category, quantity): # Store one new product; caller checked for duplicates
+    name_index[name] = len(product_names)
+    product_names.append(name) # Add product details to lists
+    categories.append(sys.intern(str(category))) # Add category
+    quantities.append(quantity) # Add quantity
 
 def add_product(name, category, quantity): # Function to add a product
-    if name in product_names: # Check for duplicate product names
+    if name in name_index: # Check for duplicate product names
         print(f"Product '{name}' already exists.")
         return False # Indicate failure to add
-    product_names.append(name) # Add product details to lists
-    categories.append(category) # Add category
-    quantities.append(quantity) # Add quantity
+    try:
+        quantity = _quantity(quantity)
+    except ValueError as e:
+        print(e)
+        return False
+    _append_row(name, category, quantity)
+    _mark_changed(name_index[name])
     print(f"Product '{name}' added successfully.")
     return True # Indicate successful addition
 
 def update_quantity(name, quantity): # Function to update product quantity
-    if name not in product_names: # Check if product exists
+    index = name_index.get(name) # Find product row
+    if index is None: # Check if product exists
         print(f"Product {name} not found.")
         return # Indicate failure to update
-    if not isinstance(quantity, int) or quantity < 0:
-        print("Quantity must be a non-negative integer.")
-        return # Validate quantity
-    index = product_names.index(name) # Find product index
+    try:
+        quantity = _quantity(quantity) # Validate quantity
+    except ValueError as e:
+        print(e)
+        return
     quantities[index] = quantity # Update quantity
+    _mark_changed(index, ["quantity"])
     print(f"Updated {name} quantity to {quantity}.")
 
+def bulk_load(rows): # Add many (name, category, quantity) rows; returns how many were added
+    added = 0
+    for name, category, quantity in rows:
+        if name in name_index:
+            continue
+        try:
+            quantity = _quantity(quantity)
+        except ValueError: # skipped, like duplicates
+            continue
+        _append_row(name, category, quantity)
+        added += 1
+    if added:
+        _sorted_views.clear() # one re-sort later beats merging most of the table
+        _stale_rows.clear()
+    return added
+
+def bulk_update(updates): # Set many quantities from a {name: quantity} dict or (name, quantity) pairs
+    pairs = updates.items() if isinstance(updates, dict) else updates
+    updated = 0
+    missing = []
+    for name, quantity in pairs:
+        index = name_index.get(name)
+        if index is None:
+            missing.append(name)
+            continue
+        try:
+            quantity = _quantity(quantity)
+        except ValueError:
+            continue
+        quantities[index] = quantity
+        _mark_changed(index, ["quantity"])
+        updated += 1
+    return updated, missing
+
 def view_inventory(): # Function to view the entire inventory
     print("Inventory:")
-    for i in range(len(product_names)): # Loop through all products
-        print(f"Product: {product_names[i]}, Category: {categories[i]}, Quantity: {quantities[i]}")
+    rows = sorted_rows(_display_order) if _display_order else range(len(product_names))
+    for i in rows: # Loop through all products
+        _print_row(i)
 
 def search_product(name): # Function to search for a product by name
-    if name in product_names: # Check if product exists
-        index = product_names.index(name) # Find product index
-        print(f"Product: {product_names[index]}, Category: {categories[index]}, Quantity: {quantities[index]}")
+    index = name_index.get(name) # Find product row
+    if index is not None: # Check if product exists
+        _print_row(index)
     else: # Product not found
         print(f"Product {name} not found.")
 
 def clear_inventory(): # Function to clear the entire inventory
+    global _display_order
     product_names.clear()
     categories.clear()
-    quantities.clear()
+    del quantities[:]
+    name_index.clear()
+    _sorted_views.clear()
+    _stale_rows.clear()
+    _display_order = None
     print("Cleared the inventory.")
 
 def search_by_category(category): # Function to search products by category
+    view = _sorted_view("category")
+    key = category.lower() # Case-insensitive match
+    start = bisect.bisect_left(view, (key, -1))
     found = False # Flag to track if any product is found
-    for i in range(len(product_names)): # Loop through all products
-        if categories[i].lower() == category.lower(): # Case-insensitive match
-            print(f"Product: {product_names[i]}, Category: {categories[i]}, Quantity: {quantities[i]}")
-            found = True # Mark as found
+    for k, i in view[start:]:
+        if k != key:
+            break
+        _print_row(i)
+        found = True # Mark as found
     if not found: # No products found in the category
         print(f"No products found in category {category}.")
 
@@ -158,4 +265,5 @@ def main(): # Main menu loop
         else:
             print("Invalid choice. Please try again.")
 
-main() # Run the main function to start the program
\ No newline at end of file
+if __name__ == "__main__":
+    main() # Run the main function to start the program
\ No newline at end of file
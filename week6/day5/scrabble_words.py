@@ -0,0 +1,80 @@
+# Anagram index for finding the best Scrabble words playable from a rack.
+# Words are grouped by their sorted letters, so a rack only has to check each
+# distinct sub-multiset of its letters (at most 2**7 = 128 for a full rack).
+from itertools import combinations
+
+from cs50_scrabble import get_score, score_file
+
+
+class AnagramIndex:
+    def __init__(self):
+        self.groups = {} # sorted letters -> list of words
+        self.scores = {} # sorted letters -> score (anagrams share it)
+
+    def add(self, word, score=None):
+        word = word.strip().upper()
+        if not word.isalpha():
+            return
+        key = "".join(sorted(word))
+        group = self.groups.setdefault(key, [])
+        if word not in group:
+            group.append(word)
+            self.scores[key] = get_score(word) if score is None else score
+
+    @classmethod
+    def from_file(cls, path): # build from a word list, one word per line
+        index = cls()
+        for word, score in score_file(path):
+            index.add(word, score)
+        return index
+
+    def __len__(self):
+        return sum(len(g) for g in self.groups.values())
+
+    def playable(self, rack, min_length=2):
+        """Every (word, score) that can be made from the rack's letters."""
+        rack = "".join(sorted(c for c in rack.upper() if c.isalpha()))
+        seen = set()
+        found = []
+        for size in range(min_length, len(rack) + 1):
+            for combo in combinations(rack, size): # sorted rack -> sorted combos
+                key = "".join(combo)
+                if key in seen: # repeated letters produce the same combo twice
+                    continue
+                seen.add(key)
+                for word in self.groups.get(key, ()):
+                    found.append((word, self.scores[key]))
+        return found
+
+    def best(self, rack, limit=10, min_length=2):
+        """Highest-scoring playable words, longest first on ties."""
+        words = self.playable(rack, min_length)
+        words.sort(key=lambda ws: (-ws[1], -len(ws[0]), ws[0]))
+        return words[:limit]
+
+
+def main():
+    import sys
+    if len(sys.argv) < 2:
+        print("Usage: python scrabble_words.py WORDLIST [RACK ...]")
+        return
+    index = AnagramIndex.from_file(sys.argv[1])
+    print(f"Loaded {len(index)} words")
+    racks = sys.argv[2:]
+    interactive = not racks
+    while True:
+        if interactive:
+            rack = input("Rack (blank to quit): ").strip()
+            if not rack:
+                break
+        elif racks:
+            rack = racks.pop(0)
+            print(f"{rack}:")
+        else:
+            break
+        for word, score in index.best(rack):
+            print(f"  {word:<10} {score}")
+
+
+if __name__ == "__main__":
+    main()
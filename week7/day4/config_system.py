@@ -1,45 +1,328 @@
 # Simple Configuration Manager using dictionary methods and iteration with JSON persistence
+# Settings are layered (defaults -> file -> environment) and reads come from a merged dict.
+# Changes are appended to a journal next to the JSON file; the JSON is rewritten only on compaction.
 import json
 import os
+import re
+import tempfile
+import threading
+from contextlib import contextmanager
 
-config = {}
 STORE_PATH = os.path.join(os.path.dirname(__file__), "config_store.json")
-SAVE_ON_CHANGE = True
+SAVE_ON_CHANGE = True # journal each change right away (otherwise only on save)
+COMPACT_EVERY = 200 # journal entries before the JSON file is rewritten
+ENV_PREFIX = "CONFIG_" # e.g. CONFIG_PHONE_NUMBER overrides "phone number"
+DEFAULTS = {} # lowest layer; shipped defaults go here
+
+
+def env_name(key): # Environment variable that overrides key
+    return ENV_PREFIX + re.sub(r"\W+", "_", str(key)).strip("_").upper()
+
+
+class ConfigStore:
+    """Layered settings with a memoized merged view.
+
+    get() is a dict lookup on the merged view. set/delete update the file
+    layer and append a line to <file>.journal; after COMPACT_EVERY entries
+    the JSON snapshot is rewritten and the journal removed. transaction()
+    batches changes into one journal entry. poll() reloads the file layer if
+    another process changed it (mtime/size) and refreshes only the keys
+    whose values changed; watch() polls on a background thread.
+    """
+
+    def __init__(self, path=STORE_PATH, defaults=None, environ=None, autosave=True):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.autosave = autosave
+        self.defaults = dict(DEFAULTS if defaults is None else defaults)
+        self.environ = os.environ if environ is None else environ
+        self.file = {} # settings from the JSON file + journal
+        self.merged = {} # defaults, then file, then env
+        self.listeners = [] # callback(changed_keys) after a reload
+        self.loaded = "missing" # "loaded", "missing" or "invalid"
+        self._journal_entries = 0
+        self._pending = None # changes collected by an open transaction
+        self._dirty = False # unsaved changes when autosave is off
+        self._unsaved = [] # those changes, reapplied when poll() reloads the file
+        self._seen = None # (mtime, size) of our files after our own last write
+        self._lock = threading.RLock()
+        self._watcher = None
+        self.reload()
+
+    # --- Layers ---
+    def _env_layer(self, keys):
+        layer = {}
+        for key in keys: # overrides of known keys
+            name = env_name(key)
+            if name in self.environ:
+                layer[key] = self.environ[name]
+        for name, value in self.environ.items(): # env-only settings
+            if name.startswith(ENV_PREFIX):
+                key = name[len(ENV_PREFIX):].lower()
+                if not any(env_name(k) == name for k in keys):
+                    layer[key] = value
+        return layer
+
+    def _resolve(self, key): # Value of key across the layers, or a sentinel if unset
+        name = env_name(key)
+        if name in self.environ:
+            return self.environ[name]
+        if key in self.file:
+            return self.file[key]
+        return self.defaults.get(key, _MISSING)
+
+    def _refresh(self, keys): # Recompute only these keys of the merged view
+        for key in keys:
+            value = self._resolve(key)
+            if value is _MISSING:
+                self.merged.pop(key, None)
+            else:
+                self.merged[key] = value
+
+    def _rebuild(self):
+        keys = set(self.defaults) | set(self.file)
+        merged = dict(self.defaults)
+        merged.update(self.file)
+        merged.update(self._env_layer(keys))
+        self.merged = merged
+
+    # --- Reading ---
+    def get(self, key, default=None):
+        return self.merged.get(key, default)
+
+    def __contains__(self, key):
+        return key in self.merged
+
+    def items(self):
+        return self.merged.items()
+
+    def __len__(self):
+        return len(self.merged)
+
+    # --- Loading / reloading ---
+    def _stamp(self): # (mtime_ns, size) of snapshot and journal
+        stamp = []
+        for p in (self.path, self.journal_path):
+            try:
+                st = os.stat(p)
+                stamp.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def _read_file_layer(self):
+        data = {}
+        status = "missing"
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            status = "loaded"
+        except FileNotFoundError:
+            pass
+        except json.JSONDecodeError:
+            status = "invalid"
+        entries = 0
+        try:
+            with open(self.journal_path, "r") as f:
+                for line in f:
+                    try:
+                        change = json.loads(line)
+                    except json.JSONDecodeError:
+                        break # torn last line; everything before it is good
+                    _apply(data, change)
+                    entries += 1
+            if status == "missing":
+                status = "loaded"
+        except FileNotFoundError:
+            pass
+        return data, status, entries
+
+    def reload(self): # Read the file layer from disk and rebuild the merged view
+        with self._lock:
+            self.file, self.loaded, self._journal_entries = self._read_file_layer()
+            self._seen = self._stamp()
+            self._rebuild()
+
+    def poll(self):
+        """Reload if the files changed on disk; returns the set of changed keys."""
+        stamp = self._stamp()
+        if stamp == self._seen:
+            return set()
+        with self._lock:
+            new, self.loaded, self._journal_entries = self._read_file_layer()
+            self._seen = stamp
+            for change in self._unsaved: # keep local changes that aren't saved yet
+                _apply(new, change)
+            changed = {k for k in set(self.file) | set(new) if self.file.get(k, _MISSING) != new.get(k, _MISSING)}
+            self.file = new
+            self._refresh(changed)
+        if changed:
+            for callback in list(self.listeners):
+                callback(changed)
+        return changed
+
+    def watch(self, interval=1.0): # Poll on a daemon thread
+        if self._watcher is not None:
+            return
+        stop = threading.Event()
+        def run():
+            while not stop.wait(interval):
+                try:
+                    self.poll()
+                except OSError:
+                    pass
+        self._watcher = (threading.Thread(target=run, daemon=True), stop)
+        self._watcher[0].start()
+
+    def stop_watching(self):
+        if self._watcher is not None:
+            self._watcher[1].set()
+            self._watcher = None
+
+    # --- Writing ---
+    def set(self, key, value):
+        self._change([{"op": "put", "key": key, "value": value}])
+
+    def delete(self, key):
+        self._change([{"op": "del", "key": key}])
+
+    def update(self, settings):
+        with self.transaction():
+            for k, v in settings.items():
+                self.set(k, v)
+
+    def setdefault(self, key, value): # Set only if no layer (or open transaction) has the key
+        with self._lock:
+            for change in reversed(self._pending or []):
+                if change["key"] == key:
+                    if change["op"] == "put":
+                        return change["value"]
+                    break # deleted earlier in this transaction
+            else:
+                if key in self.merged:
+                    return self.merged[key]
+            self.set(key, value) # only queued inside a transaction, so return value itself
+            return value
+
+    @contextmanager
+    def transaction(self):
+        """Batch changes: applied and journaled together on exit, dropped on error."""
+        with self._lock:
+            if self._pending is not None: # nested: part of the outer batch
+                yield self
+                return
+            self._pending = []
+            try:
+                yield self
+                changes, self._pending = self._pending, None
+            except BaseException:
+                self._pending = None
+                raise
+            self._commit(changes)
+
+    def _change(self, changes):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.extend(changes)
+            else:
+                self._commit(changes)
+
+    def _commit(self, changes):
+        if not changes:
+            return
+        if self.autosave:
+            self.poll() # so our stamp below never hides another process's entries
+        keys = set()
+        for change in changes:
+            _apply(self.file, change)
+            keys.add(change["key"])
+        self._refresh(keys)
+        if not self.autosave:
+            self._dirty = True
+            self._unsaved.extend(changes)
+            return
+        entry = changes[0] if len(changes) == 1 else {"op": "batch", "changes": changes}
+        with open(self.journal_path, "a") as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._journal_entries += 1
+        if self._journal_entries >= COMPACT_EVERY:
+            self.compact()
+        else:
+            self._seen = self._stamp()
+
+    def compact(self): # Rewrite the JSON snapshot and drop the journal
+        with self._lock:
+            self.poll() # fold in entries other processes journaled since our last look
+            folder = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=folder)
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(self.file, f, indent=2)
+                os.replace(tmp, self.path)
+            except BaseException:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                raise
+            try:
+                os.remove(self.journal_path)
+            except FileNotFoundError:
+                pass
+            self._journal_entries = 0
+            self._dirty = False
+            self._unsaved = []
+            self._seen = self._stamp()
+
+    def save(self): # Persist everything (used by "Save" and exit)
+        if self._dirty or self._journal_entries or not os.path.exists(self.path):
+            self.compact()
+
+
+_MISSING = object()
+
+
+def _apply(data, change): # Apply one journal entry to a dict
+    op = change.get("op")
+    if op == "put":
+        data[change["key"]] = change["value"]
+    elif op == "del":
+        data.pop(change["key"], None)
+    elif op == "batch":
+        for c in change["changes"]:
+            _apply(data, c)
+
+
+store = None # the ConfigStore used by the menu functions
+
 
 def load_config(path: str = STORE_PATH):
-    global config
-    try:
-        with open(path, "r") as f:
-            config = json.load(f)
-        print(f"Loaded {len(config)} settings from {path}")
-    except FileNotFoundError:
-        config = {}
-        print("No existing config file. Starting fresh.")
-    except json.JSONDecodeError:
-        config = {}
+    global store
+    if store is not None:
+        store.stop_watching()
+    store = ConfigStore(path, autosave=SAVE_ON_CHANGE)
+    if store.loaded == "loaded":
+        print(f"Loaded {len(store.file)} settings from {path}")
+    elif store.loaded == "invalid":
         print("Config file was invalid JSON. Starting fresh.")
+    else:
+        print("No existing config file. Starting fresh.")
 
 def save_config(path: str = STORE_PATH):
-    with open(path, "w") as f:
-        json.dump(config, f, indent=2)
-    print(f"Saved {len(config)} settings to {path}")
-
-def save_if_needed(): # Save if auto-save is enabled
-    if SAVE_ON_CHANGE:
-        save_config()
+    store.save()
+    print(f"Saved {len(store.file)} settings to {store.path}")
 
 def set_setting(key, value):
-    # setdefault returns existing value or sets and returns default
-    if key in config: # update existing
-        print(f"Updated {key} from {config[key]} to {value}")
+    current = store.get(key)
+    if key in store: # update existing
+        print(f"Updated {key} from {current} to {value}")
     else: # new key
         print(f"Added {key} = {value}")
-    config[key] = value
-    save_if_needed()
+    store.set(key, value)
 
 
 def get_setting(key): # Get value or None
-    value = config.get(key)
+    value = store.get(key)
     if value is None: # Key not found
         print(f"{key} not found.")
     else: # Key found
@@ -47,42 +330,40 @@ def get_setting(key): # Get value or None
 
 
 def ensure_default(key, default_value): # Ensure default value is set
-    # Only sets if missing
-    value = config.setdefault(key, default_value)
+    # Only sets (and journals) if missing from every layer
+    value = store.setdefault(key, default_value)
     print(f"Default ensured: {key} = {value}")
-    # Only persist if we actually created the default
-    if value == default_value and key in config and value == default_value:
-        save_if_needed()
 
 
 def update_settings(new_settings): 
-    # Merge another dict
-    config.update(new_settings)
+    # Merge another dict as one journal entry
+    store.update(new_settings)
     print("Settings updated with:", new_settings)
-    save_if_needed()
 
 
 def remove_setting(key): # Remove a setting by key
-    value = config.pop(key, None)
+    value = store.file.get(key)
     if value is None: # Key not found
         print(f"{key} not found (nothing removed).")
-    else: # Key found and removed
-        print(f"Removed {key} (was {value}).")
-    save_if_needed()
+        return
+    store.delete(key)
+    print(f"Removed {key} (was {value}).")
 
 
 def list_settings(): # List all settings
-    if not config: # Empty config
+    store.poll() # pick up edits made by other processes
+    if not len(store): # Empty config
         print("No settings configured.")
         return
     print("Current settings:") 
-    for k, v in config.items():  # iteration over dictionary
+    for k, v in store.items():  # iteration over dictionary
         print(f"- {k}: {v}")
 
 
 def main(): # Main program loop
-    # Load persisted config at startup
+    # Load persisted config at startup and follow changes made elsewhere
     load_config()
+    store.watch()
     while True:
         print("\nConfiguration Manager")
         print("1. Set setting")
@@ -1,107 +1,93 @@
 import csv # For CSV file handling
 import os # For file path handling
+import sys # For finding the shared contact store
+
+# shared contact store lives with the week12 sqlite manager
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "week12", "day2"))
+from contact_store import ContactStore # indexed SQLite contacts
 
 # Use a path relative to this script so it works on any machine
 file_path = os.path.join(os.path.dirname(__file__), "contact.txt")
 # You can change "contact.txt" to any desired filename
-def load_contacts(file_path): # Load contacts from a CSV file
+db_path = os.path.join(os.path.dirname(__file__), "contacts.db") # contacts are kept here; the CSV is an export
+def load_contacts(file_path, store): # Replace the stored contacts with the CSV file's
     """Load contacts from CSV (expects header: name,email,phone). Skips blank lines."""
-    contacts = [] # List to hold contact dictionaries
     if not os.path.exists(file_path): # Check if file exists
-        print("Contact file not found. Starting with an empty list.")
-        return contacts # Return empty list if file doesn't exist
-    try: # Open and read the CSV file
-        with open(file_path, "r", newline="", encoding="utf-8") as file: # Open the file
-            reader = csv.DictReader(file) # Create a DictReader
-            for row in reader: # Iterate over each row
-                if not row: # skip empty rows
-                    continue
-                name = (row.get("name") or "").strip()
-                email = (row.get("email") or "").strip()
-                phone = (row.get("phone") or "").strip()
-                if not (name or email or phone):
-                    # skip empty rows
-                    continue
-                contacts.append({"name": name, "email": email, "phone": phone})
-    except Exception as e: # Handle file read errors
+        print("Contact file not found. Keeping the current contacts.")
+        return 0
+    try: # Read the CSV file into the store in one transaction
+        count = store.import_file(file_path, replace=True)
+        print(f"Loaded {count} contact(s) from {file_path}")
+        return count
+    except (OSError, csv.Error, UnicodeDecodeError) as e: # Handle file read errors
         print(f"Error reading contacts: {e}")
-    return contacts
+        return 0
 
-def save_contacts(file_path, contacts): # Save contacts to a CSV file
+def save_contacts(file_path, store): # Save contacts to a CSV file
     """Save contacts to CSV with header."""
-    try: # Open and write to the CSV file
-        with open(file_path, "w", newline="", encoding="utf-8") as file:
-            fieldnames = ["name", "email", "phone"]
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writeheader()
-            for c in contacts: # Write each contact
-                writer.writerow({
-                    "name": (c.get("name") or "").strip(),
-                    "email": (c.get("email") or "").strip(),
-                    "phone": (c.get("phone") or "").strip(),
-                })
-        print(f"Saved {len(contacts)} contact(s) to {file_path}") # Log success
-    except Exception as e: # Handle file write errors
+    try: # Export every contact
+        count = store.export_file(file_path)
+        print(f"Saved {count} contact(s) to {file_path}") # Log success
+    except OSError as e: # Handle file write errors
         print(f"Error saving contacts: {e}")
 
-def add_contact(contacts, name, email, phone): # Add a new contact
-    contacts.append({"name": name, "email": email, "phone": phone})
+def open_store(): # Open the store, importing contact.txt the first time
+    store = ContactStore(db_path)
+    if len(store) == 0 and os.path.exists(file_path):
+        load_contacts(file_path, store)
+    return store
+
+def add_contact(store, name, email, phone): # Add a new contact
+    store.add(name, phone, email) # saved immediately
     print(f"Contact {name} added.")
-    return contacts
 
-def list_contacts(contacts): # List all contacts
+def list_contacts(store): # List all contacts
+    contacts = store.all()
     if not contacts: # Check if the contact list is empty
         print("No contacts found.")
-        return
+        return contacts
     for i, contact in enumerate(contacts, 1): # Enumerate for numbering
         print(f"{i}. Name: {contact['name']}, Email: {contact['email']}, Phone: {contact['phone']}")
+    return contacts
 
-def search_contact(contacts, name): # Search for a contact by name
-    for contact in contacts: # Iterate through contacts
-        if contact['name'].lower() == name.lower(): # Case-insensitive match
-            print(f"Found: Name: {contact['name']}, Email: {contact['email']}, Phone: {contact['phone']}")
-            return
+def search_contact(store, name): # Search for a contact by name
+    for contact in store.find_by_name(name): # Case-insensitive match through the name index
+        print(f"Found: Name: {contact['name']}, Email: {contact['email']}, Phone: {contact['phone']}")
+        return
     print(f"Contact {name} not found.") # If not found
 
-def delete_contact(contacts, name): # Delete a contact by name
-    for i, contact in enumerate(contacts): # Iterate with index
-        if contact['name'].lower() == name.lower(): # Case-insensitive match
-            del contacts[i] # Delete the contact
-            print(f"Contact {name} deleted.")
-            return contacts
+def delete_contact(store, name): # Delete a contact by name
+    for contact in store.find_by_name(name): # Case-insensitive match
+        store.delete(contact["id"]) # Delete the first match
+        print(f"Contact {name} deleted.")
+        return
     print(f"Contact {name} not found.") # If not found
-    return contacts 
 
-def update_contact(contacts): # Update a contact by selecting its number
+def update_contact(store): # Update a contact by selecting its number
     """Update a contact selected by number. Press Enter to keep current value."""
+    contacts = list_contacts(store) # Show contacts to choose from
     if not contacts: # Check if the contact list is empty
         print("No contacts to update.")
-        return contacts
-    list_contacts(contacts) # Show contacts to choose from
+        return
     choice = input("Enter the number of the contact to update: ").strip()
     if not choice.isdigit(): # Validate input
         print("Invalid selection.")
-        return contacts
+        return
     idx = int(choice) - 1 # Convert to zero-based index
     if idx < 0 or idx >= len(contacts): # Check range
         print("Selection out of range.")
-        return contacts
+        return
     c = contacts[idx] # Contact to update
     print("Press Enter to keep the current value shown in [brackets].")
     new_name = input(f"Name [{c['name']}]: ").strip()
     new_email = input(f"Email [{c['email']}]: ").strip()
     new_phone = input(f"Phone [{c['phone']}]: ").strip()
-    if new_name: # Update name if provided
-        c['name'] = new_name
-    if new_email: # Update email if provided
-        c['email'] = new_email
-    if new_phone: # Update phone if provided
-        c['phone'] = new_phone
+    # Blank answers keep the current value
+    store.update(c["id"], name=new_name or None, email=new_email or None, phone=new_phone or None)
     print("Contact updated.")
-    return contacts
 
 def main(): # Main program loop
-    contacts = load_contacts(file_path)
+    store = open_store()
     while True: # Main loop
         print("\nContact Manager")
         print("1. Add Contact")
@@ -109,8 +95,8 @@ def main(): # Main program loop
         print("3. Search Contact")
         print("4. Update Contact")
         print("5. Delete Contact")
-        print("6. Save Contacts")
-        print("7. Reload From File")
+        print("6. Export Contacts to CSV")
+        print("7. Reload From CSV")
         print("8. Exit")
         choice = input("Choose an option (1-8): ")
         
@@ -118,25 +104,28 @@ def main(): # Main program loop
             name = input("Enter name: ")
             email = input("Enter email: ")
             phone = input("Enter phone: ")
-            contacts = add_contact(contacts, name, email, phone)
-            save_contacts(file_path, contacts)
+            add_contact(store, name, email, phone)
         elif choice == '2': # List contacts
-            list_contacts(contacts)
+            list_contacts(store)
         elif choice == '3': # Search contact
             name = input("Enter name to search: ")
-            search_contact(contacts, name)
+            search_contact(store, name)
         elif choice == '4': # Update contact
-            contacts = update_contact(contacts)
-            save_contacts(file_path, contacts)
+            update_contact(store)
         elif choice == '5': # Delete contact
             name = input("Enter name to delete: ")
-            contacts = delete_contact(contacts, name)
-            save_contacts(file_path, contacts)
+            delete_contact(store, name)
         elif choice == '6': # Save contacts
-            save_contacts(file_path, contacts)
+            save_contacts(file_path, store)
         elif choice == '7': # Reload contacts
-            contacts = load_contacts(file_path)
+            # The CSV only has what was last exported; replacing drops anything added since
+            answer = input(f"Replace all {len(store)} stored contact(s) with {file_path}? Unexported changes will be lost (y/N): ")
+            if answer.strip().lower() == 'y':
+                load_contacts(file_path, store)
+            else:
+                print("Reload cancelled.")
         elif choice == '8': # Exit
+            store.close()
             print("Exiting Contact Manager.")
             break
         else: # Invalid option
@@ -1,37 +1,232 @@
+import atexit
+import os
 import time
 # simple data logger application
-# Log file path
+# Log file path (old single-file format, imported into segments on first run)
 LOG_FILE = "data_log.txt"
+LOG_DIR = "data_log" # segment files live here
+
+FLUSH_EVERY = 1000 # buffered entries before a write
+FLUSH_INTERVAL = 1.0 # seconds before buffered entries are written anyway
+SEGMENT_BYTES = 8 * 1024 * 1024 # rotate when a segment reaches this size
+SEGMENT_SECONDS = 3600 # ... or when it has been open this long
+HEADER_WIDTH = 96 # fixed so the header can be rewritten in place
+MAX_TIMESTAMP = 30 # longest timestamp that still fits the header twice (ASCII only, so characters are bytes)
 
 
 def current_timestamp(): # Get current timestamp
 	"""Return ISO-like timestamp string (YYYY-MM-DD HH:MM:SS)."""
-	t = time.localtime() # Get local time
-	# Build manually to keep it readable
-	return (
-		str(t.tm_year).zfill(4) + "-" +
-		str(t.tm_mon).zfill(2) + "-" +
-		str(t.tm_mday).zfill(2) + " " +
-		str(t.tm_hour).zfill(2) + ":" +
-		str(t.tm_min).zfill(2) + ":" +
-		str(t.tm_sec).zfill(2)
-	)
+	return time.strftime("%Y-%m-%d %H:%M:%S") # Get local time
+
+
+def format_timestamp(epoch): # Timestamp with milliseconds, for high-frequency entries
+	"""Return YYYY-MM-DD HH:MM:SS.mmm; sorts the same as the time it names."""
+	seconds = int(epoch)
+	return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(seconds)) + f".{int((epoch - seconds) * 1000):03d}"
+
+
+def valid_timestamp(ts): # Fits the fixed-width header, which is rewritten in place over UTF-8 bytes
+	return ts.isascii() and len(ts) <= MAX_TIMESTAMP and "|" not in ts and "\n" not in ts
+
+
+def _header(min_ts, max_ts, count): # Fixed-width first line of a segment file
+	line = f"#segment|min={min_ts}|max={max_ts}|count={count}"
+	return line.ljust(HEADER_WIDTH - 1) + "\n"
+
+
+def _parse_header(line):
+	"""(min, max, count) from a segment header, or None if it is not one."""
+	if not line.startswith("#segment|"):
+		return None
+	fields = dict(part.split("=", 1) for part in line.strip().split("|")[1:] if "=" in part)
+	try:
+		return fields["min"], fields["max"], int(fields["count"])
+	except (KeyError, ValueError):
+		return None
+
+
+class Segment: # One segment file and the time range it covers
+	def __init__(self, path, min_ts="", max_ts="", count=0):
+		self.path = path
+		self.min_ts = min_ts
+		self.max_ts = max_ts
+		self.count = count
+
+	def overlaps(self, start, end):
+		return self.count > 0 and (end is None or self.min_ts <= end) and (start is None or self.max_ts >= start)
+
+
+class TimeSeriesLogger:
+	"""Append-only log split into segment files, each with a min/max header.
+
+	Entries are buffered and written in batches (every FLUSH_EVERY entries or
+	FLUSH_INTERVAL seconds). A segment is sealed and a new one started when it
+	reaches SEGMENT_BYTES or SEGMENT_SECONDS. query() reads only the segments
+	whose [min, max] overlaps the requested range; startup reads headers only.
+	"""
+
+	def __init__(self, folder=LOG_DIR, flush_every=FLUSH_EVERY, flush_interval=FLUSH_INTERVAL,
+				segment_bytes=SEGMENT_BYTES, segment_seconds=SEGMENT_SECONDS):
+		self.folder = folder
+		self.flush_every = flush_every
+		self.flush_interval = flush_interval
+		self.segment_bytes = segment_bytes
+		self.segment_seconds = segment_seconds
+		self.segments = [] # sealed and active, oldest first
+		self.buffer = [] # (timestamp, value) not yet written
+		self._file = None # active segment, open for appending
+		self._opened_at = 0.0
+		self._last_flush = time.monotonic()
+		os.makedirs(folder, exist_ok=True)
+		self._load_index()
+		atexit.register(self.close)
+
+	# --- Index ---
+	def _load_index(self): # Read each segment's header (not its entries)
+		for name in sorted(os.listdir(self.folder)):
+			if not name.endswith(".log"):
+				continue
+			path = os.path.join(self.folder, name)
+			with open(path, "r", encoding="utf-8") as f:
+				info = _parse_header(f.readline())
+			if info is None:
+				continue
+			self.segments.append(Segment(path, *info))
+		if self.segments: # the last segment may have been cut off before its header was updated
+			self._repair(self.segments[-1])
+
+	def _repair(self, seg): # Recompute a segment's header from its lines
+		min_ts = max_ts = ""
+		count = 0
+		for ts, _ in self._read(seg):
+			count += 1
+			min_ts = ts if not min_ts or ts < min_ts else min_ts
+			max_ts = ts if ts > max_ts else max_ts
+		if (min_ts, max_ts, count) != (seg.min_ts, seg.max_ts, seg.count):
+			seg.min_ts, seg.max_ts, seg.count = min_ts, max_ts, count
+			with open(seg.path, "r+", encoding="utf-8") as f:
+				f.write(_header(min_ts, max_ts, count))
+
+	# --- Writing ---
+	def append(self, value, timestamp=None): # Buffer one entry; flushes when due
+		ts = timestamp or format_timestamp(time.time())
+		if not valid_timestamp(ts):
+			raise ValueError(f"bad timestamp: {ts!r}")
+		self.buffer.append((ts, str(value).replace("\n", " ").replace("\r", " ")))
+		if len(self.buffer) >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+			self.flush()
+
+	def _new_segment(self, first_ts):
+		self._seal()
+		name = first_ts.replace("-", "").replace(":", "").replace(" ", "T").replace(".", "") # sortable file name
+		path = os.path.join(self.folder, f"seg-{name}-{len(self.segments):06d}.log")
+		self._file = open(path, "w+", encoding="utf-8")
+		self._file.write(_header("", "", 0))
+		self._opened_at = time.monotonic()
+		self.segments.append(Segment(path))
+
+	def _active(self): # The open segment, reopening the newest one after a restart
+		if self._file is None and self.segments:
+			seg = self.segments[-1]
+			if os.path.getsize(seg.path) < self.segment_bytes:
+				self._file = open(seg.path, "r+", encoding="utf-8")
+				self._file.seek(0, os.SEEK_END)
+				self._opened_at = time.monotonic()
+		return self._file
+
+	def flush(self): # Write buffered entries and update the active segment's header
+		self._last_flush = time.monotonic()
+		if not self.buffer:
+			return
+		entries, self.buffer = self.buffer, []
+		if self._active() is None or self._due_for_rotation():
+			self._new_segment(entries[0][0])
+		seg = self.segments[-1]
+		self._file.write("".join(f"{ts}|{value}\n" for ts, value in entries))
+		batch = [ts for ts, _ in entries]
+		lo, hi = min(batch), max(batch)
+		seg.min_ts = lo if not seg.min_ts or lo < seg.min_ts else seg.min_ts
+		seg.max_ts = hi if hi > seg.max_ts else seg.max_ts
+		seg.count += len(entries)
+		end = self._file.tell()
+		self._file.seek(0)
+		self._file.write(_header(seg.min_ts, seg.max_ts, seg.count))
+		self._file.seek(end)
+		self._file.flush()
+
+	def _due_for_rotation(self):
+		return (self._file.tell() >= self.segment_bytes
+				or time.monotonic() - self._opened_at >= self.segment_seconds)
+
+	def _seal(self):
+		if self._file is not None:
+			self._file.close()
+			self._file = None
+
+	def close(self):
+		self.flush()
+		self._seal()
+
+	# --- Reading ---
+	def _read(self, seg): # Yield (timestamp, value) from one segment file
+		with open(seg.path, "r", encoding="utf-8") as f:
+			f.readline() # header
+			for line in f:
+				line = line.rstrip("\n")
+				if "|" in line:
+					yield tuple(line.split("|", 1))
+
+	def query(self, start=None, end=None):
+		"""Yield (timestamp, value) with start <= timestamp <= end, oldest segment first.
+
+		Bounds are timestamp strings; a prefix such as "2025-01-02" as end
+		includes the whole day.
+		"""
+		end_key = None if end is None else end + "~" # "~" sorts after every timestamp character
+		self.flush() # so the segments hold every entry
+		for seg in self.segments:
+			if not seg.overlaps(start, end_key):
+				continue
+			for ts, value in self._read(seg):
+				if (start is None or ts >= start) and (end_key is None or ts <= end_key):
+					yield ts, value
+
+	def __len__(self):
+		return sum(seg.count for seg in self.segments) + len(self.buffer)
+
+
+def open_logger(folder=LOG_DIR, legacy_file=LOG_FILE): # Logger, importing the old single file once
+	logger = TimeSeriesLogger(folder)
+	if not logger.segments and os.path.exists(legacy_file):
+		skipped = []
+		for e in load_log(legacy_file):
+			if e["timestamp"] and not valid_timestamp(e["timestamp"]): # would not fit a segment header
+				skipped.append(e["timestamp"])
+				continue
+			logger.append(e["value"], e["timestamp"])
+		logger.flush()
+		os.replace(legacy_file, legacy_file + ".imported")
+		if skipped: # still in the .imported file
+			print(f"Warning: skipped {len(skipped)} entr{'y' if len(skipped) == 1 else 'ies'} from {legacy_file} "
+				f"with timestamps that are not ASCII or longer than {MAX_TIMESTAMP} characters (e.g. {skipped[0]!r}); "
+				f"they remain in {legacy_file}.imported.")
+	return logger
 
 
 def add_entry(log): # Add a log entry
-	"""Prompt user for a value and append a timestamped dict entry to the log list."""
+	"""Prompt user for a value and append a timestamped entry to the logger."""
 	value = input("Enter value to log: ") # Get value from user
-	entry = {"timestamp": current_timestamp(), "value": value}
-	log.append(entry) # Add to log list
+	log.append(value, current_timestamp())
 	print("Logged.")
 
 
-def list_entries(log): # List all log entries
-	if not log: # No entries
+def list_entries(log, start=None, end=None): # List log entries (optionally in a time range)
+	found = False
+	for i, (ts, value) in enumerate(log.query(start, end), 1): # Enumerate for numbering
+		found = True
+		print(f"{i}. {ts} -> {value}")
+	if not found: # No entries
 		print("(no entries)")
-		return
-	for i, e in enumerate(log, 1): # Enumerate for numbering
-		print(f"{i}. {e['timestamp']} -> {e['value']}")
 
 
 def save_log(filename, log): # Save log entries to a file
@@ -76,29 +271,34 @@ def load_log(filename): # Load log entries from a file
 
 
 def main(): # Main program loop
-    # Load existing log or start new
-	log = load_log(LOG_FILE)
+    # Open the segment log (imports the old single file the first time)
+	log = open_logger()
 	while True:
 		print("\nData Logger")
 		print("1. Add entry")
 		print("2. List entries")
 		print("3. Save")
 		print("4. Reload")
-		print("5. Exit")
-		choice = input("Choose (1-5): ").strip()
+		print("5. Query time range")
+		print("6. Exit")
+		choice = input("Choose (1-6): ").strip()
 		if choice == "1":
 			add_entry(log)
 		elif choice == "2":
 			list_entries(log)
 		elif choice == "3":
-			save_log(LOG_FILE, log)
+			log.flush()
+			print("Saved.")
 		elif choice == "4":
-			log = load_log(LOG_FILE)
+			log.close()
+			log = open_logger()
 			print("Reloaded.")
 		elif choice == "5":
-			ask = input("Save before exit? (y/n): ").strip().lower()
-			if ask in ("y", "yes"):
-				save_log(LOG_FILE, log)
+			start = input("From (e.g. 2025-01-02 08:00, blank for start): ").strip() or None
+			end = input("To (blank for now): ").strip() or None
+			list_entries(log, start, end)
+		elif choice == "6":
+			log.close() # entries are buffered; write them out
 			print("Goodbye!")
 			break
 		else:
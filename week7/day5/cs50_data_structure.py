@@ -3,6 +3,13 @@
 # Parses data_structure.txt (name,age,grade)
 # Lists student names
 # Lets you choose by name or number to show age and grade
+# Lookups go through a sorted index file (<csv>.idx) that is rebuilt only when the CSV changes
+
+import bisect # prefix ranges in the sorted name list
+import mmap # read the index without loading it
+import os # file stats and atomic replace
+import struct # index header and offset table
+import tempfile # temp file next to the index
 
 
 FILE_PATH = "/Users/garretadkins/Documents/GitHub/Learning-python/Learning-python/week7/day5/data_structure.txt"
@@ -25,6 +32,152 @@ def load_students(path: str) -> dict:
         students.setdefault(name, []).append({"age": int(age), "grade": int(grade)})
     return students
 
+INDEX_MAGIC = b"STUIDX01"
+INDEX_HEADER = struct.Struct("<8sqqI")  # magic, source mtime_ns, source size, record count
+MENU_LIMIT = 50  # list at most this many names in the menu
+
+
+def index_path_for(path: str) -> str:
+    return path + ".idx"
+
+
+def build_index(path: str, index_path: str) -> None:
+    """Write records sorted by name: header, offset table, then "name,age,grade\n" lines.
+
+    Streams the CSV once; duplicates keep their file order (stable sort).
+    """
+    st = os.stat(path)
+    records: list[tuple[bytes, bytes]] = []
+    with open(path, "rb") as f:
+        next(f, None)  # skip header
+        for raw in f:
+            parts = raw.decode("utf-8").strip().split(",")
+            if len(parts) != 3:  # blank or malformed line
+                continue
+            name, age, grade = parts[0].strip(), parts[1].strip(), parts[2].strip()
+            try:
+                line = f"{name},{int(age)},{int(grade)}\n".encode("utf-8")
+            except ValueError:  # non-numeric age/grade
+                continue
+            records.append((name.encode("utf-8"), line))
+    records.sort(key=lambda r: r[0])
+
+    folder = os.path.dirname(os.path.abspath(index_path))
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".idx", dir=folder)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(INDEX_HEADER.pack(INDEX_MAGIC, st.st_mtime_ns, st.st_size, len(records)))
+            base = INDEX_HEADER.size + 4 * (len(records) + 1)
+            offsets = [base]
+            for _, line in records:
+                offsets.append(offsets[-1] + len(line))
+            out.write(struct.pack(f"<{len(offsets)}I", *offsets))
+            for _, line in records:
+                out.write(line)
+        os.replace(tmp, index_path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class StudentIndex:
+    """Read-only view of an index file; offers the dict methods the menu uses (get/keys)."""
+
+    def __init__(self, index_path: str):
+        with open(index_path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.mtime_ns, self.size, self.count = INDEX_HEADER.unpack_from(self._mm, 0)
+        if magic != INDEX_MAGIC:
+            self._mm.close()
+            raise ValueError(f"{index_path} is not a student index")
+
+    def _bounds(self, i: int) -> tuple[int, int]:
+        return struct.unpack_from("<II", self._mm, INDEX_HEADER.size + 4 * i)
+
+    def _record(self, i: int) -> bytes:
+        start, end = self._bounds(i)
+        return self._mm[start:end - 1]  # drop the newline
+
+    def _name(self, i: int) -> bytes:
+        record = self._record(i)
+        return record[:record.rindex(b",", 0, record.rindex(b","))]  # everything before the last two commas
+
+    def _lower_bound(self, key: bytes) -> int:
+        """First record whose name is >= key (binary search over the mmap)."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._name(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def get(self, name: str, default=None):
+        key = name.encode("utf-8")
+        matches: list[dict] = []
+        i = self._lower_bound(key)
+        while i < self.count:
+            record = self._record(i).decode("utf-8")
+            n, age, grade = record.rsplit(",", 2)
+            if n != name:
+                break
+            matches.append({"age": int(age), "grade": int(grade)})
+            i += 1
+        return matches or default
+
+    def prefix(self, prefix: str, limit: int | None = None) -> list[str]:
+        """Distinct names starting with prefix, in sorted order."""
+        key = prefix.encode("utf-8")
+        names: list[str] = []
+        i = self._lower_bound(key)
+        while i < self.count and (limit is None or len(names) < limit):
+            name = self._name(i)
+            if not name.startswith(key):
+                break
+            decoded = name.decode("utf-8")
+            if not names or names[-1] != decoded:
+                names.append(decoded)
+            i += 1
+        return names
+
+    def keys(self):
+        return self.prefix("")
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+def open_index(path: str):
+    """Open the index for path, rebuilding it only if the CSV's mtime or size changed.
+
+    Falls back to load_students() (a plain dict) if the index cannot be written.
+    """
+    index_path = index_path_for(path)
+    st = os.stat(path)
+    try:
+        index = StudentIndex(index_path)
+        if (index.mtime_ns, index.size) == (st.st_mtime_ns, st.st_size):
+            return index
+        index.close()
+    except (OSError, ValueError, struct.error):  # missing, unreadable or truncated index
+        pass
+    try:
+        build_index(path, index_path)
+        return StudentIndex(index_path)
+    except OSError as e:
+        print(f"Could not build index ({e}); reading {os.path.basename(path)} directly.")
+        return load_students(path)
+
 
 def list_students(students: dict) -> list[str]:
     names: list[str] = [] # type hint for list
@@ -34,23 +187,45 @@ def list_students(students: dict) -> list[str]:
     return names
 
 
-def lookup_student(students: dict, name: str) -> str:
+def lookup_student(students: dict, name: str) -> str | None:
+    """Age and grade lines for name, or None if there is no such student."""
     matches = students.get(name)  # dictionary get
     if not matches:  # no matches found
-        return "Student not found"
+        return None
     lines: list[str] = []
     for m in matches:  # iteration over possible duplicates
         lines.append(f"{name}: age={m['age']}, grade={m['grade']}")
     return "\n".join(lines)
 
 
+def find_by_prefix(students, prefix: str, limit: int = MENU_LIMIT, names: list[str] | None = None) -> list[str]:
+    """Up to limit names starting with prefix, in sorted order.
+
+    For a plain dict, pass names (list_students() of it) so repeated queries
+    don't sort every name again.
+    """
+    if isinstance(students, StudentIndex):
+        return students.prefix(prefix, limit)
+    if names is None:
+        names = list_students(students)
+    found: list[str] = []
+    for i in range(bisect.bisect_left(names, prefix), len(names)):  # only the names in the prefix's range
+        if len(found) == limit or not names[i].startswith(prefix):
+            break
+        found.append(names[i])
+    return found
+
+
 def main(): # Main program loop
-    students = load_students(FILE_PATH)
-    names = list_students(students)
+    students = open_index(FILE_PATH)
+    all_names = None if isinstance(students, StudentIndex) else list_students(students)  # sorted once for the dict fallback
+    names = find_by_prefix(students, "", MENU_LIMIT + 1, all_names)  # one extra tells us there are more
 
     if not names: # no students
         print("No students found.")
         return
+    more = len(names) > MENU_LIMIT
+    names = names[:MENU_LIMIT]
 
     print("Student Data Lookup")
     print("-------------------")
@@ -59,6 +234,8 @@ def main(): # Main program loop
         print("\nStudents:")
         for i, n in enumerate(names, start=1):  # iteration to display menu
             print(f" {i}. {n}") # show number and name
+        if more: # large roster
+            print(" ... more (type the start of a name to search)")
 
         choice = input("\nType a student name or number (or 'exit'): ").strip()
         if choice.lower() == "exit": # exit the program
@@ -72,7 +249,12 @@ def main(): # Main program loop
         else:  # name chosen
             selected = choice
 
-        print(lookup_student(students, selected))
+        result = lookup_student(students, selected) if selected else None
+        if result is None and selected:
+            matches = find_by_prefix(students, selected, names=all_names)
+            if matches:  # treat the input as a prefix
+                result = "Did you mean: " + ", ".join(matches)
+        print(result or "Student not found")
 
 
 if __name__ == "__main__":
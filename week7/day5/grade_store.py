@@ -0,0 +1,241 @@
+# Columnar grade storage for the student management system
+from __future__ import annotations # for Python 3.10 compatibility
+
+import struct # binary snapshot headers
+from array import array # contiguous numeric columns
+from pathlib import Path # for file paths
+from typing import Dict, Iterable, List, Optional # for type hints
+
+MAGIC = b"GRADES01"
+TAIL_LIMIT = 4096 # compact a class once its tail holds this many grades (or as many as are already compacted)
+
+
+class ClassColumn:
+	"""All grades for one class.
+
+	Grades that were compacted are stored grouped by student: student i's
+	grades are values[offsets[i]:offsets[i + 1]]. New grades go to a small
+	tail (tail_values/tail_owner) until the next compaction, so appends
+	never shift the big array. sums/counts hold each student's running
+	totals, which makes an average O(1).
+	"""
+
+	def __init__(self, n_students: int = 0):
+		self.offsets = array("Q", [0] * (n_students + 1))
+		self.values = array("d")
+		self.tail_values = array("d")
+		self.tail_owner = array("I") # student id of each tail grade
+		self.tail_rows: Dict[int, List[int]] = {} # student id -> positions in the tail
+		self.sums = array("d", [0.0] * n_students)
+		self.counts = array("I", [0] * n_students)
+
+	def add_student(self):
+		self.offsets.append(self.offsets[-1])
+		self.sums.append(0.0)
+		self.counts.append(0)
+
+	def append(self, sid: int, grade: float):
+		self.tail_rows.setdefault(sid, []).append(len(self.tail_values))
+		self.tail_values.append(grade)
+		self.tail_owner.append(sid)
+		self.sums[sid] += grade
+		self.counts[sid] += 1
+		if len(self.tail_values) >= max(TAIL_LIMIT, len(self.values)):
+			self.compact()
+
+	def _positions(self, sid: int):
+		"""("main"|"tail", index) for each of the student's grades, oldest first."""
+		pos = [("main", i) for i in range(self.offsets[sid], self.offsets[sid + 1])]
+		pos.extend(("tail", i) for i in self.tail_rows.get(sid, ()))
+		return pos
+
+	def grades_for(self, sid: int) -> List[float]:
+		return [self.values[i] if where == "main" else self.tail_values[i] for where, i in self._positions(sid)]
+
+	def set_grade(self, sid: int, index: int, grade: float) -> bool:
+		pos = self._positions(sid)
+		if not -len(pos) <= index < len(pos):
+			return False
+		where, i = pos[index]
+		column = self.values if where == "main" else self.tail_values
+		self.sums[sid] += grade - column[i]
+		column[i] = grade
+		return True
+
+	def average(self, sid: int) -> float:
+		n = self.counts[sid]
+		return round(self.sums[sid] / n, 2) if n else 0
+
+	def all_values(self) -> array:
+		return self.values + self.tail_values
+
+	def compact(self):
+		"""Merge the tail into the student-grouped arrays in one linear pass."""
+		if not self.tail_values:
+			return
+		n = len(self.offsets) - 1
+		extra = [0] * n
+		for owner in self.tail_owner:
+			extra[owner] += 1
+		new_offsets = array("Q", [0] * (n + 1))
+		for sid in range(n):
+			new_offsets[sid + 1] = new_offsets[sid] + (self.offsets[sid + 1] - self.offsets[sid]) + extra[sid]
+		new_values = array("d", bytes(8 * new_offsets[n]))
+		fill = array("Q", new_offsets[:n]) # next free slot per student
+		for sid in range(n):
+			start, end = self.offsets[sid], self.offsets[sid + 1]
+			new_values[fill[sid]:fill[sid] + end - start] = self.values[start:end]
+			fill[sid] += end - start
+		for grade, owner in zip(self.tail_values, self.tail_owner):
+			new_values[fill[owner]] = grade
+			fill[owner] += 1
+		self.offsets, self.values = new_offsets, new_values
+		self.tail_values, self.tail_owner = array("d"), array("I")
+		self.tail_rows = {}
+
+
+def percentile(sorted_values, pct: float) -> float:
+	"""Linear-interpolated percentile of an already sorted sequence."""
+	if not sorted_values:
+		return 0.0
+	k = (len(sorted_values) - 1) * pct / 100
+	lo = int(k)
+	hi = min(lo + 1, len(sorted_values) - 1)
+	return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class GradeStore:
+	"""Students x classes grade table with O(1) averages and a binary snapshot."""
+
+	def __init__(self, class_names: Iterable[str]):
+		self.class_names = list(class_names)
+		self.names: List[str] = [] # student id -> name
+		self.index: Dict[str, int] = {} # name -> student id
+		self.columns = {cls: ClassColumn() for cls in self.class_names}
+
+	def __contains__(self, name: str) -> bool:
+		return name in self.index
+
+	def __len__(self) -> int:
+		return len(self.names)
+
+	def add_student(self, name: str) -> int:
+		sid = self.index.get(name)
+		if sid is None:
+			sid = self.index[name] = len(self.names)
+			self.names.append(name)
+			for column in self.columns.values():
+				column.add_student()
+		return sid
+
+	def add_grade(self, name: str, class_name: str, grade: float):
+		self.columns[class_name].append(self.add_student(name), grade)
+
+	def grades(self, name: str, class_name: str) -> List[float]:
+		return self.columns[class_name].grades_for(self.index[name])
+
+	def set_grade(self, name: str, class_name: str, index: int, grade: float) -> bool:
+		sid = self.index.get(name)
+		if sid is None or class_name not in self.columns:
+			return False
+		return self.columns[class_name].set_grade(sid, index, grade)
+
+	def average(self, name: str, class_name: str) -> float:
+		return self.columns[class_name].average(self.index[name])
+
+	def clear(self):
+		self.__init__(self.class_names)
+
+	def class_stats(self) -> Dict[str, Dict[str, float]]:
+		"""Count, mean, median and percentiles of every grade in each class.
+
+		Each class is one sort of its contiguous value array; the mean comes
+		from the per-student running sums.
+		"""
+		stats = {}
+		for cls, column in self.columns.items():
+			values = sorted(column.all_values())
+			n = len(values)
+			stats[cls] = {
+				"count": n,
+				"mean": round(sum(column.sums) / n, 2) if n else 0,
+				"min": values[0] if n else 0,
+				"p25": round(percentile(values, 25), 2),
+				"median": round(percentile(values, 50), 2),
+				"p75": round(percentile(values, 75), 2),
+				"p90": round(percentile(values, 90), 2),
+				"max": values[-1] if n else 0,
+			}
+		return stats
+
+	# --- Persistence ---
+	def save(self, path: Path):
+		"""Write a compact binary snapshot atomically (temp file + rename)."""
+		tmp = path.with_name(path.name + ".tmp")
+		with open(tmp, "wb") as f:
+			f.write(MAGIC)
+			f.write(struct.pack("<I", len(self.names)))
+			for name in self.names:
+				raw = name.encode("utf-8")
+				f.write(struct.pack("<H", len(raw)) + raw)
+			f.write(struct.pack("<H", len(self.columns)))
+			for cls, column in self.columns.items():
+				column.compact()
+				raw = cls.encode("utf-8")
+				f.write(struct.pack("<H", len(raw)) + raw)
+				f.write(struct.pack("<Q", len(column.values)))
+				column.offsets.tofile(f)
+				column.values.tofile(f)
+				column.sums.tofile(f)
+		tmp.replace(path)
+
+	@classmethod
+	def load(cls, path: Path, class_names: Iterable[str]) -> "GradeStore":
+		store = cls(class_names)
+		with open(path, "rb") as f:
+			if f.read(len(MAGIC)) != MAGIC:
+				raise ValueError(f"{path} is not a grade snapshot")
+			(n,) = struct.unpack("<I", f.read(4))
+			for _ in range(n):
+				(size,) = struct.unpack("<H", f.read(2))
+				store.add_student(f.read(size).decode("utf-8"))
+			(n_classes,) = struct.unpack("<H", f.read(2))
+			for _ in range(n_classes):
+				(size,) = struct.unpack("<H", f.read(2))
+				class_name = f.read(size).decode("utf-8")
+				(n_values,) = struct.unpack("<Q", f.read(8))
+				column = ClassColumn()
+				column.offsets = array("Q") # filled from the file below
+				column.offsets.frombytes(f.read(8 * (n + 1)))
+				column.values.frombytes(f.read(8 * n_values))
+				column.sums.frombytes(f.read(8 * n))
+				column.counts = array("I", (column.offsets[i + 1] - column.offsets[i] for i in range(n)))
+				if class_name in store.columns: # classes no longer offered are dropped
+					store.columns[class_name] = column
+		return store
+
+	@classmethod
+	def from_legacy(cls, db: Dict, class_names: Iterable[str]) -> "GradeStore":
+		"""Build a store from the old {students: {name: {classes: {cls: [grades]}}}} dict."""
+		store = cls(class_names)
+		for name, info in db.get("students", {}).items():
+			store.add_student(name)
+			for class_name, grades in (info or {}).get("classes", {}).items():
+				if class_name in store.columns:
+					for g in grades:
+						store.add_grade(name, class_name, float(g))
+		for column in store.columns.values():
+			column.compact()
+		return store
+
+	def to_legacy(self) -> Dict:
+		"""The old nested-dict structure (for JSON export)."""
+		return {"students": {
+			name: {"classes": {cls: self.grades(name, cls) for cls in self.class_names}}
+			for name in self.names
+		}}
+
+	def student_names(self, query: Optional[str] = None) -> List[str]:
+		if not query:
+			return sorted(self.names)
+		return sorted(n for n in self.names if query in n)
@@ -6,58 +6,59 @@ from pathlib import Path # for file paths
 import math # for numeric validation
 from typing import Dict, List # for type hints
 
-DATA_FILE = Path(__file__).with_suffix(".json")  # student_management_syst.json
+from grade_store import GradeStore # columnar grade storage
+
+DATA_FILE = Path(__file__).with_suffix(".json")  # student_management_syst.json (legacy format, still imported)
+SNAPSHOT_FILE = Path(__file__).with_suffix(".grades")  # binary snapshot written by save_db
 ALLOWED_CLASSES = ["Math", "Science", "English", "History"] # fixed set of classes
+REPORT_PERCENTILES = ("p25", "median", "p75", "p90") # columns of the class statistics report
 
-def load_db() -> Dict: # Load or initialize the database
-    # If file exists, load it; otherwise return empty structure
+def load_db() -> GradeStore: # Load or initialize the database
+    # Prefer the binary snapshot; fall back to the old JSON file, then to an empty store
+	if SNAPSHOT_FILE.exists(): # snapshot exists
+		try:
+			return GradeStore.load(SNAPSHOT_FILE, ALLOWED_CLASSES)
+		except (ValueError, OSError, EOFError) as e: # damaged snapshot
+			print(f"Could not read {SNAPSHOT_FILE.name}: {e}")
 	if DATA_FILE.exists(): # file exists
 		try: # try to load JSON
 			db = json.loads(DATA_FILE.read_text())
 			# Migrate student keys to lowercase for consistent lookups
 			migrate_names_to_lowercase(db)
-			return db
+			return GradeStore.from_legacy(db, ALLOWED_CLASSES)
 		except json.JSONDecodeError: # invalid JSON
 			pass
-	# structure: { students: { name: { classes: { class_name: [grades...] } } } }
-	return {"students": {}}
+	return GradeStore(ALLOWED_CLASSES)
+
+def save_db(db: GradeStore) -> None: # Save the database to file
+	db.save(SNAPSHOT_FILE)
 
-def save_db(db: Dict) -> None: # Save the database to file
-	DATA_FILE.write_text(json.dumps(db, indent=2))
+def export_json(db: GradeStore, path: Path = DATA_FILE) -> None: # Write the old nested-dict JSON format
+	path.write_text(json.dumps(db.to_legacy(), indent=2))
 
-def ensure_student(db: Dict, name: str) -> None: # Ensure student exists
-	name = normalize_name(name) # normalize name
-	students = db["students"] 
-	if name not in students: # add if missing
-		students[name] = {"classes": {}} # initialize class structure
-	# Ensure fixed set of classes always exist
-	classes = students[name]["classes"]
-	for cls in ALLOWED_CLASSES: # fixed set of classes
-		classes.setdefault(cls, [])
+def ensure_student(db: GradeStore, name: str) -> None: # Ensure student exists
+	db.add_student(normalize_name(name)) # every student has all fixed classes
 
-def add_grade(db: Dict, name: str, class_name: str, grade: float) -> None: # Add a grade to a student/class
+def add_grade(db: GradeStore, name: str, class_name: str, grade: float) -> None: # Add a grade to a student/class
 	name = normalize_name(name)
 	class_name = normalize_class(class_name)
 	if class_name not in ALLOWED_CLASSES: 
 		return
-	ensure_student(db, name) # ensure student exists
-	classes = db["students"][name]["classes"] # get classes dict
-	classes.setdefault(class_name, []) # ensure class list exists
 	g = float(grade)
 	if grade_is_valid(g):
-		classes[class_name].append(g) # add the grade
+		db.add_grade(name, class_name, g) # add the grade (creates the student if needed)
 
-def add_grades_all_subjects(db: Dict, name: str) -> None:
+def add_grades_all_subjects(db: GradeStore, name: str) -> None:
 	"""Prompt to add multiple grades for each fixed subject in one flow.
 	Requires an existing student; does not auto-create.
 	"""
 	name = normalize_name(name)
-	if name not in db["students"]: # Check if student exists
+	if name not in db: # Check if student exists
 		print("Student not found.")
 		return
 	print(f"\nAdding grades for {name} (leave blank to skip a subject)")
 	for cls in ALLOWED_CLASSES: 
-		existing = db["students"][name]["classes"].get(cls, [])
+		existing = db.grades(name, cls)
 		print(f"\nSubject: {cls}")
 		print(f"Current grades: {existing}")
 		line = input("Enter grades (comma-separated, blank to skip): ").strip()
@@ -82,67 +83,64 @@ def add_grades_all_subjects(db: Dict, name: str) -> None:
 	# Auto-save after processing all subjects for this student
 	save_db(db)
 
-def update_grade(db: Dict, name: str, class_name: str, index: int, new_grade: float) -> bool:
+def update_grade(db: GradeStore, name: str, class_name: str, index: int, new_grade: float) -> bool:
 	name = normalize_name(name)
 	class_name = normalize_class(class_name)
-	try: # try to update
-        # Validate student, class, and index
-		if class_name not in ALLOWED_CLASSES:
-			return False # invalid class
-		g = float(new_grade)
-		if not grade_is_valid(g):
-			return False
-		db["students"][name]["classes"][class_name][index] = g
-		return True # success
-	except (KeyError, IndexError):
+	# Validate student, class, and index
+	if class_name not in ALLOWED_CLASSES:
+		return False # invalid class
+	g = float(new_grade)
+	if not grade_is_valid(g):
 		return False
+	return db.set_grade(name, class_name, index, g) # False if the student or index is missing
 
-def list_students(db: Dict) -> List[str]: # Return sorted list of student names
-	return sorted(db["students"].keys())
+def list_students(db: GradeStore) -> List[str]: # Return sorted list of student names
+	return db.student_names()
 
-def print_report(db: Dict) -> None: # Print report of all students and their average grades
+def print_report(db: GradeStore) -> None: # Print report of all students and their average grades
 	print("\n=== Student Report ===")
 	for name in list_students(db):
 		print(f"\n{name}")
-		classes = db["students"][name]["classes"]
-		if not classes: # no classes
-			print("  (no classes)")
-			continue
 		# Only show allowed classes in a consistent order
 		for cls in ALLOWED_CLASSES:
-			grades = classes.get(cls, []) # get grades or empty list
-			avg = round(sum(grades) / len(grades), 2) if grades else 0
+			grades = db.grades(name, cls)
+			avg = db.average(name, cls) # kept as a running sum, no recomputation
 			print(f"  {cls}: grades={grades} avg={avg}")
 
-def show_student_grades(db: Dict, name: str) -> None:
+def print_class_stats(db: GradeStore) -> None: # Print class-wide statistics over every grade
+	stats = db.class_stats()
+	print(f"\n=== Class Statistics ({len(db)} students) ===")
+	print(f"{'Class':<10}{'Count':>9}{'Mean':>8}{'Min':>7}" + "".join(f"{p.title():>8}" for p in REPORT_PERCENTILES) + f"{'Max':>7}")
+	for cls in ALLOWED_CLASSES:
+		s = stats[cls]
+		print(f"{cls:<10}{s['count']:>9}{s['mean']:>8}{s['min']:>7}" + "".join(f"{s[p]:>8}" for p in REPORT_PERCENTILES) + f"{s['max']:>7}")
+
+def show_student_grades(db: GradeStore, name: str) -> None:
 	"""Print all subjects and enumerate grade indices for the given student."""
-	student = db["students"].get(name)
-	if not student:
+	if name not in db:
 		print("Student not found.")
 		return
-	classes = student["classes"]
 	print(f"\nGrades for {name}:")
 	for cls in ALLOWED_CLASSES: # fixed order
-		grades = classes.get(cls, [])
+		grades = db.grades(name, cls)
 		if not grades: # no grades
 			print(f"  {cls}: (no grades)")
 		else: # show indexed grades
 			indexed = ", ".join(f"{i}:{g}" for i, g in enumerate(grades))
 			print(f"  {cls}: {indexed}")
 
-def search_students(db: Dict, query: str) -> list[str]: # Search for students by name
+def search_students(db: GradeStore, query: str) -> list[str]: # Search for students by name
 	"""Return lowercase student names that contain query (case-insensitive)."""
 	q = normalize_name(query) 
 	if not q: # empty query
 		return []
-	return sorted([n for n in db.get("students", {}) if q in n])
+	return db.student_names(q)
 
-def print_student_summary(db: Dict, name: str) -> None: # Print summary of a single student
-	classes = db["students"][name]["classes"] # get classes dict
+def print_student_summary(db: GradeStore, name: str) -> None: # Print summary of a single student
 	print(f"\n{name}")
 	for cls in ALLOWED_CLASSES: # fixed order
-		grades = classes.get(cls, [])
-		avg = round(sum(grades) / len(grades), 2) if grades else 0
+		grades = db.grades(name, cls)
+		avg = db.average(name, cls)
 		print(f"  {cls}: grades={grades} avg={avg}")
 
 def normalize_class(value: str) -> str:
@@ -174,8 +172,10 @@ def migrate_names_to_lowercase(db: Dict) -> None:
 					existing_classes[cls].extend(grades)
 	db["students"] = new_map
 	# Ensure fixed classes exist for each student
-	for n in list(new_map.keys()):
-		ensure_student(db, n)
+	for val in new_map.values():
+		classes = val.setdefault("classes", {})
+		for cls in ALLOWED_CLASSES:
+			classes.setdefault(cls, [])
 
 def choose_class() -> str | None: # Prompt user to choose a class from allowed list
 	print("Choose a class:")
@@ -203,9 +203,11 @@ def menu(): # Display menu options
 	print("4) List students")
 	print("5) Search students (report)")
 	print("6) Show full report")
-	print("7) Save")
-	print("8) Clear all data")
-	print("9) Exit")
+	print("7) Class statistics")
+	print("8) Save")
+	print("9) Export JSON")
+	print("10) Clear all data")
+	print("11) Exit")
 
 def main(): # Main program loop
 	import sys
@@ -225,13 +227,13 @@ def main(): # Main program loop
 				save_db(db) # auto-save after each new student
 		elif choice == "2": # Add grades to all subjects for a student
 			name = normalize_name(input("Student name: "))
-			if not name or name not in db["students"]:
+			if not name or name not in db:
 				print("Student not found.")
 				continue
 			add_grades_all_subjects(db, name)
 		elif choice == "3": # Update a specific grade
 			name = normalize_name(input("Student name: "))
-			if name not in db["students"]:
+			if name not in db:
 				print("Student not found.")
 				continue
 			# Show all grades with indices to aid selection
@@ -240,7 +242,7 @@ def main(): # Main program loop
 			if not cls: # user cancelled
 				continue
 			# Show current selected class grades again with indices
-			sel_grades = db["students"][name]["classes"].get(cls, [])
+			sel_grades = db.grades(name, cls)
 			if sel_grades:
 				print("Current indexes for", cls, ":", ", ".join(f"{i}:{g}" for i, g in enumerate(sel_grades)))
 			else:
@@ -273,18 +275,23 @@ def main(): # Main program loop
 				print_student_summary(db, n)
 		elif choice == "6": # Show full report
 			print_report(db)
-		elif choice == "7": # Save database
+		elif choice == "7": # Class-wide statistics
+			print_class_stats(db)
+		elif choice == "8": # Save database
 			save_db(db)
-			print(f"Saved to {DATA_FILE.name}")
-		elif choice == "8": # Clear all data
+			print(f"Saved to {SNAPSHOT_FILE.name}")
+		elif choice == "9": # Export in the old JSON format
+			export_json(db)
+			print(f"Exported to {DATA_FILE.name}")
+		elif choice == "10": # Clear all data
 			confirm = input("Type YES to confirm clearing all data: ").strip()
 			if confirm == "YES":
-				db["students"] = {}
+				db.clear()
 				save_db(db)
 				print("All data cleared.")
 			else:
 				print("Cancelled.")
-		elif choice == "9": # Exit
+		elif choice == "11": # Exit
 			save_db(db)
 			print("Goodbye.")
 			break
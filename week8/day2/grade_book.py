@@ -1,34 +1,54 @@
 from pathlib import Path # for file paths
-import csv # for CSV handling
+from record_file import RecordFile # in-place row updates (the file stays CSV)
 
 DATA_FILE = Path("grades.csv") # default data file
+FIELDS = ["first_name","last_name","grades"]
+_files = {} # path -> open RecordFile
+
+def _records(path: Path) -> RecordFile: # Open each grade file once per run
+    if path not in _files:
+        _files[path] = RecordFile(str(path), FIELDS)
+    return _files[path]
+
+def _to_row(s: dict) -> dict: # Student dict -> CSV row
+    return {"first_name": s["first_name"], "last_name": s["last_name"],
+            "grades": "|".join(str(g) for g in s.get("grades", []))}
 
 def load_data(path: Path = DATA_FILE) -> list[dict]: # Load student data from CSV
     if not path.exists() or path.stat().st_size == 0: # no file or empty
         return []
     students = []
-    with open(path, newline="") as f: # open for reading
-        for row in csv.DictReader(f):
-            raw = row.get("grades", "").strip()
-            grades = []
-            if raw: # parse grades if present
-                for g in raw.split("|"): # split by |
-                    try: grades.append(int(g)) # convert to int
-                    except ValueError: pass
-            students.append({"first_name": row.get("first_name",""), "last_name": row.get("last_name",""), "grades": grades})
+    for rid, row in _records(path).items():
+        raw = (row.get("grades") or "").strip()
+        grades = []
+        if raw: # parse grades if present
+            for g in raw.split("|"): # split by |
+                try: grades.append(int(g)) # convert to int
+                except ValueError: pass
+        # _rid ties the student to its row so saving can rewrite just that row
+        students.append({"first_name": row.get("first_name",""), "last_name": row.get("last_name",""), "grades": grades, "_rid": rid})
     return students
 
 def save_data(students: list[dict], path: Path = DATA_FILE) -> None: # Save student data to CSV
-    with open(path, "w", newline="") as f: # open for writing
-        fieldnames = ["first_name","last_name","grades"]
-        writer = csv.DictWriter(f, fieldnames=fieldnames) # create writer
-        writer.writeheader() # write header
-        for s in students: # write each student
-            writer.writerow({
-                "first_name": s["first_name"],
-                "last_name": s["last_name"],
-                "grades": "|".join(str(g) for g in s.get("grades", []))
-            })
+    """Write only what changed: new students are appended, edited ones rewritten in place."""
+    records = _records(path)
+    if any(s.get("_rid") is not None and records.get(s["_rid"]) is None for s in students):
+        records.replace_all([_to_row(s) for s in students]) # file changed elsewhere: overwrite it as before
+        for s, (rid, _) in zip(students, records.items()):
+            s["_rid"] = rid
+        return
+    kept = set()
+    for s in students: # write each changed student
+        row = _to_row(s)
+        rid = s.get("_rid")
+        if rid is None or records.get(rid) is None: # new (or its row was removed meanwhile)
+            s["_rid"] = records.append(row)
+        elif records.get(rid) != row:
+            records.update(rid, row)
+        kept.add(s["_rid"])
+    for rid, _ in records.items(): # students no longer in the list
+        if rid not in kept:
+            records.delete(rid)
 
 def add_student(students: list[dict]): # Add a new student
     fn = input("First name: ").strip()
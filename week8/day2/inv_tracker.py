@@ -1,6 +1,14 @@
 import csv, os # for CSV handling and file ops
+from record_file import RecordFile # in-place row updates
 
 headers = ["item","quantity","price"] # CSV header fields
+_inventory = None # RecordFile for inventory.csv, opened on first use
+
+def inventory() -> RecordFile: # Rows of inventory.csv, indexed by lowercase item name
+    global _inventory
+    if _inventory is None:
+        _inventory = RecordFile("inventory.csv", headers, key=lambda row: row["item"].strip().lower())
+    return _inventory
 
 def ensure_header(path: str = "inventory.csv"): # Ensure CSV has header
     if not os.path.exists(path) or os.path.getsize(path) == 0: # file missing or empty
@@ -37,115 +45,94 @@ def add_inventory_item(): # Add a new inventory item
     except ValueError: # validate price
         print("Price must be a non-negative number.\n")
         return
-    with open("inventory.csv", "a", newline="") as csv_file: # append mode
-        writer = csv.DictWriter(csv_file, fieldnames=headers)
-        writer.writerow({"item": item, "quantity": quantity, "price": f"{price_val:.2f}"})
+    inventory().append({"item": item, "quantity": quantity, "price": f"{price_val:.2f}"}) # written at the end of the file
     print("Inventory item added.\n")
 
 def view_inventory_items(): # View all inventory items
-    try: # Attempt to read inventory items
-        with open("inventory.csv", "r", newline="") as csv_file:
-            reader = csv.DictReader(csv_file)
-            items = list(reader)
-            if not items: # no items found
-                print("No inventory items found.\n")
-                return
-            print("\nInventory Items:\n")
-            total_value = 0.0 # total inventory value
-            for i, row in enumerate(items, 1): # display items with numbering
-                try: # parse quantity and price
-                    q = int(row['quantity'])
-                    p = float(row['price'])
-                    total_value += q * p
-                except (ValueError, KeyError): # handle parse errors
-                    q = row.get('quantity')
-                    p = row.get('price')
-                print(f"{i}. Item: {row['item']}, Quantity: {row['quantity']}, Price: {row['price']}")
-            print(f"\nTotal inventory value: {total_value:.2f}\n")
-    except FileNotFoundError: # file does not exist
+    items = load_all_items()
+    if not items: # no items found
         print("No inventory items found.\n")
+        return
+    print("\nInventory Items:\n")
+    total_value = 0.0 # total inventory value
+    for i, row in enumerate(items, 1): # display items with numbering
+        try: # parse quantity and price
+            q = int(row['quantity'])
+            p = float(row['price'])
+            total_value += q * p
+        except (ValueError, KeyError): # handle parse errors
+            q = row.get('quantity')
+            p = row.get('price')
+        print(f"{i}. Item: {row['item']}, Quantity: {row['quantity']}, Price: {row['price']}")
+    print(f"\nTotal inventory value: {total_value:.2f}\n")
 
 def clear_inventory_items(): # Clear all inventory items
-    ensure_header()  # rewrites header
-    with open("inventory.csv", "w", newline="") as csv_file:
-        writer = csv.DictWriter(csv_file, fieldnames=headers)
-        writer.writeheader()
+    inventory().clear() # rewrites just the header
     print("Inventory cleared.\n")
 
 def search_inventory_item(): # Search for an inventory item
     term = input("Enter search term: ").strip().lower() # case-insensitive
-    try: # Attempt to read inventory items
-        with open("inventory.csv", "r", newline="") as csv_file:
-            reader = csv.DictReader(csv_file)
-            results = [row for row in reader if term in row["item"].lower()]
-            if not results: # no matches found
-                print("No matching items found.\n")
-                return
-            print("\nSearch Results:\n")
-            for i, row in enumerate(results, 1): # display results with numbering
-                print(f"{i}. Item: {row['item']}, Quantity: {row['quantity']}, Price: {row['price']}")
-            print()
-    except FileNotFoundError: # file does not exist
-        print("No inventory items found.\n")
+    results = [row for row in load_all_items() if term in row["item"].lower()]
+    results.sort(key=lambda row: row["item"].strip().lower() != term) # exact names first, otherwise file order
+    if not results: # no matches found
+        print("No matching items found.\n")
+        return
+    print("\nSearch Results:\n")
+    for i, row in enumerate(results, 1): # display results with numbering
+        print(f"{i}. Item: {row['item']}, Quantity: {row['quantity']}, Price: {row['price']}")
+    print()
 
 def load_all_items() -> list[dict]: # Load all inventory items from CSV
-    if not os.path.exists("inventory.csv"):
-        return [] # no file
-    with open("inventory.csv", "r", newline="") as f:
-        reader = csv.DictReader(f) # read as dicts
-        return list(reader)
+    return [row for _, row in inventory().items()] # kept in memory; the file is only re-read if changed elsewhere
 
 def save_all_items(items: list[dict]): # Save all inventory items to CSV
-    with open("inventory.csv", "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=headers)
-        writer.writeheader()
-        for row in items:
-            writer.writerow(row)
+    inventory().replace_all(items) # bulk rewrite; single-item changes use update()/delete()
 
-def update_item_quantity(): # Update quantity of an existing item
-    items = load_all_items() # load current items
-    if not items: # no items
-        print("No inventory items to update.\n")
-        return
-    # List items with index
+def choose_item(prompt: str): # Pick an item by number or name; returns (record id, row) or None
+    entries = inventory().items()
     print("\nItems:")
-    for i, r in enumerate(items, 1): # display with numbering
+    for i, (_, r) in enumerate(entries, 1): # display with numbering
         print(f"{i}) {r['item']} (qty {r['quantity']})")
-    choice = input("Select item number (blank cancels): ").strip()
+    choice = input(prompt).strip()
     if not choice:  # Cancel if blank
         print("Cancelled.\n")
-        return
-    if not choice.isdigit() or not (1 <= int(choice) <= len(items)):
+        return None
+    if choice.isdigit() and 1 <= int(choice) <= len(entries):
+        return entries[int(choice) - 1]
+    rid = inventory().find(choice.lower()) # item name
+    if rid is None:
         print("Invalid selection.\n") # Handle invalid menu choices
+        return None
+    return rid, inventory().get(rid)
+
+def update_item_quantity(): # Update quantity of an existing item
+    if not len(inventory()): # no items
+        print("No inventory items to update.\n")
+        return
+    picked = choose_item("Select item number or name (blank cancels): ")
+    if picked is None:
         return
-    idx = int(choice) - 1 # convert to 0-based index
-    current = items[idx] # selected item
+    rid, current = picked # selected item
     new_q_raw = input(f"New quantity for {current['item']} (current {current['quantity']}): ").strip()
     if not new_q_raw.isdigit(): # validate new quantity
         print("Quantity must be a non-negative integer.\n")
         return
-    current['quantity'] = new_q_raw # update quantity
-    save_all_items(items) # save back to CSV
+    if not inventory().update(rid, {"quantity": new_q_raw}): # rewrites just this row
+        print("Inventory changed on disk; please try again.\n")
+        return
     print("Quantity updated.\n")
 
 def remove_item(): # Remove an inventory item
-    items = load_all_items() # load current items
-    if not items: # no items
+    if not len(inventory()): # no items
         print("No inventory items to remove.\n")
         return
-    print("\nItems:")
-    for i, r in enumerate(items, 1): # display with numbering
-        print(f"{i}) {r['item']} (qty {r['quantity']})")
-    choice = input("Select item number to remove (blank cancels): ").strip()
-    if not choice:  # Cancel if blank
-        print("Cancelled.\n")
+    picked = choose_item("Select item number or name to remove (blank cancels): ")
+    if picked is None:
         return
-    if not choice.isdigit() or not (1 <= int(choice) <= len(items)):
-        print("Invalid selection.\n") # Handle invalid menu choices
+    rid, removed = picked
+    if not inventory().delete(rid): # blanks just this row
+        print("Inventory changed on disk; please try again.\n")
         return
-    idx = int(choice) - 1 # convert to 0-based index
-    removed = items.pop(idx)
-    save_all_items(items) # save back to CSV
     print(f"Removed {removed['item']}.\n")
 
 def main(): # Main program loop
@@ -173,6 +160,7 @@ def main(): # Main program loop
         elif choice == "6":
             remove_item()
         elif choice == "7":
+            inventory().close() # leaves plain CSV
             print("Exiting...\n")
             break
         else: # Handle invalid menu choices
@@ -0,0 +1,251 @@
+import atexit # for compacting back to plain CSV at exit
+import csv, io, os # for CSV handling and file ops
+
+MIN_SLACK = 16 # spare bytes given to every row so small edits fit in place
+COMPACT_RATIO = 0.5 # compact once tombstones take this share of the data
+
+class RecordFile: # CSV file whose rows are updated and deleted in place
+    """Rows of a CSV file, each with a stable record id.
+
+    While the file is open every data row sits in a slot: the CSV line,
+    padded with spaces before its line break. An update that fits its slot
+    rewrites only that slot; a bigger row blanks the slot (a tombstone)
+    and is appended with a larger one. The row keeps its place in items(),
+    and compact() writes it back there, so only an unclosed file shows it
+    at the end. A delete blanks the slot. key(row) -> record id is kept in a dict, so finding,
+    updating or deleting one row never reads or writes the whole file.
+
+    compact() rewrites the file without tombstones. It runs when
+    tombstones pile up, and at close(), which leaves plain CSV behind.
+    If another program changes the file, it is re-read on the next call.
+    """
+
+    def __init__(self, path: str, fieldnames: list[str], key=None):
+        self.path = path
+        self.fieldnames = list(fieldnames)
+        self.key = key # row -> lookup key (None: no key index)
+        self.rows = {} # record id -> row dict, in row order (rows moved by update keep their place)
+        self.slots = {} # record id -> (offset, capacity); capacity excludes the line break
+        self.index = {} # key -> record id (the first row with that key)
+        self.key_counts = {} # key -> rows with that key
+        self.dead = 0 # bytes held by tombstones
+        self.next_id = 1
+        self.file = None
+        self.stamp = None # (mtime_ns, size) after our last write
+        self._open()
+        atexit.register(self.close)
+
+    # --- Encoding ---
+    def _encode(self, row: dict) -> bytes: # one CSV line (no line break)
+        values = ["" if row.get(f) is None else str(row.get(f)) for f in self.fieldnames]
+        line = ",".join(values)
+        if (line and line.count(",") == len(values) - 1 and not any(c in line for c in '"\r\n')
+                and all(v == v.strip() for v in values)):
+            return line.encode("utf-8") # nothing needs quoting
+        quoting = csv.QUOTE_MINIMAL
+        if any(v != v.strip() for v in values): # keep edge spaces apart from the padding
+            quoting = csv.QUOTE_ALL
+        buf = io.StringIO()
+        csv.writer(buf, quoting=quoting, lineterminator="\r\n").writerow(values) # the terminator makes it quote newlines
+        return buf.getvalue()[:-2].encode("utf-8")
+
+    def _decode(self, line: bytes): # row dict, or None for a blank line or tombstone
+        text = line.decode("utf-8", errors="replace").rstrip("\r\n ")
+        if not text:
+            return None
+        values = next(csv.reader([text]), []) if '"' in text else text.split(",")
+        values += [""] * (len(self.fieldnames) - len(values))
+        return dict(zip(self.fieldnames, values))
+
+    @staticmethod
+    def _capacity(size: int) -> int:
+        return size + max(MIN_SLACK, size // 2)
+
+    # --- Loading ---
+    def _open(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            with open(self.path, "w", newline="") as f: # header only
+                csv.writer(f).writerow(self.fieldnames)
+        self.file = open(self.path, "r+b")
+        if self._scan(): # plain CSV: give every row slack once, up front
+            self.compact()
+
+    def _scan(self) -> bool:
+        """One pass over the file: offsets, rows and the key index. True if some row has no slack."""
+        self.rows, self.slots, self.index, self.key_counts, self.dead = {}, {}, {}, {}, 0
+        self.file.seek(0)
+        data = self.file.read()
+        header_end = data.find(b"\n") + 1 or len(data)
+        header = next(csv.reader([data[:header_end].decode("utf-8-sig").strip()]), [])
+        if header:
+            self.fieldnames = header
+        pos = header_end
+        unpadded = False
+        while pos < len(data):
+            end = data.find(b"\n", pos)
+            end = len(data) if end < 0 else end + 1
+            while data.find(b'"', pos, end) >= 0 and data.count(b'"', pos, end) % 2 and end < len(data): # newline inside quotes
+                nxt = data.find(b"\n", end)
+                end = len(data) if nxt < 0 else nxt + 1
+            line = data[pos:end]
+            body = line.rstrip(b"\r\n")
+            row = self._decode(body)
+            if row is None:
+                self.dead += len(body)
+            else:
+                self._remember(self.next_id, row, pos, len(body))
+                self.next_id += 1
+                unpadded = unpadded or not body.endswith(b" ")
+            pos = end
+        self.end = len(data)
+        self.newline = b"\r\n" if data[:header_end].endswith(b"\r\n") else b"\n"
+        self._stamp()
+        return unpadded
+
+    def _remember(self, rid: int, row: dict, offset: int, capacity: int, keyed: bool = True):
+        self.rows[rid] = row
+        self.slots[rid] = (offset, capacity)
+        if self.key is not None and keyed:
+            k = self.key(row)
+            self.index.setdefault(k, rid)
+            self.key_counts[k] = self.key_counts.get(k, 0) + 1
+
+    def _forget_key(self, rid: int):
+        if self.key is None:
+            return
+        k = self.key(self.rows[rid])
+        self.key_counts[k] -= 1
+        if not self.key_counts[k]:
+            del self.key_counts[k], self.index[k]
+        elif self.index[k] == rid: # a duplicate takes over (only scan when there is one)
+            self.index[k] = next(o for o, row in self.rows.items() if o != rid and self.key(row) == k)
+
+    def _stamp(self):
+        self.file.flush()
+        st = os.fstat(self.file.fileno())
+        self.stamp = (st.st_mtime_ns, st.st_size)
+
+    def refresh(self): # Re-read the file if someone else changed it
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            st = None
+        if st is None or (st.st_mtime_ns, st.st_size) != self.stamp:
+            self.file.close()
+            self._open()
+
+    # --- Reading ---
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self.rows)
+
+    def items(self) -> list[tuple[int, dict]]: # (record id, row) in row order
+        self.refresh()
+        return [(rid, dict(row)) for rid, row in self.rows.items()]
+
+    def get(self, rid: int):
+        self.refresh()
+        row = self.rows.get(rid)
+        return dict(row) if row is not None else None
+
+    def find(self, key): # record id for a key, or None
+        self.refresh()
+        return self.index.get(key)
+
+    # --- Writing ---
+    def _write_slot(self, offset: int, capacity: int, body: bytes):
+        self.file.seek(offset)
+        self.file.write(body.ljust(capacity) + self.newline)
+
+    def append(self, row: dict) -> int:
+        self.refresh()
+        body = self._encode(row)
+        rid, self.next_id = self.next_id, self.next_id + 1
+        capacity = self._capacity(len(body))
+        self._write_slot(self.end, capacity, body)
+        self._remember(rid, {f: str(row.get(f, "")) for f in self.fieldnames}, self.end, capacity)
+        self.end += capacity + len(self.newline)
+        self._stamp()
+        return rid
+
+    def update(self, rid: int, changes: dict) -> bool:
+        """Change some fields of one row; rewrites only its slot when the row still fits."""
+        self.refresh()
+        if rid not in self.rows:
+            return False
+        row = dict(self.rows[rid])
+        row.update({f: str(v) for f, v in changes.items() if f in self.fieldnames})
+        body = self._encode(row)
+        offset, capacity = self.slots[rid]
+        rekey = self.key is not None and self.key(row) != self.key(self.rows[rid])
+        if rekey:
+            self._forget_key(rid)
+        if len(body) <= capacity:
+            self._write_slot(offset, capacity, body)
+            self._remember(rid, row, offset, capacity, keyed=rekey)
+        else: # outgrew its slot: tombstone it and append with room to grow
+            self._write_slot(offset, capacity, b"")
+            self.dead += capacity
+            capacity = self._capacity(2 * len(body))
+            self._write_slot(self.end, capacity, body)
+            self._remember(rid, row, self.end, capacity, keyed=rekey)
+            self.end += capacity + len(self.newline)
+        self._stamp()
+        self._maybe_compact()
+        return True
+
+    def delete(self, rid: int) -> bool:
+        self.refresh()
+        if rid not in self.rows:
+            return False
+        offset, capacity = self.slots.pop(rid)
+        self._forget_key(rid)
+        del self.rows[rid]
+        self._write_slot(offset, capacity, b"") # tombstone: a line of spaces
+        self.dead += capacity
+        self._stamp()
+        self._maybe_compact()
+        return True
+
+    def clear(self):
+        self.rows, self.slots, self.index, self.key_counts = {}, {}, {}, {}
+        self.compact()
+
+    def replace_all(self, rows: list[dict]): # Bulk rewrite (e.g. importing a whole list)
+        self.rows, self.slots, self.index, self.key_counts = {}, {}, {}, {}
+        for row in rows:
+            self._remember(self.next_id, {f: str(row.get(f, "")) for f in self.fieldnames}, 0, 0)
+            self.next_id += 1
+        self.compact()
+
+    # --- Compaction ---
+    def _maybe_compact(self):
+        if self.dead > 4096 and self.dead > COMPACT_RATIO * self.end:
+            self.compact()
+
+    def compact(self, plain: bool = False):
+        """Rewrite the file without tombstones (and without slack if plain), atomically."""
+        tmp = self.path + ".tmp"
+        slots = {}
+        with open(tmp, "wb") as out:
+            buf = io.StringIO()
+            csv.writer(buf, lineterminator="").writerow(self.fieldnames)
+            out.write(buf.getvalue().encode("utf-8") + self.newline)
+            for rid, row in self.rows.items():
+                body = self._encode(row)
+                capacity = len(body) if plain else self._capacity(len(body))
+                slots[rid] = (out.tell(), capacity)
+                out.write(body.ljust(capacity) + self.newline)
+            end = out.tell()
+        self.file.close()
+        os.replace(tmp, self.path)
+        self.file = open(self.path, "r+b")
+        self.slots, self.end, self.dead = slots, end, 0
+        self._stamp()
+
+    def close(self): # Leave plain CSV behind
+        if self.file is None or self.file.closed:
+            return
+        self.refresh()
+        self.compact(plain=True)
+        self.file.close()
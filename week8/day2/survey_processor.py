@@ -1,9 +1,19 @@
 import csv # for CSV handling
+import io # text view of the CSV from a byte offset
+import json # for saved statistics
+import locale # the encoding open() uses when none is given
+import os # atomic file replace
+from itertools import islice # rows are counted in chunks
 from pathlib import Path # for file paths
 from collections import Counter # for counting occurrences
 
 CSV_FILE = Path("survey_results.csv") # path to survey results
+STATS_FILE = Path("survey_results.stats.json") # running totals, so analysis never rescans the CSV
 HEADER = ["name","age","gender","favorite_color","favorite_food"] # CSV header fields
+QUESTIONS = ["age","gender","favorite_color","favorite_food"] # fields with frequency tables (names are unique)
+CROSS_TABS = [("gender","favorite_color"), ("gender","favorite_food"), ("favorite_color","favorite_food")]
+BLOCK_SIZE = 1 << 20 # bytes of CSV parsed per block when streaming
+ENCODING = locale.getpreferredencoding(False) # the CSV is written with open()'s default encoding
 
 def menu(): # Display menu options
     print("\nSurvey Menu")
@@ -60,28 +70,189 @@ def migrate_legacy_format(): # Convert legacy question,answer blocks into row-ba
             elif q.startswith("What is your favorite food"):
                 data["favorite_food"] = a
         rows.append(data)
-    # Overwrite with new format
-    with open(CSV_FILE, "w", newline="") as f: # write new CSV
+    # Overwrite with new format (write a temp file, then swap it in)
+    tmp = CSV_FILE.with_name(CSV_FILE.name + ".tmp")
+    with open(tmp, "w", newline="") as f: # write new CSV
         writer = csv.DictWriter(f, fieldnames=HEADER)
         writer.writeheader()
         writer.writerows(rows)
+    os.replace(tmp, CSV_FILE)
+    if STATS_FILE.exists(): # totals were for the old layout
+        STATS_FILE.unlink()
 
-def load_rows(): # Load all rows from CSV
+class SurveyStats: # Running totals for every question, updated one row at a time
+    """Frequency tables, response count, age total and cross-tabs.
+
+    add(row) is all the work per response, so stats for millions of rows
+    cost one pass; offset remembers how far into the CSV (in bytes) the
+    totals go, so later calls only read rows appended since.
+    """
+
+    def __init__(self):
+        self.responses = 0
+        self.counts = {q: Counter() for q in QUESTIONS}
+        self.cross = {pair: Counter() for pair in CROSS_TABS} # (q1, q2) -> Counter((answer1, answer2))
+        self.age_total = 0
+        self.age_count = 0
+        self.offset = 0 # bytes of CSV_FILE already counted
+        self.size = 0 # CSV size when last saved; a smaller file means it was rewritten
+
+    def add(self, row: dict):
+        self.add_rows([{k: str(v) for k, v in row.items() if v is not None}])
+
+    def add_rows(self, rows, chunk_size=10000):
+        """Count rows (dicts of strings) a chunk at a time; Counter does the per-row work in C."""
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return self
+            self.responses += len(chunk)
+            columns = {q: [row.get(q, "") for row in chunk] for q in QUESTIONS}
+            for q in QUESTIONS:
+                self.counts[q].update(filter(None, columns[q])) # skip blank answers
+            ages = [int(a) for a in columns["age"] if a.isdigit()] # valid ages
+            self.age_total += sum(ages)
+            self.age_count += len(ages)
+            for q1, q2 in CROSS_TABS:
+                self.cross[(q1, q2)].update(p for p in zip(columns[q1], columns[q2]) if p[0] and p[1])
+
+    def average_age(self):
+        return round(self.age_total / self.age_count, 2) if self.age_count else 0
+
+    def most_common(self, key): # most common answer and its count
+        if not self.counts[key]:
+            return None, 0
+        return self.counts[key].most_common(1)[0]
+
+    def cross_tab(self, q1, q2, limit=5): # most common (answer1, answer2) pairs
+        return self.cross[(q1, q2)].most_common(limit)
+
+    def to_dict(self):
+        return {
+            "responses": self.responses,
+            "counts": self.counts,
+            "cross": {f"{q1}|{q2}": _nest(table) for (q1, q2), table in self.cross.items()},
+            "age_total": self.age_total,
+            "age_count": self.age_count,
+            "offset": self.offset,
+            "size": self.size,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.responses = data["responses"]
+        for q in QUESTIONS:
+            stats.counts[q] = Counter(data["counts"].get(q, {}))
+        for q1, q2 in CROSS_TABS:
+            table = data["cross"].get(f"{q1}|{q2}", {})
+            stats.cross[(q1, q2)] = Counter({(a1, a2): n for a1, row in table.items() for a2, n in row.items()})
+        stats.age_total = data["age_total"]
+        stats.age_count = data["age_count"]
+        stats.offset = data["offset"]
+        stats.size = data.get("size", stats.offset)
+        return stats
+
+def _nest(pairs: Counter) -> dict: # {(a1, a2): n} -> {a1: {a2: n}} for JSON
+    table = {}
+    for (a1, a2), n in pairs.items():
+        table.setdefault(a1, {})[a2] = n
+    return table
+
+def save_stats(stats: SurveyStats): # Write the totals atomically
+    tmp = STATS_FILE.with_name(STATS_FILE.name + ".tmp")
+    tmp.write_text(json.dumps(stats.to_dict()))
+    os.replace(tmp, STATS_FILE)
+
+def iter_rows(offset=0, stats=None): # Stream rows as dicts, starting at a byte offset
+    """Yield CSV rows one at a time without loading the file.
+
+    Rows start after the header (or at offset, if later). If stats is
+    given, its offset is moved past each block once its rows are yielded.
+    Blocks end only between records: a line break inside a quoted field
+    (an even number of quotes not yet seen) carries the row into the next block.
+    """
     if not CSV_FILE.exists() or CSV_FILE.stat().st_size == 0:
-        return []
-    with open(CSV_FILE, newline="") as f: # open for reading
-        reader = csv.DictReader(f)
-        return list(reader)
+        return
+    with open(CSV_FILE, "rb") as raw:
+        header_line = raw.readline()
+        fieldnames = next(csv.reader([header_line.decode(ENCODING)]), None) or HEADER
+        if offset > raw.tell():
+            raw.seek(offset)
+        if stats is not None:
+            stats.offset = raw.tell() # the header is never a response
+        carry = b"" # start of a record whose quoted field continues past the block
+        open_quote = False
+        while True:
+            lines = raw.readlines(BLOCK_SIZE) # whole lines, about BLOCK_SIZE bytes
+            if not lines:
+                break
+            partial = not lines[-1].endswith(b"\n") # EOF in the middle of a row still being written
+            if partial:
+                lines.pop()
+            end = 0 # lines[:end] finish on a record boundary
+            for i, line in enumerate(lines, 1):
+                if line.count(b'"') % 2:
+                    open_quote = not open_quote
+                if not open_quote:
+                    end = i
+            block = carry + b"".join(lines[:end]) if end else b""
+            carry = b"".join(lines[end:]) if end else carry + b"".join(lines)
+            if block:
+                for values in csv.reader(io.StringIO(block.decode(ENCODING), newline="")):
+                    if values: # skip blank lines
+                        yield dict(zip(fieldnames, values))
+                if stats is not None:
+                    stats.offset += len(block)
+            if partial:
+                break
+
+def load_stats(save=True) -> SurveyStats: # Saved totals, caught up with rows appended since
+    stats = None
+    size = CSV_FILE.stat().st_size if CSV_FILE.exists() else 0
+    if STATS_FILE.exists():
+        try:
+            stats = SurveyStats.from_dict(json.loads(STATS_FILE.read_text()))
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+            stats = None # unreadable; rebuild
+    if stats is None or size < stats.size: # missing, or the CSV was rewritten
+        stats = SurveyStats()
+    before = stats.offset
+    stats.add_rows(iter_rows(stats.offset, stats))
+    stats.size = size
+    if save and (stats.offset != before or not STATS_FILE.exists()):
+        save_stats(stats)
+    return stats
 
-def append_row(row: dict): # Append a single row to CSV
+def load_rows(): # Load all rows from CSV
+    return list(iter_rows())
+
+def append_row(row: dict): # Append a single row to CSV and fold it into the saved totals
     ensure_header()
+    stats = load_stats(save=False) # also picks up rows appended by other tools
     with open(CSV_FILE, "a", newline="") as f:
         writer = csv.DictWriter(f, fieldnames=HEADER)
         writer.writerow(row)
+        f.flush()
+        end = f.tell()
+    if stats.offset == end - len(_csv_line(row)): # nothing else was appended in between
+        stats.add({k: str(v) for k, v in row.items()})
+        stats.offset = stats.size = end
+        save_stats(stats)
+    else:
+        load_stats()
+
+def _csv_line(row: dict) -> bytes: # the bytes DictWriter writes for row
+    buf = io.StringIO(newline="")
+    csv.DictWriter(buf, fieldnames=HEADER).writerow(row)
+    return buf.getvalue().encode(ENCODING)
 
 def clear_results(): # Clear all survey results
     if CSV_FILE.exists():
         CSV_FILE.unlink()
+    if STATS_FILE.exists():
+        STATS_FILE.unlink()
     print("All survey results cleared.\n")
 
 def survey_questions(): # Ask survey questions and return responses as dict
@@ -101,37 +272,36 @@ def survey_questions(): # Ask survey questions and return responses as dict
     return {"name": name, "age": age, "gender": gender, "favorite_color": favorite_color, "favorite_food": favorite_food}
 
 def view_results(): # View all raw rows
-    rows = load_rows()
-    if not rows: # No survey results found
+    found = False
+    for i, r in enumerate(iter_rows(), 1): # display rows with numbering
+        if not found:
+            print("\nRaw Rows:")
+            found = True
+        print(f"{i}. {r}")
+    if not found: # No survey results found
         print("No survey results found.\n")
         return
-    print("\nRaw Rows:")
-    for i, r in enumerate(rows, 1): # display rows with numbering
-        print(f"{i}. {r}")
     print()
 
-def analyze_data(): # Analyze survey data
-    rows = load_rows()
-    if not rows: # No data to analyze
+def analyze_data(): # Analyze survey data from the running totals
+    stats = load_stats()
+    if not stats.responses: # No data to analyze
         print("No data to analyze.\n")
         return
-    ages = [int(r["age"]) for r in rows if r.get("age") and str(r["age"]).isdigit()] # valid ages
-    avg_age = round(sum(ages)/len(ages),2) if ages else 0 # average age
-    def most_common(key): # helper to find most common value for a key
-        vals = [r[key] for r in rows if r.get(key)] # get values
-        if not vals:
-            return None, 0
-        c = Counter(vals) # count occurrences
-        item, count = c.most_common(1)[0]
-        return item, count
-    gender, gcount = most_common("gender")
-    color, ccount = most_common("favorite_color")
-    food, fcount = most_common("favorite_food")
+    gender, gcount = stats.most_common("gender")
+    color, ccount = stats.most_common("favorite_color")
+    food, fcount = stats.most_common("favorite_food")
     print("\nAnalysis:")
-    print(f"Average Age: {avg_age if ages else 'No age data'}")
+    print(f"Responses: {stats.responses}")
+    print(f"Average Age: {stats.average_age() if stats.age_count else 'No age data'}")
     print(f"Most Common Gender: {gender} ({gcount})" if gender else "No gender data.")
     print(f"Most Common Color: {color} ({ccount})" if color else "No color data.")
     print(f"Most Common Food: {food} ({fcount})" if food else "No food data.")
+    for q1, q2 in CROSS_TABS: # top answer combinations
+        top = stats.cross_tab(q1, q2, limit=3)
+        if top:
+            pairs = ", ".join(f"{a1} + {a2} ({n})" for (a1, a2), n in top)
+            print(f"Top {q1} + {q2}: {pairs}")
     print()
 
 def main(): # Main program loop
@@ -1,4 +1,44 @@
+import hashlib
+import json
 import os
+import random
+import re
+import shutil
+import tempfile
+import time
+import zlib
+
+# Backups are split into content-defined chunks stored once under backup/chunks/,
+# so versions of a file share every chunk that did not change. Each version is a
+# list of chunk hashes (backup/versions/<name>_vN<ext>.chunks); backup/manifest.json
+# maps each file to its versions and its latest one.
+MANIFEST_NAME = "manifest.json"
+CHUNK_DIR = "chunks"
+VERSION_DIR = "versions"
+RESTORE_DIR = "restored" # restores land here unless a destination is given, never over the live file
+READ_SIZE = 4 * 1024 * 1024 # bytes read from the source at a time
+MIN_CHUNK = 16 * 1024
+MAX_CHUNK = 256 * 1024 # average chunk is about MIN_CHUNK + 64 KiB
+WINDOW = 32 # bytes hashed to decide whether a candidate is a cut point
+
+# Cut-point candidates are two-byte pairs from fixed byte sets, found by the
+# regex engine in C; a candidate becomes a cut when the crc32 of the WINDOW
+# bytes before it ends in 0x00. For text the pairs are word endings (a common
+# final letter, then a separator); eight fixed pseudo-random bytes per set
+# cover binary data (about 1 in 256 positions of random bytes). Boundaries
+# depend only on nearby content, so inserting bytes early in a file only
+# changes the chunks around the insertion. 0x00/0xff are never candidates, so
+# zero-filled pages fall back to MAX_CHUNK cuts instead of a candidate per byte.
+WORD_ENDS = b"estdnryo"
+SEPARATORS = b" \n\t.,;:\""
+
+def _byte_class(text_bytes, rng):
+    other = [b for b in range(1, 255) if b not in WORD_ENDS + SEPARATORS]
+    chosen = list(text_bytes) + rng.sample(other, 8)
+    return b"[" + b"".join(re.escape(bytes([b])) for b in sorted(chosen)) + b"]"
+
+_rng = random.Random(0x0DDBA11)
+CANDIDATE = re.compile(_byte_class(WORD_ENDS, _rng) + _byte_class(SEPARATORS, _rng))
 
 def ensure_backup_dir(): # Ensure backup directory exists
     backup_dir = "backup"
@@ -7,27 +47,175 @@ def ensure_backup_dir(): # Ensure backup directory exists
         print(f"Created backup directory: {backup_dir}")
     return backup_dir
 
+def load_manifest(backup_dir: str) -> dict: # {"files": {base_name: {"latest": n, "versions": {n: info}}}}
+    path = os.path.join(backup_dir, MANIFEST_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"files": {}}
+
+def save_manifest(backup_dir: str, manifest: dict): # Write the manifest atomically
+    _atomic_write(os.path.join(backup_dir, MANIFEST_NAME), json.dumps(manifest, indent=2).encode("utf-8"))
+
+def _atomic_write(path: str, data: bytes):
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+def chunk_boundaries(buf, start: int = 0, final: bool = False):
+    """Yield end offsets of content-defined chunks in buf, beginning at start.
+
+    Without final, the bytes after the last boundary are left for the next
+    read (the caller carries them over); with final, the tail is a chunk.
+    """
+    n = len(buf)
+    while True:
+        if n - start <= MIN_CHUNK or (not final and n - start < MAX_CHUNK):
+            if final and n > start:
+                yield n
+            return
+        limit = min(start + MAX_CHUNK, n)
+        pos = start + MIN_CHUNK
+        cut = limit
+        while True:
+            m = CANDIDATE.search(buf, pos, limit)
+            if m is None:
+                break
+            end = m.end()
+            if zlib.crc32(buf[end - WINDOW:end]) & 0xFF == 0:
+                cut = end
+                break
+            pos = m.start() + 1
+        if cut == limit and limit == n and not final:
+            return # no cut point yet; wait for more data
+        yield cut
+        start = cut
+
+def iter_chunks(src, read_size: int = READ_SIZE):
+    """Stream (data) chunks from a binary file; memory stays about read_size + MAX_CHUNK."""
+    buf = b""
+    while True:
+        block = src.read(read_size)
+        final = not block
+        if block:
+            buf = buf + block if buf else block
+        start = 0
+        for end in chunk_boundaries(buf, 0, final):
+            yield buf[start:end]
+            start = end
+        buf = buf[start:]
+        if final:
+            return
+
+def chunk_path(backup_dir: str, digest: str) -> str:
+    return os.path.join(backup_dir, CHUNK_DIR, digest[:2], digest)
+
+def _store_chunk(backup_dir: str, data: bytes) -> tuple[str, bool]: # (hash, newly stored?)
+    digest = hashlib.sha256(data).hexdigest()
+    path = chunk_path(backup_dir, digest)
+    if os.path.exists(path): # already stored by this or another version
+        return digest, False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _atomic_write(path, data)
+    return digest, True
+
+def _version_name(base_name: str, version: int) -> str: # same naming as the old full copies
+    name, ext = os.path.splitext(base_name)
+    return f"{name}_v{version}{ext}" if version > 1 else base_name
+
 def backup_file(file_path: str): # Backup any file (binary-safe) with versioning
     if not os.path.isfile(file_path):
         print(f"File not found: {file_path}")
         return
     backup_dir = ensure_backup_dir()
     base_name = os.path.basename(file_path)
-    name, ext = os.path.splitext(base_name)
-    # Find next version to avoid overwrite
-    version = 1
-    while True:
-        candidate = f"{name}_v{version}{ext}" if version > 1 else base_name
-        backup_path = os.path.join(backup_dir, candidate)
-        if not os.path.exists(backup_path):
-            break
-        version += 1
+    manifest = load_manifest(backup_dir)
+    entry = manifest["files"].setdefault(base_name, {"latest": 0, "versions": {}})
+    latest = entry["versions"].get(str(entry["latest"])) # O(1) latest-version lookup
+    st = os.stat(file_path)
+    if latest and latest["size"] == st.st_size and latest["mtime_ns"] == st.st_mtime_ns:
+        print(f"Unchanged since {latest['name']}; skipped.")
+        return
+    version = entry["latest"] + 1
+    version_name = _version_name(base_name, version)
+    recipe_path = os.path.join(backup_dir, VERSION_DIR, version_name + ".chunks")
+    os.makedirs(os.path.dirname(recipe_path), exist_ok=True)
+    whole = hashlib.sha256()
+    chunks = new_chunks = new_bytes = 0
     try:
-        with open(file_path, "rb") as src, open(backup_path, "wb") as dst:
-            dst.write(src.read())
-        print(f"Backed up to {backup_path}")
+        with open(file_path, "rb") as src, open(recipe_path + ".tmp", "w", encoding="ascii") as recipe:
+            for data in iter_chunks(src):
+                whole.update(data)
+                digest, is_new = _store_chunk(backup_dir, data)
+                recipe.write(digest + "\n")
+                chunks += 1
+                if is_new:
+                    new_chunks += 1
+                    new_bytes += len(data)
+        if latest and latest["sha256"] == whole.hexdigest(): # touched but identical
+            os.remove(recipe_path + ".tmp")
+            latest["mtime_ns"] = st.st_mtime_ns
+            save_manifest(backup_dir, manifest)
+            print(f"Content unchanged since {latest['name']}; skipped.")
+            return
+        os.replace(recipe_path + ".tmp", recipe_path)
     except OSError as e:
         print(f"Backup failed: {e}")
+        return
+    entry["versions"][str(version)] = {
+        "name": version_name,
+        "source": os.path.abspath(file_path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": whole.hexdigest(),
+        "chunks": chunks,
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    entry["latest"] = version
+    save_manifest(backup_dir, manifest)
+    print(f"Backed up to {version_name} ({chunks} chunks, {new_chunks} new, {new_bytes} new bytes)")
+
+def restore_file(base_name: str, version: int | None = None, dest: str | None = None): # Rebuild a version from its chunks
+    backup_dir = ensure_backup_dir()
+    entry = load_manifest(backup_dir)["files"].get(base_name)
+    if not entry:
+        print(f"No backups of {base_name}.")
+        return
+    version = version or entry["latest"]
+    info = entry["versions"].get(str(version))
+    if not info:
+        print(f"No version {version} of {base_name}.")
+        return
+    if not dest:
+        os.makedirs(RESTORE_DIR, exist_ok=True)
+        dest = os.path.join(RESTORE_DIR, info["name"])
+    recipe_path = os.path.join(backup_dir, VERSION_DIR, info["name"] + ".chunks")
+    whole = hashlib.sha256()
+    try:
+        with open(recipe_path, "r", encoding="ascii") as recipe, open(dest + ".tmp", "wb") as dst:
+            for line in recipe:
+                with open(chunk_path(backup_dir, line.strip()), "rb") as chunk:
+                    data = chunk.read() # one chunk (<= MAX_CHUNK) at a time
+                whole.update(data)
+                dst.write(data)
+        if whole.hexdigest() != info["sha256"]:
+            os.remove(dest + ".tmp")
+            print(f"Restore failed: {info['name']} does not match its checksum.")
+            return
+        os.replace(dest + ".tmp", dest)
+    except OSError as e:
+        print(f"Restore failed: {e}")
+        return
+    print(f"Restored {info['name']} to {dest}")
 
 def add_file(file_path: str): # Add a new file to be backed up
     if not os.path.isfile(file_path):
@@ -39,14 +227,29 @@ def add_file(file_path: str): # Add a new file to be backed up
 
 def list_backup_files(): # Unified listing of backup files
     backup_dir = ensure_backup_dir()
-    files = sorted(os.listdir(backup_dir))
-    if not files:
+    manifest = load_manifest(backup_dir)
+    internal = {MANIFEST_NAME, CHUNK_DIR, VERSION_DIR}
+    legacy = sorted(f for f in os.listdir(backup_dir) if f not in internal and os.path.isfile(os.path.join(backup_dir, f)))
+    if not manifest["files"] and not legacy:
         print("No backup files found.")
         return
     print("Backup files:")
-    for f in files:
+    logical = 0
+    for base_name in sorted(manifest["files"]):
+        entry = manifest["files"][base_name]
+        for v in sorted(entry["versions"], key=int):
+            info = entry["versions"][v]
+            logical += info["size"]
+            latest = " (latest)" if int(v) == entry["latest"] else ""
+            print(f"- {info['name']} ({info['size']} bytes, {info['chunks']} chunks, {info['time']}){latest}")
+    for f in legacy: # full copies made before chunked backups
         size = os.path.getsize(os.path.join(backup_dir, f))
         print(f"- {f} ({size} bytes)")
+    if manifest["files"]:
+        stored = 0
+        for root, _dirs, files in os.walk(os.path.join(backup_dir, CHUNK_DIR)):
+            stored += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+        print(f"Versions total {logical} bytes; chunk store uses {stored} bytes.")
 
 def clear_backups(): # Clear all files in the backup directory with confirmation
     backup_dir = ensure_backup_dir()
@@ -59,8 +262,12 @@ def clear_backups(): # Clear all files in the backup directory with confirmation
         print("Cancelled.")
         return
     for f in files:
+        path = os.path.join(backup_dir, f)
         try:
-            os.remove(os.path.join(backup_dir, f))
+            if os.path.isdir(path): # chunk store and version lists
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
         except OSError as e:
             print(f"Failed to remove {f}: {e}")
     print("Cleared all backup files.")
@@ -84,7 +291,8 @@ def menu(): # Display menu options
     print("3. List backup files")
     print("4. Clear backups")
     print("5. View files in current directory")
-    print("6. Exit\n")
+    print("6. Restore a backup")
+    print("7. Exit\n")
 
 def main(): # Main program loop
     while True: # Loop until user chooses to exit
@@ -109,6 +317,15 @@ def main(): # Main program loop
         elif choice == "5":
             view_files()
         elif choice == "6":
+            base_name = input("File name to restore (e.g. data.db): ").strip()
+            version = input("Version (blank for latest): ").strip()
+            if not base_name:
+                print("No name provided.")
+            elif version and not version.isdigit():
+                print("Version must be a number.")
+            else:
+                restore_file(base_name, int(version) if version else None)
+        elif choice == "7":
             print("Exiting...")
             break
         else:
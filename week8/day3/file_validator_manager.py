@@ -1,8 +1,44 @@
+import argparse
+import csv
+import json
 import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 
 # Registry mapping extension to validator function
 VALIDATORS = {}
 LAST_REPORT = None  # store last validation result
+DEFAULT_MAX_ISSUES = 100  # messages kept per file; further issues are only counted
+CACHE_FILE = '.validator_cache.json'
+
+
+class IssueLog:
+    """Issues found in one file: every issue is counted by kind, but only the
+    first max_issues messages are kept (none in counts_only mode)."""
+
+    def __init__(self, max_issues=None, counts_only=False):
+        self.max_issues = max_issues
+        self.counts_only = counts_only
+        self.messages = []
+        self.counts = Counter()
+
+    def add(self, kind, message):
+        self.counts[kind] += 1
+        if not self.counts_only and (self.max_issues is None or len(self.messages) < self.max_issues):
+            self.messages.append(message)
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    @property
+    def ok(self):
+        return not self.counts
+
+    def result(self):
+        return self.ok, self.messages
 
 
 def validator(ext):
@@ -13,41 +49,46 @@ def validator(ext):
 
 
 @validator('.txt')
-def validate_txt(path):
+def validate_txt(path, log=None):
+    log = log or IssueLog()
     if os.path.getsize(path) == 0:
-        return False, ['File is empty']
-    issues = []
+        log.add('empty', 'File is empty')
+        return log.result()
     with open(path, 'r', encoding='utf-8', errors='replace') as f:
         for i, line in enumerate(f, 1):
             if len(line.rstrip('\n')) > 120:
-                issues.append(f'Line {i} exceeds 120 chars')
-    return (len(issues) == 0), issues
+                log.add('long_line', f'Line {i} exceeds 120 chars')
+    return log.result()
 
 
 @validator('.csv')
-def validate_csv(path):
-    issues = []
+def validate_csv(path, log=None):
+    log = log or IssueLog()
     expected_cols = None
-    with open(path, 'r', encoding='utf-8', errors='replace') as f:
-        for i, raw in enumerate(f, 1):
-            line = raw.rstrip('\n')
-            if not line:
-                issues.append(f'Line {i} empty')
-                continue
-            cols = line.split(',')
-            if expected_cols is None:
-                expected_cols = len(cols)
-            elif len(cols) != expected_cols:
-                issues.append(f'Line {i} has {len(cols)} columns (expected {expected_cols})')
+    # csv.reader handles quoted commas and newlines inside fields
+    with open(path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+        reader = csv.reader(f, strict=True)
+        try:
+            for row in reader:
+                i = reader.line_num
+                if not row:
+                    log.add('empty_line', f'Line {i} empty')
+                    continue
+                if expected_cols is None:
+                    expected_cols = len(row)
+                elif len(row) != expected_cols:
+                    log.add('column_count', f'Line {i} has {len(row)} columns (expected {expected_cols})')
+        except csv.Error as e:  # e.g. an unterminated quote
+            log.add('parse_error', f'Line {reader.line_num}: {e}')
     if expected_cols is None:
-        issues.append('File is empty')
-    return (len(issues) == 0), issues
+        log.add('empty', 'File is empty')
+    return log.result()
 
 
 @validator('.cfg')
 @validator('.ini')
-def validate_kv(path):
-    issues = []
+def validate_kv(path, log=None):
+    log = log or IssueLog()
     seen = set()
     with open(path, 'r', encoding='utf-8', errors='replace') as f:
         for i, raw in enumerate(f, 1):
@@ -55,20 +96,20 @@ def validate_kv(path):
             if not line or line.startswith('#') or line.startswith(';'):
                 continue
             if '=' not in line:
-                issues.append(f'Line {i}: missing =')
+                log.add('missing_equals', f'Line {i}: missing =')
                 continue
             key, value = line.split('=', 1)
             key = key.strip()
             if not key:
-                issues.append(f'Line {i}: empty key')
+                log.add('empty_key', f'Line {i}: empty key')
             if key in seen:
-                issues.append(f'Line {i}: duplicate key {key!r}')
+                log.add('duplicate_key', f'Line {i}: duplicate key {key!r}')
             seen.add(key)
             if value.strip() == '':
-                issues.append(f'Line {i}: empty value')
-    if not seen and not issues:
-        issues.append('No key=value pairs found')
-    return (len(issues) == 0), issues
+                log.add('empty_value', f'Line {i}: empty value')
+    if not seen and log.ok:
+        log.add('no_pairs', 'No key=value pairs found')
+    return log.result()
 
 
 def choose_file():
@@ -89,6 +130,135 @@ def find_validator(path):
     return None
 
 
+def check_file(path, max_issues=DEFAULT_MAX_ISSUES, counts_only=False):
+    """Validate one file and return a JSON-ready result dict (runs in pool workers)."""
+    result = {'path': path, 'validator': None, 'ok': False}
+    try:
+        st = os.stat(path)
+        result['size'], result['mtime_ns'] = st.st_size, st.st_mtime_ns
+        func = find_validator(path)
+        if func is None:
+            result['error'] = 'No validator registered for this file type'
+            return result
+        result['validator'] = func.__name__
+        log = IssueLog(max_issues, counts_only)
+        func(path, log)
+    except OSError as e:
+        result['error'] = str(e)
+        return result
+    result['ok'] = log.ok
+    result['issue_count'] = log.total
+    result['issue_counts'] = dict(log.counts)
+    if not counts_only:
+        result['issues'] = log.messages
+        result['truncated'] = log.total > len(log.messages)
+    return result
+
+
+def iter_files(paths):
+    """Yield files with a registered extension under paths (files or directories), recursively."""
+    exts = tuple(VALIDATORS)
+    stack = list(paths)
+    while stack:
+        p = stack.pop()
+        if os.path.isfile(p):
+            yield p
+            continue
+        try:
+            with os.scandir(p) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file() and entry.name.endswith(exts):
+                        yield entry.path
+        except OSError as e:
+            print(f'Cannot read {p}: {e}', file=sys.stderr)
+
+
+def load_cache(path, options):
+    """Cached results keyed by file path; dropped if the options changed."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if data.get('options') != options:
+        return {}
+    return data.get('files', {})
+
+
+def save_cache(path, options, files):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'options': options, 'files': files}, f)
+    os.replace(tmp, path)
+
+
+def validate_tree(paths, workers=None, max_issues=DEFAULT_MAX_ISSUES, counts_only=False,
+                  cache_path=CACHE_FILE, report_path=None, report_format='jsonl'):
+    """Validate every matching file under paths; returns (summary, results).
+
+    Files whose (path, mtime, size) match the cache reuse the cached result;
+    the rest are validated across a process pool. Results are written to
+    report_path as one JSON object per line (jsonl) or a single JSON document.
+    """
+    options = {'max_issues': max_issues, 'counts_only': counts_only}
+    cache = load_cache(cache_path, options) if cache_path else {}
+    fresh = {p: r for p, r in cache.items() if os.path.exists(p)}  # keeps other trees' entries
+    todo = []
+    results = []
+    for path in iter_files(paths):
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        hit = cache.get(path)
+        if hit and hit.get('mtime_ns') == st.st_mtime_ns and hit.get('size') == st.st_size:
+            results.append(hit)
+        else:
+            todo.append(path)
+    started = time.perf_counter()
+    if todo:
+        if workers == 1 or len(todo) < 50:  # not worth starting processes
+            checked = [check_file(p, max_issues, counts_only) for p in todo]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunk = max(1, min(256, len(todo) // ((workers or os.cpu_count() or 1) * 8)))
+                checked = list(pool.map(check_file, todo, [max_issues] * len(todo),
+                                        [counts_only] * len(todo), chunksize=chunk))
+        for r in checked:
+            if 'mtime_ns' in r:  # don't cache files that vanished mid-run
+                fresh[r['path']] = r
+        results.extend(checked)
+    results.sort(key=lambda r: r['path'])
+    summary = {
+        'files': len(results),
+        'validated': len(todo),
+        'cached': len(results) - len(todo),
+        'passed': sum(1 for r in results if r['ok']),
+        'failed': sum(1 for r in results if not r['ok']),
+        'issues': sum(r.get('issue_count', 0) for r in results),
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+    if cache_path:
+        save_cache(cache_path, options, fresh)  # deleted files drop out
+    if report_path:
+        write_report(report_path, results, summary, report_format)
+    return summary, results
+
+
+def write_report(path, results, summary, report_format='jsonl'):
+    with open(path, 'w', encoding='utf-8') as f:
+        if report_format == 'json':
+            json.dump({'summary': summary, 'results': results}, f, indent=2)
+            f.write('\n')
+        else:  # jsonl: one result per line, summary last
+            for r in results:
+                f.write(json.dumps(r) + '\n')
+            f.write(json.dumps({'summary': summary}) + '\n')
+
+
 def validate_file():
     global LAST_REPORT
     path = choose_file()
@@ -98,7 +268,10 @@ def validate_file():
     if not validator_func:
         print('No validator registered for this file type')
         return
-    ok, issues = validator_func(path)
+    log = IssueLog(DEFAULT_MAX_ISSUES)
+    ok, issues = validator_func(path, log)
+    if log.total > len(issues):
+        issues = issues + [f'... {log.total - len(issues)} more issue(s) not shown']
     LAST_REPORT = (path, ok, issues)
     print(f'Validation result for {path}:')
     if ok:
@@ -111,6 +284,20 @@ def validate_file():
             print('   -', msg)
 
 
+def validate_directory():
+    root = input('Enter directory to validate: ').strip()
+    if not root or not os.path.isdir(root):
+        print('Directory not found')
+        return
+    summary, results = validate_tree([root])
+    for r in results:
+        if not r['ok']:
+            detail = r.get('error') or ', '.join(f'{k}={n}' for k, n in r['issue_counts'].items())
+            print(f'  FAIL {r["path"]}: {detail}')
+    print(f'{summary["files"]} files ({summary["cached"]} unchanged), '
+          f'{summary["passed"]} passed, {summary["failed"]} failed')
+
+
 def show_last_report():
     if not LAST_REPORT:
         print('No report yet.')
@@ -136,7 +323,8 @@ def menu():
     print('1) Validate a file')
     print('2) Show last report')
     print('3) List validators')
-    print('4) Exit')
+    print('4) Validate a directory')
+    print('5) Exit')
     return input('Choose: ').strip()
 
 
@@ -150,11 +338,35 @@ def main():
         elif choice == '3':
             list_validators()
         elif choice == '4':
+            validate_directory()
+        elif choice == '5':
             print('Goodbye.')
             break
         else:
             print('Invalid choice.')
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Validate files; with no paths, start the interactive menu.')
+    parser.add_argument('paths', nargs='*', help='files or directories (searched recursively)')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--max-issues', type=int, default=DEFAULT_MAX_ISSUES, help='messages kept per file')
+    parser.add_argument('--counts-only', action='store_true', help='report issue counts per kind, no messages')
+    parser.add_argument('--cache', default=CACHE_FILE, help='result cache file ("" to disable)')
+    parser.add_argument('--report', help='write results to this file')
+    parser.add_argument('--format', choices=['jsonl', 'json'], default='jsonl', help='report format')
+    return parser.parse_args(argv)
+
+
+def run_cli(args):
+    summary, _ = validate_tree(args.paths, args.workers, args.max_issues, args.counts_only,
+                               args.cache or None, args.report, args.format)
+    print(json.dumps(summary))
+    return 0 if summary['failed'] == 0 else 1
+
+
 if __name__ == '__main__':
+    cli_args = parse_args()
+    if cli_args.paths:
+        sys.exit(run_cli(cli_args))
     main()
@@ -1,32 +1,41 @@
-import json
+import os
+import sqlite3
+import sys
+
+# shared contact store lives with the week12 sqlite manager
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "week12", "day2"))
+from contact_store import ContactStore # indexed SQLite contacts
 
 # Simple contact database application
-# Allows users to add, view, save, and load contacts stored in a JSON file.
+# Contacts are kept in contacts.db (every change is saved right away);
+# contacts.json can still be written and read as an export/import file.
+DB_FILE = "contacts.db"
+JSON_FILE = "contacts.json"
 
 def menu(): # Display menu options
     print("Contact Database Menu")
     print("1. Add Contact")
     print("2. View Contacts")
-    print("3. Save Contacts to File")
-    print("4. Load Contacts from File")
+    print("3. Export Contacts to contacts.json")
+    print("4. Import Contacts from contacts.json")
     print("5. Remove Contact")
     print("6. Exit")
 
-def add_contact(contacts): # Add a new contact
+def add_contact(store): # Add a new contact
     name = input("Enter name: ").strip()
     phone = input("Enter phone number: ").strip()
     email = input("Enter email address: ").strip()
     if not name or not phone or not email: # validate input
         print("All fields are required.\n")
         return
-    contact = {"name": name, "phone": phone, "email": email}
-    contacts.append(contact) # add to list
-    print("Contact added (not yet saved).\n")
+    store.add(name, phone, email) # saved immediately
+    print("Contact added.\n")
 
-def view_contacts(contacts): # View all contacts
+def view_contacts(store): # View all contacts
+    contacts = store.all()
     if not contacts:
-        print("\nNo contacts in memory. Use option 1 to add or option 4 to load from file.\n")
-        return
+        print("\nNo contacts yet. Use option 1 to add or option 4 to import from file.\n")
+        return contacts
     print("\nContacts:")
     for i, c in enumerate(contacts, 1): # display contacts with numbering
         name = c.get("name", "?")
@@ -34,33 +43,28 @@ def view_contacts(contacts): # View all contacts
         email = c.get("email", "?")
         print(f"{i}. {name} | {phone} | {email}")
     print()
+    return contacts
 
-def save_contacts(contacts): # Save contacts to JSON file
+def save_contacts(store): # Export contacts to the JSON file
     try: # ensure file operations are safe
-        with open("contacts.json", "w", encoding="utf-8") as file:
-            json.dump(contacts, file, indent=4, ensure_ascii=False)
-        print("Contacts saved to contacts.json.\n")
+        count = store.export_file(JSON_FILE)
+        print(f"{count} contacts saved to {JSON_FILE}.\n")
     except OSError as e: # handle file errors
         print(f"Failed to save contacts: {e}\n")
 
-def load_contacts(): # Load contacts from JSON file
+def load_contacts(store): # Replace the stored contacts with the JSON file's
     try: # ensure file operations are safe
-        with open("contacts.json", "r", encoding="utf-8") as file: # Open file for reading
-            contacts = json.load(file) 
-        print(f"Loaded {len(contacts)} contacts from contacts.json.\n")
-        return contacts
+        count = store.import_file(JSON_FILE, replace=True)
+        print(f"Loaded {count} contacts from {JSON_FILE}.\n")
     except FileNotFoundError: # file does not exist
         print("No saved contacts found.\n")
-        return []
-    except json.JSONDecodeError: # handle JSON errors
-        print("Error reading contacts file. Starting with empty contact list.\n")
-        return []
-    
-def remove_contact(contacts): # Remove a contact by number
+    except (ValueError, sqlite3.Error): # handle JSON errors (store is left unchanged)
+        print("Error reading contacts file. Keeping the current contacts.\n")
+
+def remove_contact(store): # Remove a contact by number
+    contacts = view_contacts(store)
     if not contacts:
-        print("\nNo contacts to remove.\n")
         return
-    view_contacts(contacts)
     choice = input("Enter the number of the contact to remove (or blank to cancel): ").strip()
     if not choice:
         print("Cancelled.\n")
@@ -72,25 +76,32 @@ def remove_contact(contacts): # Remove a contact by number
     if idx < 1 or idx > len(contacts):
         print("Number out of range.\n")
         return
-    removed = contacts.pop(idx - 1)
+    removed = contacts[idx - 1]
+    store.delete(removed["id"])
     print(f"Removed: {removed.get('name','?')} | {removed.get('phone','?')} | {removed.get('email','?')}\n")
 
 def main(): # Main program loop
-    contacts = []
+    store = ContactStore(DB_FILE)
     while True: # Main loop
         menu()
         choice = input("Choose an option: ")
         if choice == "1":
-            add_contact(contacts)
+            add_contact(store)
         elif choice == "2":
-            view_contacts(contacts)
+            view_contacts(store)
         elif choice == "3":
-            save_contacts(contacts)
+            save_contacts(store)
         elif choice == "4":
-            contacts = load_contacts()
+            # The JSON file only has what was last exported; replacing drops anything added since
+            answer = input(f"Replace all {len(store)} stored contact(s) with {JSON_FILE}? Unexported changes will be lost (y/N): ")
+            if answer.strip().lower() == "y":
+                load_contacts(store)
+            else:
+                print("Import cancelled.\n")
         elif choice == "5":
-            remove_contact(contacts)
+            remove_contact(store)
         elif choice == "6":
+            store.close()
             print("Exiting...\n")
             break
         else:
@@ -1,16 +1,35 @@
 # contact manager with backup and restore
 
+import difflib # for ranking fuzzy matches
 import json # for JSON handling
 import os # for file operations
+import re # word starts for short-query keys
+import sqlite3 # for store errors
+import struct # for the binary index file
+import sys # for finding the shared contact store
+from array import array # compact posting lists
 
-contacts_file = "contacts_main.json" # main contacts file
+# shared contact store lives with the week12 sqlite manager
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "week12", "day2"))
+from contact_store import ContactStore # indexed SQLite contacts
+
+contacts_db = "contacts_main.db" # main contacts store
+contacts_file = "contacts_main.json" # old contacts file, imported once into the store
+index_file = "contacts_main.index" # search index kept next to the contacts store
+INDEX_FIELDS = ("name", "phone", "email")
+INDEX_MAGIC = b"CIDX0002" # 0002 added the word-start keys; older snapshots are rebuilt
+FIELD_START = "\x00" # key prefix: first 1-2 characters of the field
+WORD_START = "\x01" # key prefix: first 1-2 characters of a later word
+WORD = re.compile(r"\w+")
+COMPACT_AFTER = 1000 # journal entries before the index snapshot is rewritten
+FUZZY_SCAN_LIMIT = 50000 # contacts compared directly when no trigram of a fuzzy query matches
 
 # --- Simple validation helpers ---
 def normalize_name(name: str) -> str: # Normalize name to title case
     return " ".join(part.capitalize() for part in name.split())
 
 def _digits_only(s: str) -> str: # helper to extract digits
-    return "".join(ch for ch in s if ch.isdigit())
+    return "".join(filter(str.isdigit, s)) # filter() runs the loop in C
 
 def is_valid_email(email: str) -> bool: # very basic check
     email = email.strip()
@@ -24,6 +43,8 @@ def is_valid_phone(phone: str) -> bool: # very basic check
     return 7 <= len(digits) <= 15  # simple length check
 
 def is_duplicate(contacts, name: str, phone: str, email: str) -> bool: # check for duplicates
+    if isinstance(contacts, ContactIndex): # O(1) through the normalized-key maps
+        return contacts.is_duplicate(name, phone, email)
     name_l = name.strip().lower()
     phone_d = _digits_only(phone)
     email_l = email.strip().lower()
@@ -35,6 +56,272 @@ def is_duplicate(contacts, name: str, phone: str, email: str) -> bool: # check f
             return True
     return False
 
+# --- Contact index ---
+def _field(contact, field: str) -> str: # normalized text that is searched
+    value = str(contact.get(field, ""))
+    return _digits_only(value) if field == "phone" else value.strip().lower()
+
+def _grams(text: str) -> set: # trigrams (the whole text if shorter)
+    if len(text) < 3:
+        return {text} if text else set()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _start_keys(text: str) -> set: # 1- and 2-character word prefixes, for queries too short for trigrams
+    keys = set()
+    for m in WORD.finditer(text):
+        mark = FIELD_START if m.start() == 0 else WORD_START
+        keys.add(mark + m.group()[:1])
+        keys.add(mark + m.group()[:2])
+    return keys
+
+store = None # ContactStore, opened by load_contacts()
+
+def _stamp(): # store version, so contacts changed by another program are noticed
+    return store.version()
+
+class ContactIndex:
+    """Trigram indexes over name, phone digits and email, plus duplicate keys.
+
+    Every contact has a stable "id" (its store row id). Posting lists are arrays of ids
+    (appended in id order, so they stay sorted); removed ids are skipped
+    until the next snapshot drops them. A search reads the posting list of the query's
+    rarest trigram and checks only those contacts; one- and two-character queries
+    read the lists of contacts with a word starting that way. The index is saved as a
+    binary snapshot plus a journal of adds/removes, stamped with the
+    store version it matches; a mismatch on load means a rebuild.
+    """
+
+    def __init__(self):
+        self.by_id = {} # id -> contact dict
+        self.postings = {f: {} for f in INDEX_FIELDS} # field -> gram -> array of ids
+        self.removed = set() # ids still in posting lists but deleted
+        self.name_phone = {} # "name|digits" -> id
+        self.emails = {} # lowercase email -> id
+        self.next_id = 1
+        self.journal = 0 # entries since the last snapshot
+
+    # --- Building ---
+    @classmethod
+    def build(cls, contacts):
+        index = cls()
+        for c in contacts:
+            index.add(c)
+        return index
+
+    def _keys(self, c):
+        return f"{_field(c, 'name')}|{_field(c, 'phone')}", _field(c, "email")
+
+    def add(self, contact): # Index one contact (assigns an id if it has none)
+        cid = contact.get("id")
+        if not isinstance(cid, int) or cid in self.by_id:
+            cid = contact["id"] = self.next_id
+        self.next_id = max(self.next_id, cid + 1)
+        self.by_id[cid] = contact
+        for f in INDEX_FIELDS:
+            table = self.postings[f]
+            text = _field(contact, f)
+            for g in _grams(text) | _start_keys(text):
+                posting = table.get(g)
+                if posting is None:
+                    posting = table[g] = array("I")
+                posting.append(cid)
+        np_key, email = self._keys(contact)
+        self.name_phone.setdefault(np_key, cid)
+        if email:
+            self.emails.setdefault(email, cid)
+        return cid
+
+    def remove(self, cid):
+        contact = self.by_id.pop(cid, None)
+        if contact is None:
+            return
+        self.removed.add(cid)
+        np_key, email = self._keys(contact)
+        if self.name_phone.get(np_key) == cid:
+            del self.name_phone[np_key]
+        if self.emails.get(email) == cid:
+            del self.emails[email]
+
+    def is_duplicate(self, name: str, phone: str, email: str) -> bool:
+        np_key = f"{name.strip().lower()}|{_digits_only(phone)}"
+        email_l = email.strip().lower()
+        return np_key in self.name_phone or bool(email_l and email_l in self.emails)
+
+    # --- Searching ---
+    def search(self, field: str, query: str, limit: int = 50):
+        """Contacts whose field contains query, best first: prefix matches, then earlier matches.
+
+        A query of one or two characters matches the start of a word instead:
+        fields starting with it, then fields with a later word starting with
+        it, each in the order the contacts were added. Both lists are read
+        straight from the index, stopping at limit.
+        """
+        q = _digits_only(query) if field == "phone" else query.strip().lower()
+        if not q:
+            return []
+        grams = _grams(q)
+        table = self.postings[field]
+        if len(q) < 3: # too short for trigrams
+            found = {} # id -> contact, in rank order
+            for mark in (FIELD_START, WORD_START):
+                for cid in table.get(mark + q, ()):
+                    if len(found) == limit:
+                        return list(found.values())
+                    contact = self.by_id.get(cid)
+                    if contact is not None: # skip removed ids
+                        found.setdefault(cid, contact)
+            return list(found.values())
+        else:
+            lists = [table.get(g) for g in grams]
+            if any(p is None for p in lists): # a trigram no contact has
+                return []
+            candidates = min(lists, key=len)
+        hits = []
+        for cid in candidates:
+            contact = self.by_id.get(cid)
+            if contact is None:
+                continue
+            pos = _field(contact, field).find(q)
+            if pos >= 0:
+                hits.append((pos, _field(contact, field), cid))
+        hits.sort()
+        return [self.by_id[cid] for _, _, cid in hits[:limit]]
+
+    def fuzzy(self, field: str, query: str, limit: int = 10, sample: int = 8):
+        """Ranked near matches (typos, transpositions): contacts sharing the most
+        of the query's rarer trigrams, re-ranked by difflib similarity.
+
+        A short typo ("jnoes") can share no trigram with what was meant; when
+        the trigram candidates give nothing, up to FUZZY_SCAN_LIMIT contacts
+        are compared directly instead.
+        """
+        q = _digits_only(query) if field == "phone" else query.strip().lower()
+        if not q:
+            return []
+        table = self.postings[field]
+        lists = sorted((table[g] for g in _grams(q) if g in table), key=len)[:sample]
+        votes = {}
+        for posting in lists:
+            for cid in posting:
+                votes[cid] = votes.get(cid, 0) + 1
+        best = sorted((cid for cid in votes if cid in self.by_id), key=lambda c: -votes[c])[:limit * 20]
+        found = self._rank(field, q, best, limit)
+        if not found:
+            found = self._rank(field, q, list(self.by_id)[:FUZZY_SCAN_LIMIT], limit)
+        return found
+
+    def _rank(self, field: str, q: str, cids, limit: int):
+        """(score, contact) for the cids scoring at least 0.5, best first."""
+        scored = []
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(q) # difflib caches details about the second sequence
+        for cid in cids:
+            text = _field(self.by_id[cid], field)
+            score = 0
+            for candidate in (text, *text.split()):
+                matcher.set_seq1(candidate)
+                if matcher.real_quick_ratio() > score and matcher.quick_ratio() > score: # upper bounds first
+                    score = max(score, matcher.ratio())
+            if score >= 0.5:
+                scored.append((score, cid))
+        scored.sort(key=lambda sc: -sc[0])
+        return [(round(score, 2), self.by_id[cid]) for score, cid in scored[:limit]]
+
+    # --- Persistence ---
+    def save(self, path: str, contacts_stamp): # Rewrite the snapshot and clear the journal
+        tmp = path + ".tmp"
+        live = set(self.by_id)
+        header = json.dumps({"contacts": contacts_stamp, "next_id": self.next_id}).encode("utf-8")
+        with open(tmp, "wb") as f:
+            f.write(INDEX_MAGIC + struct.pack("<I", len(header)) + header)
+            for field in INDEX_FIELDS:
+                table = self.postings[field]
+                f.write(struct.pack("<I", len(table)))
+                for g, posting in table.items():
+                    if self.removed: # drop deleted ids while writing
+                        posting = array("I", (c for c in posting if c in live))
+                        table[g] = posting
+                    raw = g.encode("utf-8")
+                    f.write(struct.pack("<BI", len(raw), len(posting)) + raw)
+                    posting.tofile(f)
+        os.replace(tmp, path)
+        self.removed.clear()
+        self.journal = 0
+        try:
+            os.remove(path + ".journal")
+        except FileNotFoundError:
+            pass
+
+    def log(self, path: str, op: str, cid: int, contacts_stamp): # Journal one change
+        with open(path + ".journal", "a", encoding="utf-8") as f:
+            f.write(json.dumps({"op": op, "id": cid, "contacts": contacts_stamp}) + "\n")
+        self.journal += 1
+
+    @classmethod
+    def load(cls, path: str, contacts, contacts_stamp):
+        """Index from disk if it matches contacts_stamp, else None."""
+        try:
+            with open(path, "rb") as f:
+                if f.read(8) != INDEX_MAGIC:
+                    return None
+                (size,) = struct.unpack("<I", f.read(4))
+                header = json.loads(f.read(size))
+                index = cls()
+                index.next_id = header["next_id"]
+                stamp = header["contacts"]
+                for field in INDEX_FIELDS:
+                    table = index.postings[field]
+                    (count,) = struct.unpack("<I", f.read(4))
+                    for _ in range(count):
+                        glen, n = struct.unpack("<BI", f.read(5))
+                        g = f.read(glen).decode("utf-8")
+                        posting = array("I")
+                        posting.frombytes(f.read(4 * n))
+                        table[g] = posting
+        except (OSError, ValueError, struct.error, KeyError):
+            return None
+        try: # changes made since the snapshot
+            with open(path + ".journal", "r", encoding="utf-8") as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            entries = []
+        except json.JSONDecodeError:
+            return None
+        if entries:
+            stamp = entries[-1]["contacts"]
+        if stamp != contacts_stamp: # contacts were changed outside this program
+            return None
+        snapshot_next = index.next_id
+        for c in contacts: # contacts themselves come from the JSON file
+            cid = c.get("id")
+            if not isinstance(cid, int) or cid in index.by_id:
+                return None
+            if cid >= snapshot_next: # added after the snapshot: index it now
+                index.add(c)
+                continue
+            index.by_id[cid] = c
+            np_key, email = index._keys(c)
+            index.name_phone.setdefault(np_key, cid)
+            if email:
+                index.emails.setdefault(email, cid)
+        index.removed = {e["id"] for e in entries if e["op"] == "del"}
+        index.journal = len(entries)
+        return index
+
+def open_index(contacts): # Load the saved index, or build (and save) a new one
+    index = ContactIndex.load(index_file, contacts, _stamp())
+    if index is None:
+        index = ContactIndex.build(contacts)
+        index.save(index_file, _stamp())
+    return index
+
+def sync_index(index, op: str, cid: int): # Record a change after contacts were saved
+    stamp = _stamp()
+    if index.journal >= COMPACT_AFTER:
+        index.save(index_file, stamp)
+    else:
+        index.log(index_file, op, cid, stamp)
+
 def menu(): # Display menu options
     print("Contact Manager")
     print("1. Add Contact")
@@ -45,22 +332,20 @@ def menu(): # Display menu options
     print("6. Search Contacts")
     print("7. Exit")
 
-def load_contacts(): # Load contacts from JSON file
-    if not os.path.exists(contacts_file): # if file does not exist
-        return []
-    with open(contacts_file, "r", encoding="utf-8") as file:
-        try: # ensure file operations are safe
-            return json.load(file)
-        except json.JSONDecodeError:
-            print("Error reading contacts file. Starting with empty contact list.")
-            return []
+def load_contacts(): # Open the contact store and read its contacts
+    global store
+    if store is None:
+        store = ContactStore(contacts_db)
+        if len(store) == 0 and os.path.exists(contacts_file): # first run: move the JSON contacts over
+            try:
+                count = store.import_file(contacts_file)
+                os.replace(contacts_file, contacts_file + ".imported")
+                print(f"Imported {count} contacts from {contacts_file}.")
+            except (OSError, ValueError, sqlite3.Error) as e:
+                print(f"Error reading contacts file: {e}. Starting with empty contact list.")
+    return store.all()
 
-def save_contacts(contacts): # Save contacts to JSON file
-    with open(contacts_file, "w", encoding="utf-8") as file:
-        json.dump(contacts, file, indent=4)
-    print("Contacts saved.")
-
-def add_contact(contacts): # Add a new contact
+def add_contact(contacts, index=None): # Add a new contact
     name = input("Enter name: ").strip()
     phone = input("Enter phone number: ").strip()
     email = input("Enter email address: ").strip()
@@ -75,16 +360,19 @@ def add_contact(contacts): # Add a new contact
         return contacts
     # Normalize name (title case); keep original phone/email formatting
     name = normalize_name(name)
-    if is_duplicate(contacts, name, phone, email):
+    if is_duplicate(index if index is not None else contacts, name, phone, email):
         print("Duplicate contact (same name+phone or email) not added.")
         return contacts
     contact = {"name": name, "phone": phone, "email": email}
+    contact["id"] = store.add(name, phone, email) # saved immediately
     contacts.append(contact)
-    save_contacts(contacts)
+    if index is not None:
+        index.add(contact)
+        sync_index(index, "add", contact["id"])
     print("Contact added.")
     return contacts
 
-def remove_contact(contacts): # Remove a contact by number
+def remove_contact(contacts, index=None): # Remove a contact by number
     if not contacts: # Check if contact list is empty
         print("No contacts to remove.")
         return contacts
@@ -100,9 +388,11 @@ def remove_contact(contacts): # Remove a contact by number
     if not choice.isdigit() or not (1 <= int(choice) <= len(contacts)):
         print("Invalid choice.") # Validate user input
         return contacts
-    index = int(choice) - 1 # Convert to 0-based index
-    removed_contact = contacts.pop(index) # Remove the selected contact
-    save_contacts(contacts)
+    removed_contact = contacts.pop(int(choice) - 1) # Remove the selected contact
+    store.delete(removed_contact["id"])
+    if index is not None:
+        index.remove(removed_contact["id"])
+        sync_index(index, "del", removed_contact["id"])
     print(f"Removed contact: {removed_contact.get('name', '?')}")
     return contacts
 
@@ -118,7 +408,7 @@ def view_contacts(contacts): # View all contacts
         print(f"{i}. {name} | {phone} | {email}")
     print()
 
-def search_contacts(contacts): # Search contacts by field
+def search_contacts(contacts, index=None): # Search contacts by field
     if not contacts:
         print("No contacts to search.")
         return
@@ -134,6 +424,25 @@ def search_contacts(contacts): # Search contacts by field
     if not query: # validate query
         print("Search text cannot be empty.")
         return
+    if index is not None: # indexed search, ranked; falls back to fuzzy matches
+        field = INDEX_FIELDS[int(field_choice) - 1]
+        positions = {id(c): i for i, c in enumerate(contacts, 1)} # numbers used by "Remove"
+        found = index.search(field, query)
+        if found:
+            print(f"Found {len(found)} match(es){' (first 50)' if len(found) == 50 else ''}:")
+            for c in found:
+                print(f"{positions.get(id(c), '?')}. {c.get('name','')} | {c.get('phone','')} | {c.get('email','')}")
+            print()
+            return
+        close = index.fuzzy(field, query)
+        if not close:
+            print("No matches found.")
+            return
+        print("No exact matches. Closest:")
+        for score, c in close:
+            print(f"{positions.get(id(c), '?')}. {c.get('name','')} | {c.get('phone','')} | {c.get('email','')} ({score:.0%})")
+        print()
+        return
     qn = query.lower()
     matches = [] # list of (index, name, phone, email) tuples
     for idx, c in enumerate(contacts, 1):
@@ -160,8 +469,7 @@ def search_contacts(contacts): # Search contacts by field
 def backup_contacts(contacts): # Backup contacts to a separate file
     backup_file = "contacts_backup.json"
     try: # ensure file operations are safe
-        with open(backup_file, "w", encoding="utf-8") as file:
-            json.dump(contacts, file, indent=4)
+        store.export_file(backup_file) # same JSON list format as before
         print(f"Contacts backed up to {backup_file}.")
     except OSError as e: # handle file errors
         print(f"Failed to backup contacts: {e}")
@@ -190,33 +498,37 @@ def restore_contacts(contacts): # Restore contacts from backup file
                     'phone': str(item.get('phone','')).strip(),
                     'email': str(item.get('email','')).strip(),
                 })
-        # Overwrite main contacts file
-        with open(contacts_file, "w", encoding="utf-8") as out:
-            json.dump(cleaned, out, indent=4)
+        # Replace the stored contacts in one transaction (the index is rebuilt on the next open)
+        with store.transaction():
+            store.clear()
+            store.add_many(cleaned)
         print(f"Restored {len(cleaned)} contacts from backup.")
-        return cleaned
-    except (OSError, json.JSONDecodeError) as e:
+        return store.all()
+    except (OSError, json.JSONDecodeError, sqlite3.Error) as e:
         print(f"Failed to restore from backup: {e}")
         return contacts
 
 def main(): # Main program loop
     contacts = load_contacts() # load existing contacts
+    index = open_index(contacts) # search index (built once, then kept in step)
     while True: # Main loop
         menu()
         choice = input("Choose an option: ").strip()
         if choice == "1":
-            contacts = add_contact(contacts)
+            contacts = add_contact(contacts, index)
         elif choice == "2":
-            contacts = remove_contact(contacts)
+            contacts = remove_contact(contacts, index)
         elif choice == "3":
             view_contacts(contacts)
         elif choice == "4":
             backup_contacts(contacts)
         elif choice == "5":
             contacts = restore_contacts(contacts)
+            index = open_index(contacts)
         elif choice == "6":
-            search_contacts(contacts)
+            search_contacts(contacts, index)
         elif choice == "7":
+            store.close()
             print("Exiting Contact Manager.")
             break
         else:
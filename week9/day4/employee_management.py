@@ -3,6 +3,7 @@
 import json # for data persistence
 import os # for file operations
 from typing import Optional # for type hints
+from json_store import JsonStore, atomic_write_json # write-behind snapshots + change journal
 
 DATA_FILE = "employees.json"
 
@@ -31,8 +32,7 @@ class Employee: # Employee class with attributes and methods
     def save_to_file(employees_list, path: str): # Save list of employees to JSON file
         try:
             data = [e.to_dict() for e in employees_list]
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
+            atomic_write_json(path, data)
         except OSError as e:
             print(f"Failed to save employees: {e}")
 
@@ -50,7 +50,7 @@ def add_employee(name: str, emp_id: int, position: str):
     new_employee = Employee(name, emp_id, position) # create new employee
     employees.append(new_employee) # add to list
     print(f"Added Employee: {name}, ID: {emp_id}, Position: {position}")
-    save_employees()
+    _store.put(emp_id, new_employee.to_dict()) # journal the change
 
 def remove_employee(emp_id: int): # remove employee by ID
     global employees # modify global list
@@ -62,8 +62,8 @@ def remove_employee(emp_id: int): # remove employee by ID
         print(f"Removed Employee with ID: {emp_id}")
     else:
         print(f"No employee found with ID: {emp_id}")
-    if removed: # only save if something was removed
-        save_employees()
+    if removed: # only record if something was removed
+        _store.delete(emp_id)
 
 def update_employee(emp_id: int, new_name: Optional[str] = None, new_position: Optional[str] = None):
     emp = get_employee_by_id(emp_id) # find employee
@@ -75,19 +75,28 @@ def update_employee(emp_id: int, new_name: Optional[str] = None, new_position: O
     if new_position:
         emp.position = new_position
     print(f"Updated Employee {emp.emp_id}: Name='{emp.name}', Position='{emp.position}'")
-    save_employees() # save changes
+    _store.put(emp.emp_id, emp.to_dict()) # journal the change
 
 
-def save_employees(path: str = DATA_FILE): # Save employee data to JSON file
-    Employee.save_to_file(employees, path)
+def save_employees(path: str = DATA_FILE): # Save employee data to JSON file now
+    if path == DATA_FILE:
+        _store.flush(force=True) # also clears the journal
+    else:
+        Employee.save_to_file(employees, path)
 
 def load_employees(path: str = DATA_FILE): # Load employee data from JSON file
     global employees # modify global list
-    if not os.path.exists(path):
+    if path == DATA_FILE:
+        if not os.path.exists(path) and not _store.has_journal():
+            return False
+    elif not os.path.exists(path):
         return False
     try: # attempt to load employee data
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        if path == DATA_FILE:
+            data = _store.load(default=[]) # replays changes not yet in the snapshot
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
         employees = []
         Employee.count = 0
         for item in data:
@@ -105,6 +114,14 @@ def load_employees(path: str = DATA_FILE): # Load employee data from JSON file
 
 employees = []  # list to store employee instances
 
+def _employee_key(rec): # journal key for an employee record
+    try:
+        return int(rec.get("emp_id"))
+    except (TypeError, ValueError):
+        return rec.get("emp_id")
+
+_store = JsonStore(DATA_FILE, lambda: [e.to_dict() for e in employees], key=_employee_key)
+
 # Load from disk if available; otherwise create defaults
 if not load_employees():
     employees = [
@@ -170,6 +187,7 @@ def main(): # Main program loop
             new_position = input("New position (leave blank to keep): ").strip()
             update_employee(emp_id, new_name or None, new_position or None)
         elif choice == '6':
+            save_employees()
             print("Exiting Employee Management System.")
             break
         else:
@@ -2,6 +2,7 @@ import random
 import json
 import os
 import glob
+from json_store import JsonStore, atomic_write_json # atomic snapshots + change journal
 
 # --- Constants ---
 _PLAYERS_FILE = "players.json"
@@ -21,8 +22,7 @@ def _safe_load_json(path: str, default):
 
 def _safe_save_json(path: str, data) -> None:
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        atomic_write_json(path, data)
     except OSError:
         pass
 
@@ -68,8 +68,32 @@ def _player_stats_path(player_name: str) -> str:
     safe = "".join(c.lower() if c.isalnum() else "_" for c in (player_name or "")).strip("_") or "player"
     return f"game_stats_{safe}.json"
 
+_stat_stores = {} # per-player file -> JsonStore
+
+def _stats_store(player_name: str, stats: GameStats = None) -> JsonStore:
+    path = _player_stats_path(player_name)
+    store = _stat_stores.get(path)
+    if store is None:
+        store = _stat_stores[path] = JsonStore(path, lambda: store.current.to_dict())
+        store.current = stats or GameStats()
+    elif stats is not None:
+        store.current = stats
+    return store
+
+def record_round(stats: GameStats, player_name: str): # Journal one round; the snapshot is written later
+    _stats_store(player_name, stats).put(None, stats.to_dict())
+
 def load_stats(player_name: str) -> GameStats: # Load game stats from file for a player
     path = _player_stats_path(player_name)
+    store = _stats_store(player_name)
+    if store.has_journal(): # unsaved rounds from a crashed session
+        try:
+            data = store.load(default={})
+            if isinstance(data, dict):
+                store.current = GameStats.from_dict(data)
+                return store.current
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error recovering stats journal: {e}")
     if not os.path.exists(path):
         # fallback to legacy global file
         legacy = _LEGACY_STATS_FILE
@@ -89,13 +113,8 @@ def load_stats(player_name: str) -> GameStats: # Load game stats from file for a
         return GameStats()
     
 def save_stats(stats: GameStats, player_name: str): # Save game stats to file for a player
-    try:
-        path = _player_stats_path(player_name)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(stats.to_dict(), f, indent=2)
+    if _stats_store(player_name, stats).flush(force=True):
         print("Game statistics saved.")
-    except OSError as e:
-        print(f"Error saving stats: {e}")
 
 def display_stats(stats: GameStats): # Display current game statistics
     print("\n=== Game Statistics ===")
@@ -180,6 +199,10 @@ def wipe_all(stats: GameStats) -> GameStats: # Wipe all saved statistics and pla
     stats.ties = 0
     stats.score = 0
 
+    # Drop pending write-behind saves so nothing is recreated at exit
+    for store in _stat_stores.values():
+        store.discard()
+
     # Delete all per-player stats files
     deleted = 0
     for path in glob.glob(_PER_PLAYER_PATTERN):
@@ -221,6 +244,7 @@ def rock_paper_scissors(stats: GameStats, player_name: str): # Play looping Rock
             stats.ties += 1
             stats.games += 1
             print("It's a tie!\n")
+            record_round(stats, player_name)
         elif (user_choice == 'rock' and comp_choice == 'scissors') or \
              (user_choice == 'paper' and comp_choice == 'rock') or \
              (user_choice == 'scissors' and comp_choice == 'paper'):
@@ -228,12 +252,14 @@ def rock_paper_scissors(stats: GameStats, player_name: str): # Play looping Rock
             stats.games += 1
             stats.score += 1
             print("You win!\n")
+            record_round(stats, player_name)
         else:
             stats.losses += 1
             stats.games += 1
             # Clamp score to never go below 0
             stats.score = max(0, stats.score - 1)
             print("You lose!\n")
+            record_round(stats, player_name)
 
     # Update global leaderboard first so display reflects current top
     try:
@@ -0,0 +1,231 @@
+# Write-behind JSON persistence shared by the week9 managers.
+# Mutations are appended to a small journal file right away; the full JSON
+# snapshot is only rewritten every few seconds (or at exit), atomically.
+import atexit # flush pending changes at shutdown
+import json # snapshot and journal format
+import os # atomic rename and file checks
+import tempfile # temp file next to the snapshot
+import threading # journal appends may come from several threads
+import time # flush interval
+
+
+def keep_file_mode(tmp: str, path: str): # mkstemp files are 0600; keep the old file's mode (or 0644)
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except OSError:
+        mode = 0o644
+    os.chmod(tmp, mode)
+
+
+def atomic_write_json(path: str, data, indent=2): # Write JSON so readers never see a half-written file
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=folder)
+    try:
+        keep_file_mode(tmp, path)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path) # atomic on the same filesystem
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class JsonStore: # Snapshot + append-only journal for one JSON file
+    """Persist a list of records (or one document) with write-behind flushes.
+
+    snapshot() returns the current data to write; key(record) names a record
+    so journal puts/deletes can be replayed onto the last snapshot. With
+    key=None the file holds a single document and put() replaces it.
+    Flushes run on the caller's thread (no background writer racing the
+    in-memory objects): at most once per flush_interval, or at exit.
+
+    Appends are thread-safe. A flush first moves the journal aside to
+    <file>.journal.old, then snapshots, so changes recorded while the
+    snapshot is being taken land in the new journal; callers recording
+    non-idempotent custom changes from several threads should make their
+    apply() skip changes the snapshot already contains. With
+    auto_flush=False the caller decides when to call maybe_flush() (e.g.
+    only after releasing its own locks, since snapshot() may take them).
+    """
+
+    def __init__(self, path: str, snapshot, key=None, flush_interval: float = 2.0,
+                 indent=2, fsync_journal: bool = False, auto_flush: bool = True):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.old_journal_path = self.journal_path + ".old"
+        self.snapshot = snapshot
+        self.key = key
+        self.flush_interval = flush_interval
+        self.indent = indent
+        self.fsync_journal = fsync_journal
+        self.auto_flush = auto_flush
+        self.dirty = False
+        self._last_flush = time.monotonic()
+        self._journal = None
+        self._lock = threading.Lock() # guards the journal file handle
+        self._flush_lock = threading.Lock() # one flush at a time
+        atexit.register(self.close)
+
+    # --- Loading ---
+    def load(self, default=None, apply=None):
+        """Read the snapshot and replay any journal left by a crash.
+
+        apply(data, change) handles custom changes recorded with record().
+        Returns the recovered JSON data (default if nothing is on disk).
+        """
+        data = default
+        if os.path.exists(self.path):
+            data = self._read_snapshot()
+        changes = self._read_journal()
+        if changes:
+            data = self._replay(data, changes, apply)
+            self.dirty = True # fold the journal into the next snapshot
+        return data
+
+    def has_journal(self) -> bool: # Unsaved changes left on disk (e.g. by a crash)?
+        return os.path.exists(self.journal_path) or os.path.exists(self.old_journal_path)
+
+    # Subclasses can swap the snapshot format; the journal stays JSON lines
+    def _read_snapshot(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_snapshot(self, data):
+        atomic_write_json(self.path, data, indent=self.indent)
+
+    def _read_journal(self):
+        changes = []
+        for path in (self.old_journal_path, self.journal_path): # oldest first
+            if not os.path.exists(path):
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        changes.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break # torn last line from a crash; everything before it is good
+        return changes
+
+    def _replay(self, data, changes, apply):
+        if self.key is None:
+            for change in changes:
+                if change.get("op") == "put":
+                    data = change["value"]
+                elif apply:
+                    data = apply(data, change)
+            return data
+        records = {}
+        order = []
+        for rec in data or []:
+            k = self.key(rec)
+            if k not in records:
+                order.append(k)
+            records[k] = rec
+        for change in changes:
+            op = change.get("op")
+            if op == "put":
+                k = change["key"]
+                if k not in records:
+                    order.append(k)
+                records[k] = change["value"]
+            elif op == "del":
+                records.pop(change["key"], None)
+            elif apply:
+                apply(records, change) # custom changes see the key -> record dict
+        return [records[k] for k in order if k in records]
+
+    # --- Recording changes ---
+    def put(self, key, record): # Insert or replace one record (or the whole document)
+        self._append({"op": "put", "key": key, "value": record})
+
+    def delete(self, key): # Remove one record
+        self._append({"op": "del", "key": key})
+
+    def record(self, change: dict): # Custom change replayed by load(apply=...)
+        self._append(dict(change))
+
+    def _append(self, change):
+        line = json.dumps(change, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._journal is None:
+                self._journal = open(self.journal_path, "a", encoding="utf-8")
+            self._journal.write(line)
+            self._journal.flush()
+            if self.fsync_journal:
+                os.fsync(self._journal.fileno())
+            self.dirty = True
+        if self.auto_flush:
+            self.maybe_flush()
+
+    # --- Flushing ---
+    def maybe_flush(self): # Flush only if the interval has passed since the last snapshot
+        if self.dirty and time.monotonic() - self._last_flush >= self.flush_interval:
+            if self._flush_lock.acquire(blocking=False): # another thread is already flushing
+                try:
+                    self._flush()
+                finally:
+                    self._flush_lock.release()
+
+    def flush(self, force: bool = False):
+        """Write the snapshot atomically and start a fresh journal."""
+        if not (self.dirty or force):
+            return True
+        with self._flush_lock:
+            return self._flush()
+
+    def _rotate_journal(self): # Move the current journal aside; new changes start a new one
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if os.path.exists(self.journal_path):
+                if os.path.exists(self.old_journal_path): # an earlier flush failed; keep both
+                    with open(self.journal_path, "r", encoding="utf-8") as src, \
+                         open(self.old_journal_path, "a", encoding="utf-8") as dst:
+                        dst.write(src.read())
+                    os.remove(self.journal_path)
+                else:
+                    os.replace(self.journal_path, self.old_journal_path)
+            self.dirty = False
+
+    def _flush(self):
+        self._rotate_journal()
+        try:
+            self._write_snapshot(self.snapshot())
+        except OSError as e:
+            print(f"Failed to save {self.path}: {e}")
+            self.dirty = True # .journal.old is kept, so nothing is lost
+            return False
+        try:
+            os.remove(self.old_journal_path)
+        except FileNotFoundError:
+            pass
+        self._last_flush = time.monotonic()
+        return True
+
+    def discard(self): # Drop unsaved changes and the journal (e.g. after deleting the data)
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            for path in (self.journal_path, self.old_journal_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self.dirty = False
+
+    def close(self): # Final flush at shutdown
+        self.flush()
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
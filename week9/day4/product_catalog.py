@@ -1,10 +1,12 @@
+import bisect # sorted price index
+import csv # bulk import from CSV
 import json # JSON serialization
-import os # OS file operations
+from json_store import JsonStore # write-behind snapshots + change journal
 
-# Global in-memory catalog
-products = []
 
 class Product: # Product class with attributes and methods
+    __slots__ = ("name", "price", "quantity", "category") # no per-instance __dict__
+
     def __init__(self, name: str, price: float, quantity: int, category: str):
         self.name = name
         self.price = price
@@ -14,7 +16,7 @@ class Product: # Product class with attributes and methods
     @classmethod
     def get_product_count(cls): # Class method to get product count
         # Return current number of products tracked
-        return len(products)
+        return len(catalog)
 
     def to_dict(self): # Convert product to dictionary for JSON serialization
         return {
@@ -36,64 +38,193 @@ class Product: # Product class with attributes and methods
     def display_info(self): # Display product details
         print(f"Product: {self.name}, Price: ${self.price:.2f}, Quantity: {self.quantity}, Category: {self.category}")
 
+
+class Catalog: # In-memory product store with name, category and price indexes
+    """Products indexed three ways so lookups never scan the whole catalog:
+    name (case-insensitive) -> product, category -> {name: product}, and a
+    sorted list of (price, name) for bisect range queries.
+    """
+
+    def __init__(self):
+        self._by_name = {} # name.lower() -> Product (insertion order = display order)
+        self._by_category = {} # category.lower() -> {name.lower(): Product}
+        self._category_names = {} # category.lower() -> category as first entered
+        self._prices = [] # sorted (price, name.lower())
+
+    def __len__(self):
+        return len(self._by_name)
+
+    def __iter__(self):
+        return iter(list(self._by_name.values()))
+
+    def get(self, name: str): # O(1) lookup by name
+        return self._by_name.get((name or "").lower())
+
+    def add(self, product: Product) -> bool: # False if the name is already taken
+        key = product.name.lower()
+        if key in self._by_name:
+            return False
+        self._by_name[key] = product
+        self._index(product, key)
+        bisect.insort(self._prices, (product.price, key))
+        return True
+
+    def _index(self, product: Product, key: str):
+        cat = product.category.lower()
+        self._by_category.setdefault(cat, {})[key] = product
+        self._category_names.setdefault(cat, product.category)
+
+    def remove(self, name: str): # Remove and return the product, or None
+        key = (name or "").lower()
+        product = self._by_name.pop(key, None)
+        if product is None:
+            return None
+        cat = product.category.lower()
+        members = self._by_category.get(cat, {})
+        members.pop(key, None)
+        if not members:
+            self._by_category.pop(cat, None)
+            self._category_names.pop(cat, None)
+        self._unindex_price(product.price, key)
+        return product
+
+    def _unindex_price(self, price: float, key: str):
+        i = bisect.bisect_left(self._prices, (price, key))
+        if i < len(self._prices) and self._prices[i] == (price, key):
+            del self._prices[i]
+
+    def in_category(self, category: str): # Products in a category (case-insensitive)
+        return list(self._by_category.get((category or "").lower(), {}).values())
+
+    def categories(self): # Category names as first entered, sorted
+        return sorted(self._category_names.values())
+
+    def price_range(self, low: float = None, high: float = None): # Products with low <= price <= high, cheapest first
+        start = 0 if low is None else bisect.bisect_left(self._prices, (low, ""))
+        end = len(self._prices) if high is None else bisect.bisect_right(self._prices, (high, "\uffff"))
+        return [self._by_name[key] for _, key in self._prices[start:end]]
+
+    def set_price(self, product: Product, price: float): # Change one price and keep the index sorted
+        key = product.name.lower()
+        self._unindex_price(product.price, key)
+        product.price = price
+        bisect.insort(self._prices, (price, key))
+
+    def adjust_prices(self, category: str, percent: float = 0.0, amount: float = 0.0) -> int:
+        """Scale every price in a category by percent, then add amount (never below 0).
+
+        Rebuilds the price index once instead of moving each entry.
+        """
+        members = self.in_category(category)
+        for p in members:
+            p.price = max(0.0, round(p.price * (1 + percent / 100) + amount, 2))
+        if members:
+            self._prices = sorted((p.price, k) for k, p in self._by_name.items())
+        return len(members)
+
+    def bulk_add(self, items, replace: bool = False):
+        """Add many products at once; returns (added, skipped).
+
+        Indexes are updated per product, but the price index is sorted once
+        at the end instead of one insort per product.
+        """
+        added = skipped = 0
+        for product in items:
+            key = product.name.lower()
+            if not key:
+                skipped += 1
+                continue
+            if key in self._by_name:
+                if not replace:
+                    skipped += 1
+                    continue
+                self.remove(key)
+            self._by_name[key] = product
+            self._index(product, key)
+            added += 1
+        if added:
+            self._prices = sorted((p.price, k) for k, p in self._by_name.items())
+        return added, skipped
+
+    def clear(self):
+        self.__init__()
+
+
+# Global in-memory catalog
+catalog = Catalog()
+
+# Changes are journaled immediately; products.json is rewritten at most every few seconds
+_store = JsonStore("products.json", lambda: [p.to_dict() for p in catalog],
+                   key=lambda rec: str(rec.get("name", "")).lower())
+
 def get_product_by_name(name: str): # Find product by name
-    for p in products:
-        if p.name.lower() == name.lower():
-            return p
-    return None
+    return catalog.get(name)
 
 def add_product(name: str, price: float, quantity: int, category: str): # Add a new product
-    if get_product_by_name(name): # prevent duplicates
+    new_product = Product(name, price, quantity, category)
+    if not catalog.add(new_product): # prevent duplicates
         print(f"Product '{name}' already exists.")
         return
-    new_product = Product(name, price, quantity, category)
-    products.append(new_product) # add to list
     print(f"Added Product: {name}, Price: ${price:.2f}, Quantity: {quantity}, Category: {category}")
-    save_products()
+    _store.put(name.lower(), new_product.to_dict()) # journal the change
 
-def save_products(): # Save products to JSON file
-    try: # ensure file operations are safe
-        data = [p.to_dict() for p in products]
-        with open("products.json", "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
-    except OSError as e: # handle file errors
-        print(f"Failed to save products: {e}")
-
-def load_products(): # Load products from JSON file
-    global products
-    if not os.path.exists("products.json"):
-        products = []
-        return
+def save_products(): # Save products to JSON file now
+    _store.flush(force=True)
+
+def load_products(): # Load products from JSON file (plus any unsaved journal)
+    catalog.clear()
     try: # ensure file operations are safe
-        with open("products.json", "r", encoding="utf-8") as f:
-            data = json.load(f)
-            products = [Product.from_dict(item) for item in data]
+        data = _store.load(default=[])
+        catalog.bulk_add(Product.from_dict(item) for item in data)
     except (OSError, json.JSONDecodeError) as e:
         print(f"Failed to load products: {e}")
-        products = []
+        catalog.clear()
+
+def import_products(path: str, replace: bool = False): # Bulk import from a .json list or a .csv with a header row
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            if path.lower().endswith(".csv"):
+                rows = list(csv.DictReader(f))
+            else:
+                rows = json.load(f)
+        items = [Product.from_dict(row) for row in rows]
+    except (OSError, ValueError, TypeError, AttributeError) as e: # ValueError covers bad JSON and numbers
+        print(f"Failed to import products: {e}")
+        return 0
+    added, skipped = catalog.bulk_add(items, replace=replace)
+    save_products() # one snapshot instead of journaling every row
+    print(f"Imported {added} products ({skipped} skipped).")
+    return added
+
+def adjust_category_prices(category: str, percent: float = 0.0, amount: float = 0.0): # Bulk price change
+    changed = catalog.adjust_prices(category, percent, amount)
+    if changed:
+        save_products()
+    print(f"Updated prices for {changed} products in '{category}'.")
+    return changed
 
 def view_products(): # View all products
-    if not products: # Check if product list is empty
+    if not len(catalog): # Check if product list is empty
         print("No products available.\n")
         return
     print("\nProduct Catalog:\n")
-    for i, p in enumerate(products, 1): # display products with numbering
+    for i, p in enumerate(catalog, 1): # display products with numbering
         print(f"{i}. ", end="")
         p.display_info()
     print()
 
 def view_products_by_category(category: str): # View products filtered by category
-    if not products:
+    if not len(catalog):
         print("No products available.\n")
         return
     category = category.strip()
     if not category:
         print("Category cannot be blank.\n")
         return
-    matches = [p for p in products if p.category.lower() == category.lower()]
+    matches = catalog.in_category(category)
     if not matches: # no matches found
         print(f"No products found in category '{category}'.")
-        cats = sorted({p.category for p in products})
+        cats = catalog.categories()
         if cats: # show available categories
             print("Available categories:")
             for c in cats:
@@ -106,15 +237,21 @@ def view_products_by_category(category: str): # View products filtered by catego
         p.display_info()
     print()
 
+def view_products_by_price(low: float = None, high: float = None): # View products in a price range
+    matches = catalog.price_range(low, high)
+    if not matches:
+        print("No products in that price range.\n")
+        return
+    print(f"\nProducts priced ${low or 0:.2f} - " + (f"${high:.2f}" if high is not None else "any") + ":\n")
+    for i, p in enumerate(matches, 1):
+        print(f"{i}. ", end="")
+        p.display_info()
+    print()
+
 def remove_product(name: str): # Remove product by name
-    global products
-    before = len(products) # count before removal
-    remaining = [p for p in products if p.name.lower() != name.lower()]
-    if len(remaining) < before:
-        removed = before - len(remaining) # number removed
-        products = remaining
+    if catalog.remove(name):
         print(f"Removed product '{name}'.")
-        save_products()
+        _store.delete(name.lower()) # journal the change
     else: # no product found
         print(f"No product found with name '{name}'.")
 
@@ -125,7 +262,10 @@ def menu(): # Display menu options
     print("3. View Products")
     print("4. Count Products")
     print("5. View by Category")
-    print("6. Exit")
+    print("6. View by Price Range")
+    print("7. Adjust Prices by Category")
+    print("8. Import Products (JSON/CSV)")
+    print("9. Exit")
     print("============================")
 
 def main(): # Main program loop
@@ -158,6 +298,29 @@ def main(): # Main program loop
             category = input("Enter category to view: ").strip()
             view_products_by_category(category)
         elif choice == "6":
+            low_raw = input("Minimum price (blank for none): ").strip()
+            high_raw = input("Maximum price (blank for none): ").strip()
+            try:
+                low = float(low_raw) if low_raw else None
+                high = float(high_raw) if high_raw else None
+            except ValueError:
+                print("Prices must be numbers.\n")
+                continue
+            view_products_by_price(low, high)
+        elif choice == "7":
+            category = input("Category to adjust: ").strip()
+            pct_raw = input("Percent change (e.g. 10 or -5): ").strip()
+            try:
+                percent = float(pct_raw)
+            except ValueError:
+                print("Percent must be a number.\n")
+                continue
+            adjust_category_prices(category, percent)
+        elif choice == "8":
+            path = input("Path to .json or .csv file: ").strip()
+            import_products(path)
+        elif choice == "9":
+            save_products()
             print("Exiting...")
             break
         else:
@@ -1,77 +1,406 @@
-import json # JSON storage
+import itertools # account ids for lock ordering
+import math # finite-amount checks
+import os # locate shared helpers
+import struct # binary ledger headers
+import sys # import path for shared helpers
+import tempfile # atomic binary snapshots
+import threading # per-account locks
+from array import array # compact transaction columns
+from contextlib import ExitStack # hold many account locks at once
 # Banking system with customer accounts, deposits, withdrawals, and transaction history.
 
+# Shared write-behind JSON persistence lives next to the other week9 managers
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "day4"))
+from json_store import JsonStore, keep_file_mode # snapshots + change journal
+
+TXN_TYPES = ["deposit", "withdraw", "transfer_in", "transfer_out"] # type code -> name (grows as new types appear)
+_TXN_CODES = {name: code for code, name in enumerate(TXN_TYPES)}
+_txn_types_lock = threading.Lock() # guards adding a new type from several threads
+
+def _txn_code(ttype: str) -> int: # Stable small integer for a transaction type
+    code = _TXN_CODES.get(ttype)
+    if code is None:
+        with _txn_types_lock:
+            code = _TXN_CODES.get(ttype) # another thread may have added it meanwhile
+            if code is None:
+                code = len(TXN_TYPES)
+                TXN_TYPES.append(ttype)
+                _TXN_CODES[ttype] = code
+    return code
+
+
+class Ledger: # Compact transaction history: three parallel arrays instead of a dict per entry
+    __slots__ = ("types", "amounts", "balances")
+
+    def __init__(self, entries=None):
+        self.types = array("B") # type codes
+        self.amounts = array("d")
+        self.balances = array("d") # running balance after each transaction
+        for t in entries or []:
+            self.append(t)
+
+    def add(self, ttype: str, amount: float, balance: float): # Record one transaction
+        self.types.append(_txn_code(ttype))
+        self.amounts.append(amount)
+        self.balances.append(balance)
+
+    def append(self, entry: dict): # Accept the legacy {type, amount, balance} dict
+        self.add(entry.get("type", "?"), float(entry.get("amount", 0.0)), float(entry.get("balance", 0.0)))
+
+    def _entry(self, i: int) -> dict:
+        return {"type": TXN_TYPES[self.types[i]], "amount": self.amounts[i], "balance": self.balances[i]}
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, i): # Rows come back as the familiar dicts, built on demand
+        if isinstance(i, slice):
+            return [self._entry(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("ledger index out of range")
+        return self._entry(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._entry(i)
+
+    def __eq__(self, other):
+        if isinstance(other, Ledger):
+            return self.types == other.types and self.amounts == other.amounts and self.balances == other.balances
+        if isinstance(other, list):
+            return self.to_list() == other
+        return NotImplemented
+
+    def copy(self): # Independent copy of the three columns
+        other = Ledger()
+        other.types = array("B", self.types)
+        other.amounts = array("d", self.amounts)
+        other.balances = array("d", self.balances)
+        return other
+
+    def to_list(self): # JSON-friendly copy
+        return [self._entry(i) for i in range(len(self))]
+
+    def page(self, page: int = 1, per_page: int = 20): # Page 1 = most recent entries, oldest first
+        end = len(self) - (page - 1) * per_page
+        start = max(0, end - per_page)
+        return self[start:max(0, end)]
+
+    def page_count(self, per_page: int = 20) -> int:
+        return max(1, -(-len(self) // per_page))
+
+
+class BatchResult: # Outcome of one transfer/apply_batch call; falsy when the batch was rejected
+    __slots__ = ("ok", "message")
+
+    def __init__(self, ok: bool, message: str):
+        self.ok = ok
+        self.message = message # the reason it was rejected, or "applied N operations"
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+    def __repr__(self) -> str:
+        return f"BatchResult(ok={self.ok!r}, message={self.message!r})"
+
+
 class Customer: # Class to hold customer information
     def __init__(self, name: str, balance: float = 0.0, transactions=None):
         self.name = name
         self.account = Account(account_name=name, balance=float(balance))
         # Backward/forward compatible transaction restore
-        if transactions and isinstance(transactions, list):
+        if isinstance(transactions, Ledger):
             self.account.transactions = transactions
+        elif transactions and isinstance(transactions, list):
+            self.account.transactions = Ledger(transactions)
 
     def get_info(self) -> str: # Display customer info
         return f"Customer: {self.name}, Balance: ${self.account.get_balance():.2f}"
 
 
+_LEDGER_MAGIC = b"BANKLDG1"
+
+class LedgerFileStore(JsonStore): # Same journaling, but snapshots in a binary ledger file
+    """Binary snapshot: a type-name table, then per customer its name, balance
+    and the raw bytes of its three ledger arrays, so loading is a few
+    array.frombytes() calls per customer instead of parsing JSON.
+    """
+
+    def _read_snapshot(self):
+        records = []
+        with open(self.path, "rb") as f:
+            if f.read(len(_LEDGER_MAGIC)) != _LEDGER_MAGIC:
+                raise ValueError(f"{self.path} is not a ledger file")
+            swap = f.read(1) != (b"L" if sys.byteorder == "little" else b"B")
+            (ntypes,) = struct.unpack("<I", f.read(4))
+            names = [f.read(struct.unpack("<H", f.read(2))[0]).decode("utf-8") for _ in range(ntypes)]
+            remap = array("B", [_txn_code(n) for n in names]) # file codes -> this process's codes
+            (count,) = struct.unpack("<I", f.read(4))
+            for _ in range(count):
+                (name_len,) = struct.unpack("<H", f.read(2))
+                name = f.read(name_len).decode("utf-8")
+                balance, n = struct.unpack("<dQ", f.read(16))
+                ledger = Ledger()
+                ledger.types.frombytes(f.read(n))
+                ledger.amounts.frombytes(f.read(8 * n))
+                ledger.balances.frombytes(f.read(8 * n))
+                if swap:
+                    ledger.amounts.byteswap()
+                    ledger.balances.byteswap()
+                if any(remap[i] != i for i in range(len(remap))):
+                    ledger.types = array("B", (remap[c] for c in ledger.types))
+                records.append({"name": name, "balance": balance, "transactions": ledger})
+        return records
+
+    def _write_snapshot(self, data):
+        folder = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".ledger", dir=folder)
+        try:
+            keep_file_mode(tmp, self.path)
+            with os.fdopen(fd, "wb") as f:
+                f.write(_LEDGER_MAGIC)
+                f.write(b"L" if sys.byteorder == "little" else b"B")
+                f.write(struct.pack("<I", len(TXN_TYPES)))
+                for tname in TXN_TYPES:
+                    raw = tname.encode("utf-8")
+                    f.write(struct.pack("<H", len(raw)) + raw)
+                f.write(struct.pack("<I", len(data)))
+                for rec in data:
+                    raw = rec["name"].encode("utf-8")
+                    ledger = rec["transactions"]
+                    f.write(struct.pack("<H", len(raw)) + raw)
+                    f.write(struct.pack("<dQ", rec["balance"], len(ledger)))
+                    ledger.types.tofile(f)
+                    ledger.amounts.tofile(f)
+                    ledger.balances.tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+
 class BankingSystem: # Class to manage multiple customers
     def __init__(self, storage_path: str = "customers.json"):
         self.storage_path = storage_path
+        # Deposits/withdrawals are journaled; the snapshot is rewritten at most every few seconds.
+        # A ".ledger" path stores the snapshot in the compact binary format instead of JSON.
+        self.binary = storage_path.endswith(".ledger")
+        store_cls = LedgerFileStore if self.binary else JsonStore
+        # auto_flush=False: snapshots take account locks, so flush only after releasing ours
+        self.store = store_cls(storage_path, self._snapshot, key=self._customer_key, indent=None, auto_flush=False)
+        self._index = {} # case-folded name -> Customer, kept in sync with self.customers
+        self._registry_lock = threading.Lock() # guards customers/_index
         self.customers = self.load_customers()
 
-    def load_customers(self): # Load customers from JSON file
+    @staticmethod
+    def _customer_key(record) -> str: # journal/index key for a customer record
+        return str(record.get("name", "")).strip().casefold()
+
+    def _snapshot(self): # Current customers as snapshot data
+        with self._registry_lock:
+            customers = list(self.customers)
+        data = []
+        for c in customers:
+            with c.account.lock: # balance and ledger from the same moment
+                ledger = c.account.transactions
+                data.append({
+                    "name": c.name,
+                    "balance": c.account.get_balance(),
+                    "transactions": ledger.copy() if self.binary else ledger.to_list(),
+                })
+        return data
+
+    @staticmethod
+    def _apply_change(records, change): # Replay a journaled transaction (or batch) onto loaded records
+        if change.get("op") == "txn":
+            entries = [change]
+        elif change.get("op") == "batch":
+            entries = change.get("entries", [])
+        else:
+            return
+        for e in entries:
+            rec = records.get(e.get("key"))
+            if rec is None:
+                continue
+            txns = rec.setdefault("transactions", [])
+            # seq = ledger length after this entry; the snapshot may already contain it
+            if "seq" in e and len(txns) >= e["seq"]:
+                continue
+            txns.append({"type": e["type"], "amount": e["amount"], "balance": e["balance"]})
+            rec["balance"] = e["balance"]
+
+    def _txn_entry(self, customer: Customer, index: int = -1) -> dict: # Journal entry for one ledger row (lock held)
+        ledger = customer.account.transactions
+        if index < 0:
+            index += len(ledger)
+        t = ledger[index]
+        return {"key": self._customer_key({"name": customer.name}), "type": t["type"],
+                "amount": t["amount"], "balance": t["balance"], "seq": index + 1}
+
+    def load_customers(self): # Load customers from JSON file (plus any unsaved journal)
         try: # ensure file operations are safe
-            with open(self.storage_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = self.store.load(default=[], apply=self._apply_change)
             customers = [] # list of Customer objects
             for item in data if isinstance(data, list) else []:
                 name = str(item.get("name", "")).strip()
                 balance = float(item.get("balance", 0))
                 transactions = item.get("transactions", [])
-                customers.append(Customer(name, balance, transactions))
+                customer = Customer(name, balance, transactions)
+                customers.append(customer)
+                self._index[self._customer_key({"name": name})] = customer
             return customers # return list of customers
-        except (OSError, json.JSONDecodeError):
+        except (OSError, ValueError, struct.error): # ValueError covers bad JSON
+            self._index = {}
             return []
 
-    def save_customers(self): # Save customers to JSON file
-        try: # ensure file operations are safe
-            data = [
-                {
-                    "name": c.name,
-                    "balance": c.account.get_balance(),
-                    "transactions": c.account.transactions,
-                }
-                for c in self.customers
-            ]
-            with open(self.storage_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
-        except OSError as e: # handle file errors
-            print(f"Error saving customers: {e}")
-            return False # indicate failure
-        return True # indicate success
-
-    def find_customer(self, name: str): # Find customer by name
-        name = (name or "").strip() # sanitize input
-        for c in self.customers:  # Iterate through customers
-            if c.name.lower() == name.lower():
-                return c # found
-        return None # not found
+    def save_customers(self): # Save customers to JSON file now (atomic snapshot)
+        return self.store.flush(force=True) # True on success, False on failure
+
+    def record_transaction(self, customer: Customer): # Journal the customer's latest transaction
+        with customer.account.lock:
+            if not customer.account.transactions:
+                return
+            self.store.record(dict(self._txn_entry(customer), op="txn"))
+        self.store.maybe_flush()
+
+    def find_customer(self, name: str): # Find customer by name (case-insensitive, O(1))
+        return self._index.get(self._customer_key({"name": name or ""}))
+
+    def add_customer(self, customer: Customer): # Register a customer in the list and the index
+        with self._registry_lock:
+            self.customers.append(customer)
+            self._index[self._customer_key({"name": customer.name})] = customer
 
     def get_or_create_customer(self, name: str) -> Customer: # Get existing or create new customer
-        c = self.find_customer(name)
-        if c: # found
-            return c
-        c = Customer(name=name, balance=0.0)
-        self.customers.append(c)
-        self.save_customers()
+        with self._registry_lock:
+            c = self.find_customer(name)
+            if c: # found
+                return c
+            c = Customer(name=name, balance=0.0)
+            self.customers.append(c)
+            self._index[self._customer_key({"name": name})] = c
+            self.store.put(self._customer_key({"name": name}), {"name": c.name, "balance": 0.0, "transactions": []})
+        self.store.maybe_flush()
         print(f"Created new customer: {name}")
         return c
 
+    # --- Thread-safe operations ---
+    def deposit(self, name: str, amount: float) -> bool: # Deposit and journal under the account lock
+        return self._single(name, amount, "deposit")
+
+    def withdraw(self, name: str, amount: float) -> bool: # Withdraw and journal under the account lock
+        return self._single(name, amount, "withdraw")
+
+    def _single(self, name: str, amount: float, kind: str) -> bool:
+        c = self.find_customer(name)
+        if c is None:
+            print(f"No customer named {name!r}.")
+            return False
+        with c.account.lock:
+            ok = c.account.transaction(amount, kind)
+            if ok:
+                self.store.record(dict(self._txn_entry(c), op="txn"))
+        self.store.maybe_flush()
+        return ok
+
+    def transfer(self, from_name: str, to_name: str, amount: float) -> BatchResult: # Move money between two customers atomically
+        return self.apply_batch([{"op": "transfer", "from": from_name, "to": to_name, "amount": amount}])
+
+    def apply_batch(self, ops) -> BatchResult:
+        """Apply deposits, withdrawals and transfers all-or-nothing (see _apply_batch).
+
+        Returns a BatchResult: true if applied, with the reason (or "applied N
+        operations") in .message. The reason belongs to this call, so
+        concurrent callers each see their own; it is also printed on rejection.
+        """
+        result = BatchResult(*self._apply_batch(ops))
+        if not result:
+            print(f"Batch rejected: {result.message}")
+        return result
+
+    def _apply_batch(self, ops):
+        """Apply deposits, withdrawals and transfers all-or-nothing.
+
+        ops: dicts like {"op": "deposit"|"withdraw", "name": ..., "amount": ...}
+        or {"op": "transfer", "from": ..., "to": ..., "amount": ...}.
+        Every involved account is locked in account_id order (so concurrent
+        batches cannot deadlock), the whole batch is checked against the
+        running balances, and only then posted. The batch is journaled as a
+        single line, so a crash can never replay half of it.
+        Returns (True, message) or (False, reason) with nothing changed.
+        """
+        resolved = []
+        accounts = {}
+        for i, op in enumerate(ops):
+            kind = op.get("op")
+            try:
+                amt = float(op.get("amount"))
+            except (TypeError, ValueError):
+                return False, f"op {i}: amount must be a number"
+            if not math.isfinite(amt) or amt <= 0:
+                return False, f"op {i}: amount must be a positive finite number"
+            names = [op.get("from"), op.get("to")] if kind == "transfer" else [op.get("name")]
+            if kind not in ("deposit", "withdraw", "transfer"):
+                return False, f"op {i}: unknown operation {kind!r}"
+            custs = []
+            for n in names:
+                c = self.find_customer(n)
+                if c is None:
+                    return False, f"op {i}: unknown customer {n!r}"
+                custs.append(c)
+                accounts[c.account.account_id] = c
+            if kind == "transfer" and custs[0] is custs[1]:
+                return False, f"op {i}: cannot transfer to the same account"
+            resolved.append((kind, custs, amt))
+
+        with ExitStack() as stack:
+            for acct_id in sorted(accounts): # global lock order
+                stack.enter_context(accounts[acct_id].account.lock)
+            balances = {acct_id: c.account.balance for acct_id, c in accounts.items()}
+            for i, (kind, custs, amt) in enumerate(resolved): # dry run
+                if kind == "deposit":
+                    balances[custs[0].account.account_id] += amt
+                    continue
+                src = custs[0].account.account_id
+                if amt > balances[src]:
+                    return False, f"op {i}: insufficient funds for {custs[0].name}"
+                balances[src] -= amt
+                if kind == "transfer":
+                    balances[custs[1].account.account_id] += amt
+            entries = []
+            for kind, custs, amt in resolved: # post
+                if kind == "transfer":
+                    legs = [(custs[0], "transfer_out", -amt), (custs[1], "transfer_in", amt)]
+                else:
+                    legs = [(custs[0], kind, amt if kind == "deposit" else -amt)]
+                for c, ttype, delta in legs:
+                    c.account._post(ttype, delta)
+                    entries.append(self._txn_entry(c))
+            self.store.record({"op": "batch", "entries": entries})
+        self.store.maybe_flush()
+        return True, f"applied {len(resolved)} operations"
+
+
+_account_ids = itertools.count(1) # global order for acquiring several account locks
 
 class Account: # Class to hold account information
     def __init__(self, account_name: str, balance: float = 0.0):
         self.account_name = account_name
         self.balance = float(balance)
-        self.transactions = []  # list of {type, amount, balance}
+        self.transactions = Ledger()  # rows read back as {type, amount, balance}
+        self.account_id = next(_account_ids)
+        self.lock = threading.RLock() # guards balance + transactions
+
+    def _post(self, ttype: str, delta: float): # Apply a validated change (caller holds self.lock)
+        self.balance += delta
+        self.transactions.add(ttype, abs(delta), self.balance)
 
     def deposit(self, amount: float): # Deposit amount
         amt = float(amount)
@@ -82,8 +411,8 @@ class Account: # Class to hold account information
         if amt <= 0:
             print("Amount must be positive.")
             return False # exit on invalid amount
-        self.balance += amt # add to balance
-        self.transactions.append({"type": "deposit", "amount": amt, "balance": self.balance})
+        with self.lock:
+            self._post("deposit", amt) # add to balance
         return True
 
     def withdraw(self, amount: float): # Withdraw amount
@@ -95,11 +424,11 @@ class Account: # Class to hold account information
         if amt <= 0: # Check for valid amount
             print("Amount must be positive.")
             return False
-        if amt > self.balance: # Check for sufficient funds
-            print("Insufficient funds")
-            return False
-        self.balance -= amt # deduct from balance
-        self.transactions.append({"type": "withdraw", "amount": amt, "balance": self.balance})
+        with self.lock:
+            if amt > self.balance: # Check for sufficient funds
+                print("Insufficient funds")
+                return False
+            self._post("withdraw", -amt) # deduct from balance
         return True
 
     def get_balance(self) -> float: # Get current balance
@@ -114,12 +443,14 @@ class Account: # Class to hold account information
             print("Invalid transaction type")
             return False
 
-def view_transactions(account: Account): # View recent transactions
+def view_transactions(account: Account, page: int = 1, per_page: int = 20): # View one page of transactions
     if not account.transactions: # no transactions
         print("No transactions yet.")
         return
-    print("\nRecent Transactions:")
-    for t in account.transactions[-20:]:  # show last 20
+    pages = account.transactions.page_count(per_page)
+    page = min(max(1, page), pages)
+    print(f"\nRecent Transactions (page {page} of {pages}):")
+    for t in account.transactions.page(page, per_page):  # page 1 = latest
         ttype = t.get("type", "?")
         amt = t.get("amount", 0.0)
         bal = t.get("balance", 0.0)
@@ -153,8 +484,7 @@ def handle_account_session(customer: Customer, banking_system: BankingSystem): #
             except ValueError: # Handle invalid input
                 print("Please enter a valid number.")
                 continue
-            if acct.deposit(amount): # Successful deposit
-                banking_system.save_customers() # Save after deposit
+            if banking_system.deposit(customer.name, amount): # Successful deposit (journaled)
                 print(f"Deposited ${amount:,.2f}.")
         elif choice == "2":
             val = input("Amount to withdraw: ").strip()
@@ -163,13 +493,18 @@ def handle_account_session(customer: Customer, banking_system: BankingSystem): #
             except ValueError:
                 print("Please enter a valid number.")
                 continue
-            if acct.withdraw(amount): # Successful withdrawal
-                banking_system.save_customers() # Save after withdrawal
+            if banking_system.withdraw(customer.name, amount): # Successful withdrawal (journaled)
                 print(f"Withdrew ${amount:,.2f}.")
         elif choice == "3":
             print(f"Balance: ${acct.get_balance():,.2f}")
         elif choice == "4":
-            view_transactions(acct)
+            page = 1
+            view_transactions(acct, page)
+            while page < acct.transactions.page_count():
+                if input("Show older transactions? (y/N): ").strip().lower() != "y":
+                    break
+                page += 1
+                view_transactions(acct, page)
         elif choice == "5":
             banking_system.save_customers()
             print("Saved. Returning to main menu.")
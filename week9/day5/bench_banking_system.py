@@ -0,0 +1,90 @@
+# Throughput benchmark for the thread-safe BankingSystem operations.
+# Runs the same end-of-day style workload with 1, 4 and 16 threads and prints ops/sec.
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from banking_system import BankingSystem, Customer
+
+ACCOUNTS = 2000
+OPS_TOTAL = 40000 # operations per run, split across threads
+BATCH_SIZE = 500 # operations per apply_batch call
+
+
+def make_bank(folder: str) -> BankingSystem:
+    bank = BankingSystem(storage_path=os.path.join(folder, "bench.ledger"))
+    for i in range(ACCOUNTS):
+        c = Customer(f"acct{i}", 0.0)
+        bank.add_customer(c)
+        c.account.deposit(1_000_000)
+    bank.save_customers()
+    return bank
+
+
+def random_ops(rng: random.Random, count: int):
+    ops = []
+    for _ in range(count):
+        r = rng.random()
+        a = f"acct{rng.randrange(ACCOUNTS)}"
+        if r < 0.4:
+            ops.append({"op": "deposit", "name": a, "amount": rng.randint(1, 100)})
+        elif r < 0.6:
+            ops.append({"op": "withdraw", "name": a, "amount": rng.randint(1, 100)})
+        else:
+            b = f"acct{rng.randrange(ACCOUNTS)}"
+            while b == a:
+                b = f"acct{rng.randrange(ACCOUNTS)}"
+            ops.append({"op": "transfer", "from": a, "to": b, "amount": rng.randint(1, 100)})
+    return ops
+
+
+def run(bank: BankingSystem, threads: int, mode: str) -> float:
+    """Return operations per second for `threads` workers.
+
+    mode "single" calls deposit/withdraw/transfer one at a time;
+    mode "batch" posts BATCH_SIZE operations per apply_batch call.
+    """
+    per_thread = OPS_TOTAL // threads
+    workloads = [random_ops(random.Random(seed), per_thread) for seed in range(threads)]
+
+    def worker(ops):
+        if mode == "batch":
+            for i in range(0, len(ops), BATCH_SIZE):
+                bank.apply_batch(ops[i:i + BATCH_SIZE])
+            return
+        for op in ops:
+            if op["op"] == "transfer":
+                bank.transfer(op["from"], op["to"], op["amount"])
+            elif op["op"] == "deposit":
+                bank.deposit(op["name"], op["amount"])
+            else:
+                bank.withdraw(op["name"], op["amount"])
+
+    pool = [threading.Thread(target=worker, args=(ops,)) for ops in workloads]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return per_thread * threads / elapsed
+
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        bank = make_bank(folder)
+        print(f"{ACCOUNTS} accounts, {OPS_TOTAL} operations per run")
+        print(f"{'mode':8} {'threads':>7} {'ops/sec':>12}")
+        for mode in ("single", "batch"):
+            for threads in (1, 4, 16):
+                rate = run(bank, threads, mode)
+                print(f"{mode:8} {threads:>7} {rate:>12,.0f}")
+        bank.store.discard() # the temp folder is about to disappear
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
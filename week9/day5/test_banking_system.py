@@ -3,17 +3,19 @@ import sys
 from io import StringIO
 from contextlib import redirect_stdout
 
-from banking_system import BankingSystem, view_transactions
+from banking_system import BankingSystem, Ledger, view_transactions
 
 TEST_DB = os.path.join(os.path.dirname(__file__), "customers_test.json")
+TEST_LEDGER = os.path.join(os.path.dirname(__file__), "customers_test.ledger")
 
 
 def reset_test_db():
-    try:
-        if os.path.exists(TEST_DB):
-            os.remove(TEST_DB)
-    except OSError:
-        pass
+    for path in (TEST_DB, TEST_LEDGER, TEST_DB + ".journal", TEST_LEDGER + ".journal"):
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError:
+            pass
 
 
 class TestRunner:
@@ -136,6 +138,91 @@ def main():
     # All last lines should be deposits of $1.00
     t.check(all('deposit' in ln and '$1.00' in ln for ln in hyphen_lines), "view last 20 are recent $1 deposits")
 
+    # 8) Paged history: page 2 holds the 20 entries before the latest 20
+    buf = StringIO()
+    with redirect_stdout(buf):
+        view_transactions(alice2.account, page=2)
+    out = buf.getvalue()
+    t.check("page 2 of" in out, "view_transactions reports page numbers")
+    page2 = alice2.account.transactions.page(2)
+    t.check(len(page2) == 20 and page2[-1] == alice2.account.transactions[-21], "page 2 ends just before the latest page")
+
+    # 9) Name index stays in sync with the customer list
+    t.check(bank3.find_customer("  BOB ") is bank3.customers[1], "index lookup ignores case and spaces")
+    carol = bank3.get_or_create_customer("Carol")
+    t.check(bank3.find_customer("carol") is carol, "new customers are indexed")
+    t.check(bank3.find_customer("nobody") is None, "unknown names return None")
+
+    # 10) Ledger behaves like the old list of dicts
+    ledger = Ledger([{"type": "deposit", "amount": 5, "balance": 5}])
+    t.check(ledger == [{"type": "deposit", "amount": 5.0, "balance": 5.0}], "ledger compares equal to list of dicts")
+    t.check(ledger[-1]["balance"] == 5.0 and len(ledger[0:5]) == 1, "ledger supports indexing and slicing")
+
+    # 11) Binary ledger snapshot round-trip, with a journaled transaction on top
+    lbank = BankingSystem(storage_path=TEST_LEDGER)
+    dave = lbank.get_or_create_customer("Dave")
+    dave.account.deposit(25)
+    lbank.record_transaction(dave)
+    t.check(lbank.save_customers() is True, "binary ledger saved")
+    dave.account.withdraw(5)
+    lbank.record_transaction(dave)  # only in the journal
+    lbank2 = BankingSystem(storage_path=TEST_LEDGER)
+    dave2 = lbank2.find_customer("dave")
+    t.check(dave2 is not None and abs(dave2.account.get_balance() - 20.0) < 1e-9, "binary ledger + journal restore balance")
+    t.check(dave2 is not None and dave2.account.transactions == dave.account.transactions, "binary ledger restores transactions")
+    # 12) Batches are all-or-nothing
+    lbank2.get_or_create_customer("Erin")
+    before = (dave2.account.get_balance(), len(dave2.account.transactions))
+    ok_batch = lbank2.apply_batch([
+        {"op": "deposit", "name": "erin", "amount": 10},
+        {"op": "transfer", "from": "dave", "to": "erin", "amount": 1000},
+    ])
+    t.check(not ok_batch and ok_batch.ok is False and "insufficient" in ok_batch.message, "batch with an overdraft is rejected")
+    t.check((dave2.account.get_balance(), len(dave2.account.transactions)) == before, "rejected batch changes nothing")
+    t.check(lbank2.find_customer("erin").account.get_balance() == 0.0, "rejected batch leaves other accounts alone")
+    ok_batch = lbank2.apply_batch([
+        {"op": "deposit", "name": "erin", "amount": 10},
+        {"op": "transfer", "from": "dave", "to": "erin", "amount": 15},
+    ])
+    t.check(ok_batch and abs(lbank2.find_customer("erin").account.get_balance() - 25.0) < 1e-9, "valid batch applied")
+    failed = lbank2.transfer("dave", "erin", 10 ** 9)
+    t.check(not failed and "insufficient" in failed.message, "failed transfer is falsy and says why")
+    lbank3 = BankingSystem(storage_path=TEST_LEDGER)
+    t.check(abs(lbank3.find_customer("dave").account.get_balance() - 5.0) < 1e-9, "journaled batch replays on reload")
+
+    # 13) Concurrent transfers in both directions neither deadlock nor lose money
+    import threading
+    lbank2.deposit("dave", 1000)
+    lbank2.deposit("erin", 1000)
+    def shuffle(a, b):
+        for _ in range(200):
+            lbank2.transfer(a, b, 1)
+    workers = [threading.Thread(target=shuffle, args=pair) for pair in [("dave", "erin"), ("erin", "dave")] * 4]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join(timeout=30)
+    total = lbank2.find_customer("dave").account.get_balance() + lbank2.find_customer("erin").account.get_balance()
+    t.check(not any(w.is_alive() for w in workers), "concurrent transfers finish")
+    t.check(abs(total - 2030.0) < 1e-9, "concurrent transfers conserve the total")
+    # 14) Each concurrent call gets its own outcome
+    mixed_up = []
+    def outcomes(to_name, expected):
+        for _ in range(200):
+            result = lbank2.transfer("dave", to_name, 1)
+            if expected not in result.message:
+                mixed_up.append(result.message)
+    workers = [threading.Thread(target=outcomes, args=pair)
+               for pair in [("erin", "applied"), ("nobody", "unknown customer")] * 4]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join(timeout=30)
+    t.check(not mixed_up, "concurrent transfers each report their own outcome")
+
+    for b in (bank, bank2, bank3, lbank, lbank2, lbank3):
+        b.store.discard()  # nothing pending should be written back after cleanup
+
     ok = t.summary()
 
     # Cleanup